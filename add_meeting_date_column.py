@@ -1,13 +1,8 @@
-from app.database import engine
-from sqlalchemy import text
+# Superseded by migration v001_legacy_columns (python -m app.migrations up).
+from app.migrations.__main__ import main
 
 def migrate():
-    with engine.connect() as conn:
-        try:
-            conn.execute(text("ALTER TABLE weekly_progress ADD COLUMN meeting_date DATE"))
-            print("Successfully added meeting_date column.")
-        except Exception as e:
-            print(f"Migration failed (Column might already exist?): {e}")
+    main(["up"])
 
 if __name__ == "__main__":
     migrate()
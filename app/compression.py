@@ -0,0 +1,91 @@
+"""
+Response compression negotiated from Accept-Encoding.
+
+Brotli is used when the optional `brotli` package is installed and the client
+accepts it, gzip otherwise. Bodies under MINIMUM_SIZE go out as they are;
+streaming responses are compressed chunk by chunk.
+"""
+from typing import Dict
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+MINIMUM_SIZE = 1024
+GZIP_LEVEL = 6  # level 9 costs several times the CPU for a few % smaller bodies
+BROTLI_QUALITY = 4  # the quality range meant for on-the-fly compression
+
+
+def accepted_encodings(header: str) -> Dict[str, float]:
+    """{"gzip": 1.0, "br": 0.5, ...} from an Accept-Encoding header."""
+    encodings = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            encodings[name.strip().lower()] = q
+    return encodings
+
+
+class _WeakETagMixin:
+    # A strong ETag names exact bytes; once the body is re-encoded it can only be weak.
+    async def send_with_compression(self, message: Message) -> None:
+        if message["type"] == "http.response.body" and self.initial_message and not self.started:
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/") and self._will_compress(message):
+                headers["ETag"] = "W/" + etag
+        await super().send_with_compression(message)
+
+    def _will_compress(self, message: Message) -> bool:
+        if self.content_encoding_set or self.content_type_is_excluded:
+            return False
+        return message.get("more_body", False) or len(message.get("body", b"")) >= self.minimum_size
+
+
+class GzipETagResponder(_WeakETagMixin, GZipResponder):
+    pass
+
+
+class BrotliResponder(_WeakETagMixin, IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int = BROTLI_QUALITY) -> None:
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        out = self.compressor.process(body)
+        return out + (self.compressor.flush() if more_body else self.compressor.finish())
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = MINIMUM_SIZE) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        responder: ASGIApp
+        if brotli is not None and accepted.get("br", 0) > 0:
+            responder = BrotliResponder(self.app, self.minimum_size)
+        elif accepted.get("gzip", 0) > 0:
+            responder = GzipETagResponder(self.app, self.minimum_size, compresslevel=GZIP_LEVEL)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
@@ -0,0 +1,183 @@
+"""
+Shared write helpers used by the routers.
+"""
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app import models
+from app.fragments import fragment_cache
+
+# Natural key of a WeeklyProgress row (unique index ix_weekly_progress_project_year_week)
+WEEKLY_PROGRESS_KEY = ("project_id", "year", "week_number")
+
+
+def upsert_weekly_progress(
+    db: Session,
+    rows: Iterable[Dict],
+    update: Union[Sequence[str], Callable, None] = None,
+    returning: bool = False,
+) -> Optional[List[models.WeeklyProgress]]:
+    """
+    Inserts or updates WeeklyProgress rows keyed on (project_id, year, week_number)
+    with a single INSERT ... ON CONFLICT DO UPDATE statement.
+
+    `rows` are column dicts; every row must carry the same keys.
+    `update` picks what an existing row receives: a list of column names copied
+    from the incoming row, or a callable taking the `excluded` pseudo-table and
+    returning {column: SQL expression}. Defaults to every incoming non-key column.
+    With returning=True the resulting rows are returned in input order.
+    Raises ValueError for a row without a year: SQLite never matches NULLs
+    in the key, so such a row would be inserted again on every upsert.
+    """
+    rows = list(rows)
+    if not rows:
+        return [] if returning else None
+    if any(row.get("year") is None for row in rows):
+        raise ValueError("WeeklyProgress rows need a year")
+
+    stmt = sqlite_insert(models.WeeklyProgress)
+    if update is None:
+        update = [c for c in rows[0] if c not in WEEKLY_PROGRESS_KEY]
+    if callable(update):
+        set_ = update(stmt.excluded)
+    else:
+        set_ = {c: stmt.excluded[c] for c in update}
+
+    if set_:
+        stmt = stmt.on_conflict_do_update(index_elements=list(WEEKLY_PROGRESS_KEY), set_=set_)
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=list(WEEKLY_PROGRESS_KEY))
+
+    if not returning:
+        db.execute(stmt, rows)
+        return None
+
+    stmt = stmt.returning(models.WeeklyProgress, sort_by_parameter_order=True)
+    return db.scalars(stmt, rows, execution_options={"populate_existing": True}).all()
+
+
+def shift_weeks(db: Session, project_id: int, after_week: int, delta: int) -> int:
+    """
+    Adds `delta` (positive or negative) to week_number of every week of the
+    project numbered after `after_week`, as set-based UPDATEs.
+
+    SQLite checks the unique (project_id, year, week_number) key row by row
+    during an UPDATE, so shifting in place could collide with a neighbour.
+    The rows are moved to negated targets first (no real week is negative),
+    then flipped back. Returns the number of weeks moved.
+    """
+    WP = models.WeeklyProgress
+    moved = db.execute(
+        update(WP)
+        .where(WP.project_id == project_id, WP.week_number > after_week)
+        .values(week_number=-(WP.week_number + delta))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if moved:
+        db.execute(
+            update(WP)
+            .where(WP.project_id == project_id, WP.week_number < 0)
+            .values(week_number=-WP.week_number)
+            .execution_options(synchronize_session=False)
+        )
+    return moved
+
+
+# Row versions behind the ETags of the read endpoints (app.etags).
+def touch(obj):
+    """Marks a loaded Project, Engineer or Meeting as changed."""
+    obj.version = (obj.version or 0) + 1
+    obj.updated_at = datetime.utcnow()
+    if isinstance(obj, models.Project):
+        fragment_cache.invalidate(obj.id)
+
+
+def touch_project(db: Session, project_id: int):
+    """touch() for a project that is not loaded, e.g. after Core writes to its weeks."""
+    db.execute(
+        update(models.Project)
+        .where(models.Project.id == project_id)
+        .values(version=func.coalesce(models.Project.version, 0) + 1, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    fragment_cache.invalidate(project_id)
+
+
+# Project aggregates over weekly rows.
+# A week counts towards the project's progress once it has been reported,
+# i.e. it carries a non-blank actual_description.
+_BLANK = " \t\r\n"
+
+
+def week_contribution(week) -> Tuple[float, float]:
+    """(progress points, hours) a WeeklyProgress row adds to its project; None adds nothing."""
+    if week is None:
+        return 0, 0.0
+    reported = bool(week.actual_description and week.actual_description.strip(_BLANK))
+    return (week.actual_progress or 0) if reported else 0, week.actual_hours or 0.0
+
+
+def apply_week_delta(project: models.Project, before, after):
+    """
+    Moves the project's aggregates from one state of a week to another.
+    `before`/`after` are the row's old and new values (anything with
+    actual_progress, actual_description and actual_hours); None for a
+    week that did not exist or was deleted.
+    """
+    old_progress, old_hours = week_contribution(before)
+    new_progress, new_hours = week_contribution(after)
+    project.reported_progress = (project.reported_progress or 0) + new_progress - old_progress
+    project.total_actual_hours = (project.total_actual_hours or 0.0) + new_hours - old_hours
+
+
+def _totals_query():
+    WP = models.WeeklyProgress
+    reported = func.trim(func.coalesce(WP.actual_description, ""), _BLANK) != ""
+    return (
+        select(
+            WP.project_id,
+            func.coalesce(func.sum(case((reported, func.coalesce(WP.actual_progress, 0)), else_=0)), 0),
+            func.coalesce(func.sum(func.coalesce(WP.actual_hours, 0)), 0.0),
+        )
+        .group_by(WP.project_id)
+    )
+
+
+def recompute_project_totals(db: Session, project: models.Project):
+    """Full recompute of one project's aggregates, for bulk writes such as imports."""
+    recompute_totals(db, [project])
+
+
+def recompute_totals(db: Session, projects: Sequence[models.Project]):
+    """recompute_project_totals for many projects with one query."""
+    db.flush()
+    totals = {
+        pid: (progress, hours)
+        for pid, progress, hours in db.execute(
+            _totals_query().where(models.WeeklyProgress.project_id.in_([p.id for p in projects]))
+        )
+    }
+    for project in projects:
+        project.reported_progress, project.total_actual_hours = totals.get(project.id, (0, 0.0))
+
+
+def check_project_totals(db: Session, fix: bool = False) -> List[Tuple[int, Tuple, Tuple]]:
+    """
+    Compares every project's stored aggregates with a full recompute.
+    Returns [(project_id, (stored progress, hours), (expected progress, hours))]
+    for the projects that differ; with fix=True they are corrected (not committed).
+    """
+    expected = {pid: (progress, hours) for pid, progress, hours in db.execute(_totals_query())}
+    mismatches = []
+    for project in db.query(models.Project):
+        stored = (project.reported_progress or 0, project.total_actual_hours or 0.0)
+        want = expected.get(project.id, (0, 0.0))
+        if stored[0] != want[0] or abs(stored[1] - want[1]) > 1e-6:
+            mismatches.append((project.id, stored, want))
+            if fix:
+                project.reported_progress, project.total_actual_hours = want
+    return mismatches
@@ -1,19 +1,155 @@
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./data/dev_manage.db"
-
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+SQLALCHEMY_DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///./data/dev_manage.db")
+# Same database through the aiosqlite driver, for the async route handlers
+ASYNC_DATABASE_URL = os.environ.get(
+    "ASYNC_DATABASE_URL", SQLALCHEMY_DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
 )
+
+# Engine profiles: PRAGMAs applied to every new SQLite connection.
+# "production" runs in WAL mode so readers never block on a writer (e.g. a long
+# /api/sync/import commit); "default" keeps SQLite's stock rollback journal.
+ENGINE_PROFILES = {
+    "default": {},
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,  # bytes
+        "cache_size": -64 * 1024,  # negative = KiB, i.e. 64 MB per connection
+        "busy_timeout": 5000,  # ms
+        "temp_store": "MEMORY",
+    },
+}
+
+DB_PROFILE = os.environ.get("DB_PROFILE", "production")
+
+# SQLite allows a single writer at a time, so writes go through a one-connection
+# pool and queue in Python instead of spinning on SQLITE_BUSY.
+WRITER_POOL_SIZE = int(os.environ.get("DB_WRITER_POOL_SIZE", "1"))
+READER_POOL_SIZE = int(os.environ.get("DB_READER_POOL_SIZE", "8"))
+
+
+def get_pragmas(profile: str = DB_PROFILE) -> dict:
+    """
+    Returns the PRAGMAs for a profile. Any PRAGMA can be overridden with an
+    environment variable, e.g. DB_PRAGMA_CACHE_SIZE=-131072.
+    """
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE '{profile}' (expected one of {', '.join(ENGINE_PROFILES)})")
+    pragmas = dict(ENGINE_PROFILES[profile])
+    for key, value in os.environ.items():
+        if key.startswith("DB_PRAGMA_"):
+            pragmas[key[len("DB_PRAGMA_"):].lower()] = value
+    return pragmas
+
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _is_memory(url: str) -> bool:
+    path = url.split("://", 1)[1]
+    return path in ("", "/:memory:") or "mode=memory" in url
+
+
+def _install_pragmas(target_engine, pragmas: dict, read_only: bool = False):
+    @event.listens_for(target_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            # journal_mode is a property of the database file; only the writer sets it
+            if read_only and name == "journal_mode":
+                continue
+            cursor.execute(f"PRAGMA {name}={value}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+
+def _sync_engine(e):
+    # Pool events live on the sync core of an AsyncEngine
+    return getattr(e, "sync_engine", e)
+
+
+def create_engines(url: str = SQLALCHEMY_DATABASE_URL, profile: str = DB_PROFILE, factory=create_engine):
+    """
+    Builds the (writer, reader) engine pair for a database URL.
+    In-memory and non-SQLite databases share a single engine for both roles.
+    Pass factory=create_async_engine to build the AsyncEngine pair instead.
+    """
+    if not _is_sqlite(url):
+        writer = factory(url)
+        return writer, writer
+
+    pragmas = get_pragmas(profile)
+    connect_args = {"check_same_thread": False}
+
+    if _is_memory(url):
+        writer = factory(url, connect_args=connect_args)
+        _install_pragmas(_sync_engine(writer), {k: v for k, v in pragmas.items() if k != "journal_mode"})
+        return writer, writer
+
+    writer = factory(
+        url, connect_args=connect_args,
+        pool_size=WRITER_POOL_SIZE, max_overflow=0,
+    )
+    _install_pragmas(_sync_engine(writer), pragmas)
+    return writer, create_read_engine(url, profile, factory)
+
+
+def create_read_engine(url: str = SQLALCHEMY_DATABASE_URL, profile: str = DB_PROFILE, factory=create_engine):
+    """
+    Builds only the reader engine of create_engines(), for callers that never
+    write. In-memory and non-SQLite databases get their single shared engine.
+    """
+    if not _is_sqlite(url) or _is_memory(url):
+        return create_engines(url, profile, factory)[1]
+    reader = factory(
+        url, connect_args={"check_same_thread": False},
+        pool_size=READER_POOL_SIZE, max_overflow=READER_POOL_SIZE,
+    )
+    _install_pragmas(_sync_engine(reader), get_pragmas(profile), read_only=True)
+    return reader
+
+
+engine, read_engine = create_engines()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# Async sessions only read: a second writer pool would break the single-writer
+# queue above (an async write would wait out busy_timeout behind a long sync
+# transaction and fail with "database is locked"). Writes use get_db.
+async_read_engine = create_read_engine(ASYNC_DATABASE_URL, factory=create_async_engine)
+# expire_on_commit=False: attribute access after commit must not trigger implicit IO
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
+# Tables of the jobs database, which has an engine of its own (app.jobs)
+JobBase = declarative_base()
 
 def get_db():
+    """Session on the writer engine. Use for any endpoint that modifies data."""
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+get_write_db = get_db
+
+def get_read_db():
+    """Session on the read-only reader pool. Writes through it raise an error."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db():
+    """AsyncSession on the read-only reader pool, for `async def` handlers."""
+    async with AsyncReadSessionLocal() as db:
+        yield db
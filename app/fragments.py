@@ -0,0 +1,83 @@
+"""
+In-memory cache of rendered page fragments (the project page's Gantt and
+weekly data, the planning page's week table).
+
+Keys start with (kind, project_id, version, updated_at, ...), so a write to
+the project (app.crud.touch bumps its version) makes its old fragments
+unreachable; touch also drops them right away. Entries are evicted least
+recently used first once their total size passes FRAGMENT_CACHE_BYTES
+(default 16 MB). The cache is per process.
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+class FragmentCache:
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[str]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: str) -> str:
+        size = sys.getsizeof(value)
+        if size > self.max_bytes:
+            return value
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = value
+            self._sizes[key] = size
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+        return value
+
+    def _discard(self, key: Hashable):
+        if key in self._entries:
+            del self._entries[key]
+            self.bytes -= self._sizes.pop(key)
+
+    def invalidate(self, project_id: int):
+        """Drops every fragment of a project."""
+        with self._lock:
+            for key in [k for k in self._entries if k[1] == project_id]:
+                self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+fragment_cache = FragmentCache(int(os.getenv("FRAGMENT_CACHE_BYTES", DEFAULT_MAX_BYTES)))
@@ -0,0 +1,231 @@
+"""
+Gantt engine shared by the project page and the portfolio API.
+
+Weeks are loaded with a Core select (select_weeks) into WeekRow tuples rather
+than ORM objects. Consecutive weeks with the same planned description form
+one planned Bar (group_weeks), which refers to its weeks by index.
+place_bars lays bars and their weeks out on a timeline from
+utils.calculate_timeline and drops what falls outside it. portfolio builds
+the compact multi-project chart behind GET /api/gantt.
+
+Bars, week cells and week rows are slotted / tuple types: a 5-year project
+page holds a few hundred small objects instead of ORM instances and dicts.
+"""
+from datetime import date
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.utils import calculate_grid_position, calculate_timeline
+from app.weeks import Week, project_week, week_number_in
+
+WP = models.WeeklyProgress
+
+# Statuses of projects that no longer take weekly progress
+INACTIVE_STATUSES = ("Maintenance", "Complete", "Deployed")
+
+
+class WeekRow(NamedTuple):
+    """A WeeklyProgress row as plain values."""
+    id: int
+    project_id: int
+    week_number: int
+    year: Optional[int]
+    planned_progress: Optional[int]
+    actual_progress: Optional[int]
+    planned_description: Optional[str]
+    actual_description: Optional[str]
+    actual_hours: Optional[float]
+    meeting_date: Optional[date]
+    meeting_id: Optional[int]
+
+    def as_json(self) -> Dict:
+        data = self._asdict()
+        if self.meeting_date is not None:
+            data["meeting_date"] = self.meeting_date.isoformat()
+        return data
+
+
+WEEK_COLUMNS = tuple(getattr(WP, name) for name in WeekRow._fields)
+
+
+def select_weeks(*criteria):
+    """Core select of WeekRow columns, ordered by week_number."""
+    return select(*WEEK_COLUMNS).where(*criteria).order_by(WP.week_number)
+
+
+def week_rows(result) -> List[WeekRow]:
+    return [WeekRow._make(row) for row in result]
+
+
+class WeekCell(NamedTuple):
+    """One week of a bar, placed on the timeline."""
+    grid_start: int
+    grid_span: int
+    progress: Optional[int]
+    description: Optional[str]
+    week: int
+    year: Optional[int]
+    actual_hours: Optional[float]
+    planned_progress: Optional[int]
+    planned_description: Optional[str]
+    week_start: date
+    week_end: date
+    has_content: bool
+
+
+class Bar:
+    """A planned bar over rows[first:last + 1], which share a planned description."""
+    __slots__ = ("name", "start", "end", "first", "last", "weeks", "status", "grid_start", "grid_span", "actuals")
+
+    def __init__(self, name: Optional[str], week: Week, index: int):
+        self.name = name
+        self.start = week.start
+        self.end = week.end
+        self.first = self.last = index
+        self.weeks = [week]  # the ISO week of each row, in order
+        self.status = "Planned"  # Could derive from actual vs planned
+        self.grid_start = self.grid_span = None
+        self.actuals: List[WeekCell] = []
+
+
+def group_weeks(rows: Sequence[WeekRow], year: int) -> List[Bar]:
+    """Planned bars from rows sorted by week_number."""
+    bars = []
+    current = None
+    for i, row in enumerate(rows):
+        week = project_week(year, row.week_number)
+        if current and current.name == row.planned_description and (week.start - current.end).days <= 7:
+            # Extend current bar
+            current.end = week.end
+            current.last = i
+            current.weeks.append(week)
+        else:
+            current = Bar(row.planned_description, week, i)
+            bars.append(current)
+    return bars
+
+
+def _has_content(row: WeekRow) -> bool:
+    return bool(row.actual_description or (row.actual_progress or 0) > 0)
+
+
+def _placer(timeline: Dict, view_mode: str) -> Callable[[Week], Tuple[int, int]]:
+    """(grid_start, grid_span) of a week, computed once per week."""
+    positions = {}
+    origin = timeline['start_date']
+
+    def place(week: Week):
+        position = positions.get(week)
+        if position is None:
+            position = positions[week] = calculate_grid_position(week.start, week.end, origin, view_mode)
+        return position
+
+    return place
+
+
+def _visible(start_idx: int, span: int, total_units: int) -> bool:
+    return start_idx + span - 1 >= 1 and start_idx <= total_units
+
+
+def place_bars(bars: List[Bar], rows: Sequence[WeekRow], timeline: Dict, view_mode: str,
+               place: Optional[Callable] = None) -> List[Bar]:
+    """
+    Sets grid_start / grid_span on the bars that overlap the timeline, and
+    their visible weeks as bar.actuals. Positions are not clipped.
+    """
+    place = place or _placer(timeline, view_mode)
+    total = timeline['total_units']
+    placed = []
+    for bar in bars:
+        start_idx = place(bar.weeks[0])[0]
+        last_start, last_span = place(bar.weeks[-1])
+        span = last_start + last_span - start_idx
+        if not _visible(start_idx, span, total):
+            continue
+        bar.grid_start, bar.grid_span = start_idx, span
+
+        for row, week in zip(rows[bar.first:bar.last + 1], bar.weeks):
+            a_start, a_span = place(week)
+            if _visible(a_start, a_span, total):
+                bar.actuals.append(WeekCell(
+                    a_start, a_span, row.actual_progress, row.actual_description, row.week_number, row.year,
+                    row.actual_hours, row.planned_progress, row.planned_description, week.start, week.end,
+                    _has_content(row),
+                ))
+        placed.append(bar)
+    return placed
+
+
+def window_predicate(years: Iterable[int], start: date, end: date):
+    """
+    SQL predicate on WeeklyProgress (year, week_number) for the rows whose
+    week overlaps [start, end], one week_number range per project year.
+    """
+    return or_(*[
+        and_(WP.year == year, WP.week_number.between(week_number_in(year, start), week_number_in(year, end)))
+        for year in sorted(set(years))
+    ])
+
+
+def _clip(start_idx: int, span: int, total_units: int) -> Tuple[int, int]:
+    first = max(1, start_idx)
+    return first, min(total_units, start_idx + span - 1) - first + 1
+
+
+def portfolio(db: Session, view_mode: str, focus_date: date, project_ids: Optional[Sequence[int]] = None) -> Dict:
+    """
+    Compact Gantt for many projects (active ones unless project_ids is given),
+    loading only the weeks inside the window. Bars are clipped to the window:
+    bars [grid_start, grid_span, description], weeks [grid_start, grid_span,
+    week_number, actual_progress, actual_hours, has_content].
+    """
+    P = models.Project
+    timeline = calculate_timeline(view_mode, focus_date)
+    total = timeline['total_units']
+
+    query = select(P.id, P.name, P.status).order_by(P.id)
+    if project_ids is not None:
+        query = query.where(P.id.in_(project_ids))
+    else:
+        query = query.where(or_(P.status.is_(None), P.status.notin_(INACTIVE_STATUSES)))
+    projects = db.execute(query).all()
+
+    chart = {
+        "view_mode": view_mode,
+        "start_date": timeline['start_date'],
+        "end_date": timeline['end_date'],
+        "headers": [h['label'] for h in timeline['headers']],
+        "projects": [],
+    }
+    if not projects:
+        return chart
+
+    ids = [p.id for p in projects]
+    years = db.execute(select(WP.year).where(WP.project_id.in_(ids), WP.year.isnot(None)).distinct()).scalars().all()
+    runs = {pid: {} for pid in ids}  # project -> year -> rows
+    if years:
+        rows = db.execute(
+            select_weeks(WP.project_id.in_(ids), window_predicate(years, timeline['start_date'], timeline['end_date']))
+            .order_by(None).order_by(WP.project_id, WP.year, WP.week_number)
+        )
+        for row in week_rows(rows):
+            runs[row.project_id].setdefault(row.year, []).append(row)
+
+    # Every project shares the window's weeks, so each week is placed once
+    place = _placer(timeline, view_mode)
+    for p in projects:
+        bars, cells = [], []
+        # A project's weeks normally share one year; group each year's run separately
+        for year, rows in sorted(runs[p.id].items()):
+            for bar in place_bars(group_weeks(rows, year), rows, timeline, view_mode, place):
+                bars.append([*_clip(bar.grid_start, bar.grid_span, total), bar.name])
+                cells.extend(
+                    [*_clip(cell.grid_start, cell.grid_span, total), cell.week, cell.progress or 0,
+                     cell.actual_hours or 0.0, cell.has_content]
+                    for cell in bar.actuals
+                )
+        chart["projects"].append({"id": p.id, "name": p.name, "status": p.status, "bars": bars, "weeks": cells})
+    return chart
@@ -0,0 +1,599 @@
+"""
+Import of PROJECT_EXPORT_v1 Markdown (POST /api/sync/import), in three stages:
+
+- parse: the upload, read and decoded in chunks, line by line into one
+  ParsedProject tuple at a time (parse_stream), without touching the
+  database. Malformed values (a non-numeric year, a bad key date) raise
+  ImportFormatError.
+- resolve: the engineers and projects the file refers to are loaded with a
+  few IN queries into maps, and the file's log fingerprints
+  (app.log_fingerprint) looked up on the project_logs index; each parsed
+  project becomes a Resolved entry saying which project it creates or
+  updates, with what, and which logs are new.
+- write: engineers and projects are flushed in bulk, logs inserted and weeks
+  upserted with one executemany per statement, then the rollup and the
+  project totals are recomputed for the touched projects.
+
+Projects go through resolve and write IMPORT_BATCH at a time, so memory is
+bounded by a batch rather than the file. All batches are one transaction,
+rolled back if anything fails. The result is the same as importing the
+projects one by one in file order.
+"""
+import codecs
+import itertools
+import math
+import multiprocessing
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import case, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app import models, rollup
+from app.crud import recompute_totals, touch, upsert_weekly_progress
+from app.log_fingerprint import content_hash
+
+MARKDOWN_HEADER = "# PROJECT_EXPORT_v1"
+PROJECT_PREFIX = "## Project:"
+HEADER_WINDOW = 50  # the header must start within the first 50 characters
+
+READ_SIZE = 1 << 20  # bytes read from the upload at a time
+IMPORT_BATCH = 200  # projects resolved and written together
+PARSE_TASK = 200  # projects parsed per worker task
+PARSE_WORKERS = int(os.environ.get("IMPORT_PARSE_WORKERS", min(4, os.cpu_count() or 1)))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+WP = models.WeeklyProgress
+
+HASH_BATCH = 500  # fingerprints per IN query
+
+# "Key Dates" entries -> Project columns
+KEY_DATES = {"Start": "start_date", "PredictedEnd": "predicted_end_date", "Kickoff": "kickoff_date",
+             "Closure": "closure_date"}
+
+
+class ImportFormatError(ValueError):
+    """The document is not a PROJECT_EXPORT_v1 file, or a value in it is malformed."""
+
+
+class ParsedWeek(NamedTuple):
+    week: int
+    planned: float
+    actual: float
+    hours: float
+    desc: str
+
+
+class ParsedLog(NamedTuple):
+    date: str
+    content: str
+
+
+class ParsedProject(NamedTuple):
+    name: str
+    info: Dict  # id, year, cft, status, request_unit, lead, desc, meeting_day, meeting_time, KEY_DATES keys
+    weeks: List[ParsedWeek]
+    logs: List[ParsedLog]
+    errors: List[str]  # validation problems; such a project is never written
+
+
+# Parse
+
+def _safe_float(val: str, default: Optional[float] = 0.0) -> Optional[float]:
+    try:
+        number = float(val)
+    except ValueError:
+        return default
+    return number if math.isfinite(number) else default
+
+
+def _cell(val: str, week: str, errors: List[str]) -> float:
+    """A numeric weekly column; '-' reads as 0."""
+    if val == "-":
+        return 0.0
+    number = _safe_float(val, None)
+    if number is None:
+        errors.append(f"Weekly Progress week {week}: '{val}' is not a number")
+        return 0.0
+    return number
+
+
+def parse_section(name: str, lines: Iterable[str]) -> ParsedProject:
+    """One project: its name and the lines after its "## Project:" line."""
+    # Extract basic info
+    info = {}
+    current_section = "info"
+    weeks = []
+    logs = []
+    errors = []
+
+    for line in lines:
+        line = line.strip()
+        if line.startswith("### Weekly Progress"):
+            current_section = "weekly"
+            continue
+        elif line.startswith("### Meeting Logs"):
+            current_section = "logs"
+            continue
+        # "---" also separates logs, so it does not end the section;
+        # "## Project:" lines separate projects.
+
+        if current_section == "info":
+            clean_line = line.lstrip("-* ").strip()
+            if clean_line.startswith("ID:"): info['id'] = clean_line.split(":", 1)[1].strip()
+            elif clean_line.startswith("Year:"):
+                year = clean_line.split(":", 1)[1].strip()
+                if year.isdigit(): info['year'] = int(year)
+                else: errors.append(f"Year: '{year}' is not a year")
+            elif clean_line.startswith("CFT Unit:"): info['cft'] = clean_line.split(":", 1)[1].strip()
+            elif clean_line.startswith("Status:"): info['status'] = clean_line.split(":", 1)[1].strip()
+            elif clean_line.startswith("Request Unit:"): info['request_unit'] = clean_line.split(":", 1)[1].strip()
+            elif clean_line.startswith("需求窗口:"): info['request_unit'] = clean_line.split(":", 1)[1].strip()
+            elif clean_line.startswith("Lead Engineer:"): info['lead'] = clean_line.split(":", 1)[1].strip()
+            elif clean_line.startswith("Description:"): info['desc'] = clean_line.split(":", 1)[1].strip()
+            elif clean_line.startswith("Key Dates:"):
+                for part in clean_line.split(":", 1)[1].split(","):
+                    if "=" in part:
+                        k, _, v = part.partition("=")
+                        info[k.strip()] = v.strip()
+            elif clean_line.startswith("Schedule:"):
+                # Day=[Mon], Time=[10:00]
+                m_day = re.search(r"Day=\[(.*?)\]", line)
+                m_time = re.search(r"Time=\[(.*?)\]", line)
+                if m_day: info['meeting_day'] = m_day.group(1)
+                if m_time: info['meeting_time'] = m_time.group(1)
+
+        elif current_section == "weekly":
+            if line.startswith("|") and not "Planned" in line and not line.startswith("|--") and not line.startswith("| --"):
+                cols = [c.strip() for c in line.split("|") if c.strip()]
+                if len(cols) >= 5:
+                    week = _safe_float(cols[0], None)
+                    if week is None or week < 1:
+                        errors.append(f"Weekly Progress: '{cols[0]}' is not a week number")
+                        continue
+                    weeks.append(ParsedWeek(
+                        int(week), _cell(cols[1], cols[0], errors), _cell(cols[2], cols[0], errors),
+                        _cell(cols[3], cols[0], errors), cols[4],
+                    ))
+
+        elif current_section == "logs":
+            clean_line = line.lstrip("-* ").strip()
+            if clean_line.startswith("Date:"):
+                logs.append(ParsedLog(clean_line.split(":", 1)[1].strip(), ""))
+            elif clean_line.startswith("Content:"):
+                if logs: logs[-1] = logs[-1]._replace(content=clean_line.split(":", 1)[1].strip())
+            elif logs and line and not line.startswith("-") and not line.startswith("*"):
+                # Append multiline content
+                logs[-1] = logs[-1]._replace(content=logs[-1].content + " " + line)
+
+    for key in KEY_DATES:
+        if key in info:
+            try:
+                info[key] = datetime.strptime(info[key], '%Y-%m-%d').date()
+            except ValueError:
+                errors.append(f"Key Dates: {key}={info.pop(key)} is not a YYYY-MM-DD date")
+    return ParsedProject(name, info, weeks, logs, errors)
+
+
+def _parse_sections(sections: List[Tuple[str, List[str]]]) -> List[ParsedProject]:
+    return [parse_section(name, lines) for name, lines in sections]
+
+
+def read_chunks(file: BinaryIO, size: int = READ_SIZE) -> Iterator[bytes]:
+    while True:
+        chunk = file.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """
+    Lines of UTF-8 bytes arriving in chunks, decoded incrementally (a
+    character may straddle two chunks). Raises UnicodeDecodeError.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    for chunk in chunks:
+        lines = (pending + decoder.decode(chunk)).split("\n")
+        pending = lines.pop()
+        yield from lines
+    yield pending + decoder.decode(b"", final=True)
+
+
+def _checked_header(lines: Iterator[str]) -> Iterator[str]:
+    """Passes the lines through once the header is found near the start."""
+    head = []
+    for line in lines:
+        head.append(line)
+        if len("\n".join(head).lstrip()) >= HEADER_WINDOW:
+            break
+    # Leading whitespace/BOM aside, the header opens the first 50 characters
+    if MARKDOWN_HEADER not in "\n".join(head).strip()[:HEADER_WINDOW]:
+        raise ImportFormatError("Invalid file format. Header missing.")
+    yield from head
+    yield from lines
+
+
+def iter_sections(lines: Iterable[str]) -> Iterator[Tuple[str, List[str]]]:
+    """(name, lines) of each project; a line starting with "## Project:" opens one, the preamble is skipped."""
+    name, section = None, []
+    for line in lines:
+        stripped = line.lstrip()
+        if stripped.startswith(PROJECT_PREFIX):
+            if name or any(map(str.strip, section)):
+                yield name, section
+            name, section = stripped[len(PROJECT_PREFIX):].strip(), []
+        elif name is not None:
+            section.append(line)
+    if name or any(map(str.strip, section)):
+        yield name, section
+
+
+def _parse_pool(workers: int) -> ProcessPoolExecutor:
+    """Worker processes shared by every import, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def parse_stream(chunks: Iterable[bytes], workers: int = PARSE_WORKERS) -> Iterator[ParsedProject]:
+    """
+    Parses and validates a document arriving as byte chunks, one project at
+    a time in file order. Sections are handed to worker processes PARSE_TASK
+    at a time, with at most two tasks per worker in flight, so only those
+    projects' lines are held whatever the size of the file. A file of a
+    single task is parsed in this process.
+    """
+    tasks = _batches(iter_sections(_checked_header(iter_lines(chunks))), PARSE_TASK)
+    head = [task for task in (next(tasks, None), next(tasks, None)) if task is not None]
+    if workers <= 1 or len(head) < 2:
+        for task in itertools.chain(head, tasks):
+            yield from _parse_sections(task)
+        return
+
+    pool = _parse_pool(workers)
+    pending = deque(pool.submit(_parse_sections, task) for task in head)
+    try:
+        for task in tasks:
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+            pending.append(pool.submit(_parse_sections, task))
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+# Resolve
+
+class Resolved(NamedTuple):
+    parsed: ParsedProject
+    project: models.Project  # loaded, or new (transient) when created
+    created: bool
+    lead: Optional[models.Engineer]
+    fields: Dict  # Project columns to set, besides lead_engineer_id
+    new_logs: List[str]  # ProjectLog contents to insert
+
+
+def _stored_log(log: ParsedLog) -> str:
+    """ProjectLog content of an imported log."""
+    return f"[{log.date}] {log.content}"
+
+
+def _project_id(info: Dict) -> Optional[int]:
+    if info.get('id') and info['id'] != 'New':
+        try:
+            return int(info['id'])
+        except ValueError:
+            pass  # ID is not an integer (e.g., custom code), matched by name instead
+    return None
+
+
+class ResolveState(NamedTuple):
+    """Lookups carried from one batch to the next when nothing is written in between (dry_run)."""
+    engineers: Dict[str, models.Engineer]
+    by_id: Dict[int, models.Project]
+    by_name: Dict[str, models.Project]
+    seen: Set[Tuple[models.Project, str]]
+
+
+def resolve(db: Session, parsed: List[ParsedProject], state: Optional[ResolveState] = None) -> List[Resolved]:
+    engineers, by_id, by_name, seen = state or ResolveState({}, {}, {}, set())
+    lead_names = list(dict.fromkeys(
+        p.info['lead'] for p in parsed if p.info.get('lead') and p.info['lead'] != 'None'
+    ))
+    for e in db.execute(select(models.Engineer).where(
+        models.Engineer.name.in_([name for name in lead_names if name not in engineers])
+    )).scalars():
+        engineers[e.name] = e
+    for name in lead_names:
+        if name not in engineers:  # created in file order
+            engineers[name] = models.Engineer(name=name)
+
+    P = models.Project
+    ids = {pid for pid in (_project_id(p.info) for p in parsed) if pid is not None and pid not in by_id}
+    names = {p.name for p in parsed if p.name not in by_name}
+    for project in db.execute(select(P).where(or_(P.id.in_(ids), P.name.in_(names))).order_by(P.id)).scalars():
+        by_id[project.id] = project
+        by_name.setdefault(project.name, project)  # the first match, as a lookup by name returns
+
+    # Fingerprints of the file's logs that their projects already have
+    candidates = list({
+        content_hash(project.id, _stored_log(log))
+        for p in parsed for project in [by_id.get(_project_id(p.info)) or by_name.get(p.name)] if project
+        for log in p.logs
+    })
+    L = models.ProjectLog
+    for i in range(0, len(candidates), HASH_BATCH):
+        for pid, h in db.execute(
+            select(L.project_id, L.content_hash).where(L.content_hash.in_(candidates[i:i + HASH_BATCH]))
+        ):
+            if pid in by_id:
+                seen.add((by_id[pid], h))
+
+    resolved = []
+    for p in parsed:
+        info = p.info
+        lead = engineers[info['lead']] if info.get('lead') in lead_names else None
+        project = by_id.get(_project_id(info)) or by_name.get(p.name)
+        created = project is None
+        if created:
+            project = by_name[p.name] = models.Project(name=p.name)
+            fields = {
+                "year": info.get('year', 2025),
+                "cft_unit": info.get('cft', 'Unknown'),
+                "request_unit": info.get('request_unit'),
+                "status": info.get('status', 'Planning'),
+                "description": info.get('desc'),
+            }
+        else:
+            fields = {}
+            # Weeks are keyed on the year; a legacy project without one takes the file's
+            if project.year is None: fields["year"] = info.get('year', 2025)
+            if 'cft' in info: fields["cft_unit"] = info['cft']
+            if info.get('request_unit'): fields["request_unit"] = info['request_unit']
+            if 'status' in info: fields["status"] = info['status']
+            if 'desc' in info: fields["description"] = info['desc']
+        for key, column in KEY_DATES.items():
+            if key in info: fields[column] = info[key]
+        if 'meeting_day' in info: fields["meeting_day"] = info['meeting_day']
+        if 'meeting_time' in info: fields["meeting_time"] = info['meeting_time']
+
+        # A log is new unless the project has one with the same fingerprint.
+        # A file's own logs only count for the projects after it, as when
+        # each project was committed on its own. New projects have no id yet,
+        # their fingerprints here use 0.
+        logs = [(content, content_hash(project.id or 0, content)) for content in map(_stored_log, p.logs)]
+        new_logs = [content for content, h in logs if (project, h) not in seen]
+        resolved.append(Resolved(p, project, created, lead, fields, new_logs))
+        seen.update((project, h) for _, h in logs)
+    return resolved
+
+
+# Write
+
+def _table_rows(r: Resolved, year: int) -> List[Dict]:
+    return [{
+        "project_id": r.project.id,
+        "week_number": row.week,
+        "year": year,
+        "planned_progress": row.planned,
+        "actual_progress": row.actual,
+        "actual_hours": row.hours,
+        "planned_description": row.desc,
+    } for row in r.parsed.weeks]
+
+
+def _table_update(excluded):
+    # Reported weeks (actual > 0) carry the actual description, others the plan
+    return {
+        "planned_progress": excluded.planned_progress,
+        "actual_progress": excluded.actual_progress,
+        "actual_hours": excluded.actual_hours,
+        "actual_description": case(
+            (excluded.actual_progress > 0, excluded.planned_description),
+            else_=WP.actual_description,
+        ),
+        "planned_description": case(
+            (excluded.actual_progress > 0, WP.planned_description),
+            else_=excluded.planned_description,
+        ),
+    }
+
+
+def _log_week_rows(r: Resolved) -> List[Dict]:
+    """Each dated log is copied into the actual description of its ISO week."""
+    rows = []
+    for log in r.parsed.logs:
+        try:
+            iso_year, iso_week, _ = datetime.strptime(log.date, '%Y-%m-%d').date().isocalendar()
+        except ValueError:
+            continue  # Invalid date format, skip sync
+        rows.append({
+            "project_id": r.project.id,
+            "week_number": iso_week,
+            "year": iso_year,
+            "planned_progress": 0,  # Unknown
+            "actual_progress": 0,  # Unknown, just logging info
+            "actual_description": f"[Meeting {log.date}] {log.content}",
+        })
+    return rows
+
+
+def _log_week_update(excluded):
+    # Creates the week if the markdown table missed it, otherwise fills or
+    # appends to its actual description; skipped when the log's content is
+    # already there so re-imports stay idempotent. The content is what follows
+    # "[Meeting <date>] " in the incoming description.
+    content = func.substr(excluded.actual_description, func.instr(excluded.actual_description, "] ") + 2)
+    return {
+        "actual_description": case(
+            (func.coalesce(WP.actual_description, "") == "", excluded.actual_description),
+            (func.instr(WP.actual_description, content) > 0, WP.actual_description),
+            else_=WP.actual_description + "\n" + excluded.actual_description,
+        ),
+    }
+
+
+def _segments(resolved: List[Resolved]) -> List[List[Resolved]]:
+    """
+    Splits the file into runs without a repeated project. Within a run the
+    week upserts of all projects can share a statement; a project that comes
+    back starts a new run, so its second section applies after the first.
+    """
+    segments, current, seen = [], [], set()
+    for r in resolved:
+        if r.project in seen:
+            segments.append(current)
+            current, seen = [], set()
+        current.append(r)
+        seen.add(r.project)
+    if current:
+        segments.append(current)
+    return segments
+
+
+def _batches(items: Iterable, size: int) -> Iterator[List]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write(db: Session, resolved: List[Resolved]) -> List[str]:
+    """Applies resolved projects; flushes but does not commit. Returns the import log."""
+    db.add_all(dict.fromkeys(r.lead for r in resolved if r.lead is not None and r.lead.id is None))
+    db.flush()
+
+    messages = []
+    for r in resolved:
+        if r.created:
+            db.add(r.project)
+        for column, value in r.fields.items():
+            setattr(r.project, column, value)
+        r.project.lead_engineer_id = r.lead.id if r.lead is not None else None
+        messages.append(f"{'Created' if r.created else 'Updated'} Project: {r.parsed.name}")
+    db.flush()
+
+    logs = [
+        {"project_id": r.project.id, "content": content, "content_hash": content_hash(r.project.id, content)}
+        for r in resolved for content in r.new_logs
+    ]
+    if logs:
+        db.execute(insert(models.ProjectLog), logs)
+
+    for segment in _segments(resolved):
+        upsert_weekly_progress(db, [row for r in segment for row in _table_rows(r, r.project.year)],
+                               update=_table_update)
+        upsert_weekly_progress(db, [row for r in segment for row in _log_week_rows(r)], update=_log_week_update)
+
+    # Weekly hours and the lead engineer may both have changed
+    projects = list({r.project: None for r in resolved})
+    rollup.rebuild(db, [p.id for p in projects])
+    recompute_totals(db, projects)
+    for project in projects:
+        touch(project)
+    db.flush()
+    return messages
+
+
+def import_markdown(db: Session, chunks: Iterable[bytes]) -> List[str]:
+    """
+    Parses, resolves and writes a document IMPORT_BATCH projects at a time, in
+    one transaction; nothing is kept if any stage fails, including a parse,
+    validation or decoding error further down the file.
+    """
+    messages = []
+    try:
+        for batch in _batches(parse_stream(chunks), IMPORT_BATCH):
+            for p in batch:
+                if p.errors:
+                    raise ImportFormatError(f"Project '{p.name}': {'; '.join(p.errors)}")
+            messages.extend(write(db, resolve(db, batch)))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return messages
+
+
+# Dry run
+
+def _diff(db: Session, resolved: List[Resolved], weeks: Dict, shadow: Dict) -> List[Dict]:
+    """
+    Per project, what write() would change. weeks holds the (year, week)
+    keys each project has, loaded on first sight; shadow the values set by
+    earlier sections of the file, so a repeated project diffs against them.
+    """
+    loaded = {r.project.id: r.project for r in resolved if not r.created and r.project not in weeks}
+    for project in loaded.values():
+        weeks[project] = set()
+    for ids in _batches(loaded, HASH_BATCH):
+        for pid, year, week in db.execute(
+            select(WP.project_id, WP.year, WP.week_number).where(WP.project_id.in_(ids))
+        ):
+            weeks[loaded[pid]].add((year, week))
+
+    lead_ids = {r.project.lead_engineer_id for r in resolved if not r.created} - {None}
+    lead_names = dict(db.execute(
+        select(models.Engineer.id, models.Engineer.name).where(models.Engineer.id.in_(lead_ids))
+    ).all()) if lead_ids else {}
+
+    report = []
+    for r in resolved:
+        before = shadow.setdefault(r.project, {} if r.created else {
+            **{column: getattr(r.project, column) for column in r.fields},
+            "lead_engineer": lead_names.get(r.project.lead_engineer_id),
+        })
+        after = {**r.fields, "lead_engineer": r.lead.name if r.lead is not None else None}
+        changes = {}
+        for column, value in after.items():
+            old = before[column] if column in before else (None if r.created else getattr(r.project, column))
+            if old != value:
+                changes[column] = [old, value]
+        before.update(after)
+
+        year = before["year"] if "year" in before else r.project.year
+        known = weeks.setdefault(r.project, set())
+        keys = {(row["year"], row["week_number"]) for row in _table_rows(r, year) + _log_week_rows(r)}
+        report.append({
+            "name": r.parsed.name,
+            "action": "create" if r.created else "update",
+            "project_id": r.project.id,
+            "changes": changes,
+            "weeks": {"new": len(keys - known), "existing": len(keys & known)},
+            "logs": {"new": len(r.new_logs), "duplicate": len(r.parsed.logs) - len(r.new_logs)},
+            "errors": r.parsed.errors,
+        })
+        known |= keys
+    return report
+
+
+def dry_run(db: Session, chunks: Iterable[bytes]) -> Dict:
+    """
+    What import_markdown would do with a document, without writing anything:
+    per project, whether it is created or updated, the columns that change
+    ([old, new]), how many of its weeks are new or already there, how many
+    logs are new or duplicates, and its validation errors. Raises
+    ImportFormatError or UnicodeDecodeError as the import would.
+    """
+    state = ResolveState({}, {}, {}, set())
+    weeks, shadow, report = {}, {}, []
+    for batch in _batches(parse_stream(chunks), IMPORT_BATCH):
+        report.extend(_diff(db, resolve(db, batch, state), weeks, shadow))
+    return {"status": "dry_run", "valid": not any(p["errors"] for p in report), "projects": report}
@@ -0,0 +1,266 @@
+"""
+Background jobs: long imports, exports and reports run outside the request.
+
+A job is a row of the jobs table (models.Job) plus a directory under
+JOB_DIR holding its upload ("input") and its result file ("result"). The
+table lives in a database of its own, JOB_DATABASE_URL (default
+JOB_DIR/jobs.db): a long import holds the main database's single writer
+for its whole transaction, and queuing, cancelling or finishing a job must
+not wait for it. Jobs run in this process, on one thread pool per job type
+whose size is the type's concurrency cap: JOB_CONCURRENCY_<TYPE> (e.g.
+JOB_CONCURRENCY_EXPORT=4) or the default given to register(). Their state
+changes are written by the job threads; the progress of a running job is
+kept in memory and only stored when it ends.
+
+The routers register the job types (sync.py: import and export, reports.py:
+report). Jobs still queued or running when the process stopped are marked
+failed by recover() on the next start, which also removes finished jobs
+older than JOB_RETENTION_DAYS (default 7) with their files.
+"""
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import models
+from app.database import JobBase, create_engines
+
+JOB_DIR = os.environ.get("JOB_DIR", "data/jobs")
+JOB_DATABASE_URL = os.environ.get("JOB_DATABASE_URL", f"sqlite:///{JOB_DIR}/jobs.db")
+JOB_RETENTION_DAYS = int(os.environ.get("JOB_RETENTION_DAYS", "7"))
+UNFINISHED = ("queued", "running")
+SAVE_ATTEMPTS = 8  # each waits up to the jobs writer pool's timeout (30 s)
+
+job_engine, job_read_engine = create_engines(JOB_DATABASE_URL)
+JobSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=job_engine)
+JobReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=job_read_engine)
+
+logger = logging.getLogger(__name__)
+
+J = models.Job
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobContext:
+    """What a running job sees: its parameters, files, progress and cancellation."""
+
+    def __init__(self, job_id: int, params: Dict):
+        self.job_id = job_id
+        self.params = params
+        self.dir = os.path.join(JOB_DIR, str(job_id))
+        self.input_path = os.path.join(self.dir, "input")
+        self.result_path = os.path.join(self.dir, "result")
+        self.progress = 0.0
+        self.message: Optional[str] = None
+        self.cancelled = threading.Event()
+        self.future: Optional[Future] = None
+
+    def check(self):
+        if self.cancelled.is_set():
+            raise JobCancelled()
+
+    def report(self, done: float, total: float, message: Optional[str] = None):
+        """Records progress (capped below 100 until the job ends); raises JobCancelled once cancelled."""
+        self.check()
+        self.progress = min(99.0, 100.0 * done / total) if total else 0.0
+        if message is not None:
+            self.message = message
+
+    def track(self, chunks: Iterable[bytes], total: int) -> Iterator[bytes]:
+        """Passes byte chunks through, reporting the share of `total` bytes read."""
+        done = 0
+        for chunk in chunks:
+            done += len(chunk)
+            self.report(done, total)
+            yield chunk
+
+
+class JobType(NamedTuple):
+    # Runs the job, writes ctx.result_path; returns (download filename, media type)
+    run: Callable[[JobContext], Tuple[str, str]]
+    concurrency: int
+    # Checks and normalizes the submitted parameters; raises ValueError
+    validate: Callable[[Dict], Dict]
+    needs_file: bool
+
+
+JOB_TYPES: Dict[str, JobType] = {}
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_active: Dict[int, JobContext] = {}  # queued or running in this process
+_lock = threading.Lock()
+
+
+def get_job_db():
+    """Session on the jobs database's writer."""
+    db = JobSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_job_read_db():
+    """Session on the jobs database's read-only reader pool."""
+    db = JobReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def create_tables():
+    """Creates the jobs database and its table; run at startup."""
+    os.makedirs(JOB_DIR, exist_ok=True)
+    JobBase.metadata.create_all(bind=job_engine)
+
+
+def register(name: str, run: Callable[[JobContext], Tuple[str, str]], concurrency: int = 1,
+             validate: Callable[[Dict], Dict] = dict, needs_file: bool = False):
+    concurrency = int(os.environ.get(f"JOB_CONCURRENCY_{name.upper()}", concurrency))
+    JOB_TYPES[name] = JobType(run, max(1, concurrency), validate, needs_file)
+
+
+def _executor(name: str) -> ThreadPoolExecutor:
+    with _lock:
+        if name not in _executors:
+            _executors[name] = ThreadPoolExecutor(JOB_TYPES[name].concurrency, thread_name_prefix=f"job-{name}")
+        return _executors[name]
+
+
+def _save(job_id: int, **values) -> bool:
+    """
+    Writes a state change from a job thread. A busy jobs database is retried
+    SAVE_ATTEMPTS times with a growing pause; after that the change is
+    logged and dropped, and False is returned.
+    """
+    for attempt in range(SAVE_ATTEMPTS):
+        try:
+            with JobSessionLocal() as db:
+                db.execute(update(J).where(J.id == job_id).values(**values))
+                db.commit()
+            return True
+        except (PoolTimeoutError, OperationalError) as e:
+            error = e
+            time.sleep(min(2 ** attempt, 30))
+    logger.error("Job %s: could not record %s after %d attempts: %s", job_id, values, SAVE_ATTEMPTS, error)
+    return False
+
+
+def submit(db: Session, name: str, params: Dict, upload: Optional[BinaryIO] = None) -> models.Job:
+    """
+    Queues a job, recording it through `db` (a jobs database session).
+    Raises ValueError for an unknown type, invalid parameters or a missing
+    upload.
+    """
+    if name not in JOB_TYPES:
+        raise ValueError(f"Unknown job type '{name}' (expected one of {', '.join(sorted(JOB_TYPES))})")
+    if not isinstance(params, dict):
+        raise ValueError("params must be a JSON object")
+    job_type = JOB_TYPES[name]
+    if job_type.needs_file and upload is None:
+        raise ValueError(f"A '{name}' job needs a file")
+    params = job_type.validate(params)
+
+    job = models.Job(type=name, status="queued", params_json=json.dumps(params))
+    db.add(job)
+    db.commit()
+
+    ctx = JobContext(job.id, params)
+    os.makedirs(ctx.dir, exist_ok=True)
+    if upload is not None:
+        with open(ctx.input_path, "wb") as f:
+            shutil.copyfileobj(upload, f, 1 << 20)
+    with _lock:
+        _active[job.id] = ctx
+    ctx.future = _executor(name).submit(_run, job.id, job_type)
+    return job
+
+
+def _run(job_id: int, job_type: JobType):
+    ctx = _active[job_id]
+    try:
+        ctx.check()
+        _save(job_id, status="running", started_at=datetime.utcnow())
+        result_name, media_type = job_type.run(ctx)
+    except JobCancelled:
+        _finish(ctx, status="cancelled")
+    except Exception as e:
+        if not isinstance(e, ValueError):  # bad input (e.g. ImportFormatError) is reported as is
+            logger.exception("Job %s (%s) failed", job_id, ctx.params)
+        _finish(ctx, status="failed", error=getattr(e, "detail", None) or str(e) or type(e).__name__)
+    else:
+        _finish(ctx, status="succeeded", progress=100.0,
+                result_name=result_name, result_media_type=media_type)
+
+
+def _finish(ctx: JobContext, **values):
+    values.setdefault("progress", round(ctx.progress, 1))
+    if values["status"] != "succeeded" and os.path.exists(ctx.result_path):
+        os.remove(ctx.result_path)
+    if os.path.exists(ctx.input_path):
+        os.remove(ctx.input_path)
+    # Until its final state is stored the job stays active: GET overlays its
+    # live state and a repeated cancel is not refused
+    if _save(ctx.job_id, message=ctx.message, finished_at=datetime.utcnow(), **values):
+        with _lock:
+            _active.pop(ctx.job_id, None)
+
+
+def live(job_id: int) -> Dict:
+    """In-memory progress of a job running in this process, to overlay on its row."""
+    ctx = _active.get(job_id)
+    if ctx is None:
+        return {}
+    message = "Cancelling" if ctx.cancelled.is_set() else ctx.message
+    return {"progress": round(ctx.progress, 1), "message": message}
+
+
+def cancel(job_id: int) -> bool:
+    """
+    Stops a job: a queued job never starts, a running one stops at its next
+    progress report (an import is rolled back). Only flags the job and
+    returns at once; its final state is stored by a job thread. False when
+    the job is not queued or running in this process.
+    """
+    with _lock:
+        ctx = _active.get(job_id)
+        if ctx is None:
+            return False
+        if ctx.cancelled.is_set():
+            return True
+        ctx.cancelled.set()
+    if ctx.future is not None and ctx.future.cancel():
+        # It never reaches _run: store that on a thread of its own, not the request's
+        threading.Thread(target=_finish, args=(ctx,), kwargs={"status": "cancelled"},
+                         name=f"job-cancel-{job_id}", daemon=True).start()
+    return True
+
+
+def result_path(job: models.Job) -> str:
+    return os.path.join(JOB_DIR, str(job.id), "result")
+
+
+def recover(db: Session):
+    """Fails jobs left unfinished by a previous process and removes expired ones; run at startup."""
+    db.execute(update(J).where(J.status.in_(UNFINISHED)).values(
+        status="failed", error="Interrupted by a server restart", finished_at=datetime.utcnow(),
+    ))
+    cutoff = datetime.utcnow() - timedelta(days=JOB_RETENTION_DAYS)
+    expired = db.execute(select(J.id).where(J.finished_at < cutoff)).scalars().all()
+    for job_id in expired:
+        shutil.rmtree(os.path.join(JOB_DIR, str(job_id)), ignore_errors=True)
+    if expired:
+        db.execute(delete(J).where(J.id.in_(expired)))
+    db.commit()
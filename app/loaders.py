@@ -0,0 +1,61 @@
+"""
+Loader strategies derived from response schemas.
+
+Serializing an ORM object through a response schema touches every relationship
+the schema declares. Without eager loading, each of them is a lazy load per row
+(N+1). `loader_options(Model, Schema)` returns the options that load exactly
+those relationships up front:
+
+- many-to-one (e.g. Project.lead_engineer) -> joinedload, rides along in the main query
+- collections (e.g. Project.weekly_progress) -> selectinload, one IN query per relationship
+
+Nested schemas are followed, so the statement count is constant in the number of rows.
+"""
+from functools import lru_cache
+from typing import Optional, Type, get_args, get_origin
+
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
+
+
+def _schema_of(annotation) -> Optional[Type[BaseModel]]:
+    """Unwraps Optional[...] / List[...] down to a pydantic model, if any."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    if get_origin(annotation) is not None:
+        for arg in get_args(annotation):
+            schema = _schema_of(arg)
+            if schema is not None:
+                return schema
+    return None
+
+
+def relationship_loader(attr, parent=None):
+    """joinedload for many-to-one, selectinload for collections; chained under `parent`."""
+    uselist = attr.property.uselist
+    if parent is None:
+        return selectinload(attr) if uselist else joinedload(attr)
+    return parent.selectinload(attr) if uselist else parent.joinedload(attr)
+
+
+def _walk(model, schema, parent, seen):
+    relationships = inspect(model).relationships
+    for name, field in schema.model_fields.items():
+        if name not in relationships:
+            continue
+        rel = relationships[name]
+        option = relationship_loader(getattr(model, name), parent)
+        child_schema = _schema_of(field.annotation)
+        key = (rel.mapper.class_, child_schema)
+        children = []
+        if child_schema is not None and key not in seen:
+            children = list(_walk(rel.mapper.class_, child_schema, option, seen | {key}))
+        # A chained child option also loads its parent path
+        yield from children or [option]
+
+
+@lru_cache(maxsize=None)
+def loader_options(model, schema: Type[BaseModel]) -> tuple:
+    """Eager-loading options covering every relationship `schema` serializes from `model`."""
+    return tuple(_walk(model, schema, None, frozenset({(model, schema)})))
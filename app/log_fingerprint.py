@@ -0,0 +1,53 @@
+"""
+Content fingerprints of project logs (project_logs.content_hash).
+
+A log's fingerprint is the sha1 of its project, its date and its normalized
+text, so the same meeting note imported twice, or exported and imported back,
+maps to the same value whatever its case, spacing or Unicode form. The date
+is the innermost leading "[YYYY-MM-DD] " tag of the content when there is one
+(imports store logs as "[<date>] <content>", and exporting such a log adds
+another tag), otherwise the day the log was created.
+"""
+import hashlib
+import re
+import unicodedata
+from datetime import date, datetime
+from typing import Optional, Tuple, Union
+
+_DATE_TAG = re.compile(r"\[(\d{4})-(\d{1,2})-(\d{1,2})\] ?")
+
+
+def normalize(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def split_dated(content: str) -> Tuple[Optional[date], str]:
+    """(date of the innermost leading date tag or None, text after the tags)."""
+    day = None
+    pos = 0
+    while True:
+        m = _DATE_TAG.match(content, pos)
+        if not m:
+            break
+        try:
+            day = date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+        except ValueError:
+            break  # not a date; the tag is part of the text
+        pos = m.end()
+    return day, content[pos:]
+
+
+def _day(created_at: Union[datetime, date, str, None]) -> date:
+    if created_at is None:
+        return datetime.utcnow().date()  # as the created_at server default will record it
+    if isinstance(created_at, str):
+        return date.fromisoformat(created_at[:10])
+    if isinstance(created_at, datetime):
+        return created_at.date()
+    return created_at
+
+
+def content_hash(project_id: int, content: Optional[str], created_at: Union[datetime, date, str, None] = None) -> str:
+    day, text = split_dated(content or "")
+    key = f"{project_id}\x1f{(day or _day(created_at)).isoformat()}\x1f{normalize(text)}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
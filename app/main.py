@@ -1,23 +1,46 @@
 from fastapi import FastAPI, Request, Depends, HTTPException
 from datetime import date, datetime
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
-from sqlalchemy.orm import Session
-from app.routers import projects, meetings, sync, reports, pm_tools
-from app.database import engine, Base, get_db
-from app import models
-
-# Create tables
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.routers import projects, meetings, sync, reports, pm_tools, jobs as jobs_api, workload as workload_api, gantt as gantt_api
+from app.database import engine, Base, get_async_read_db
+from app import jobs, models, migrations, templating
+from app.compression import CompressionMiddleware
+from app.fragments import fragment_cache
+from jinja2.utils import htmlsafe_json_dumps
+from markupsafe import Markup
+
+# Create tables, then bring indexes/columns up to date
 Base.metadata.create_all(bind=engine)
+migrations.upgrade(engine)
+
+# Jobs of a previous run cannot resume; expired ones are removed
+jobs.create_tables()
+with jobs.JobSessionLocal() as db:
+    jobs.recover(db)
+
+# Compile every template now rather than on each page's first request
+template_warm_up = templating.warm_up()
 
 app = FastAPI(title="DevManage-Tech", description="Digital Development Section Project Management")
 
+# gzip / brotli for responses over 1 KB
+app.add_middleware(CompressionMiddleware)
+
 # Mount Static Files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Templates
-templates = Jinja2Templates(directory="templates")
+templates = templating.templates
+
+def render_fragment(name: str, **context) -> Markup:
+    return Markup(templates.get_template(name).render(**context))
+
+def fragment_json(data) -> Markup:
+    """Same output as the template's `tojson` filter."""
+    policies = templates.env.policies
+    return htmlsafe_json_dumps(data, dumps=policies["json.dumps_function"], **policies["json.dumps_kwargs"])
 
 # Include Routers
 app.include_router(projects.router)
@@ -25,6 +48,9 @@ app.include_router(meetings.router)
 app.include_router(sync.router)
 app.include_router(reports.router)
 app.include_router(pm_tools.router)
+app.include_router(jobs_api.router)
+app.include_router(workload_api.router)
+app.include_router(gantt_api.router)
 
 @app.get("/", response_class=HTMLResponse)
 async def dashboard(request: Request):
@@ -47,11 +73,14 @@ async def read_reports(request: Request):
     return templates.TemplateResponse("reports.html", {"request": request, "page_title": "定期報告"})
 
 @app.get("/projects/{project_id}", response_class=HTMLResponse)
-async def project_detail(request: Request, project_id: int, view_mode: str = "week", focus_date: str = None, db: Session = Depends(get_db)):
-    from app.utils import calculate_timeline, calculate_grid_position, get_iso_week_start
+async def project_detail(request: Request, project_id: int, view_mode: str = "week", focus_date: str = None, db: AsyncSession = Depends(get_async_read_db)):
+    from app.gantt import group_weeks, place_bars, select_weeks, week_rows
+    from app.utils import calculate_timeline
     from datetime import date, datetime, timedelta
 
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    # Logs and maintenance logs are paged in by the page itself
+    # (/api/projects/{id}/logs and /maintenance), so only the project row is loaded.
+    project = await db.get(models.Project, project_id)
     if not project:
         return HTMLResponse("Project not found", status_code=404)
     
@@ -66,165 +95,67 @@ async def project_detail(request: Request, project_id: int, view_mode: str = "we
 
     # 2. Calculate Timeline Metadata
     timeline = calculate_timeline(view_mode, f_date)
-    
-    # 3. Fetch Data & Group into "Gantt Bars" (Phases)
-    weekly_data = db.query(models.WeeklyProgress).filter(models.WeeklyProgress.project_id == project_id).order_by(models.WeeklyProgress.week_number).all()
-    
-    gantt_bars = []
-    current_bar = None
-    
-    # Sort just in case
-    # weekly_data is sorted by week_number.
-    
-    for w in weekly_data:
-        # Calculate Week's Date Range based on Project Year
-        # Assuming ISO weeks:
-        # Simple approximation: Jan 1st + (weeks-1)*7
-        # Better: use project.year
-        pyear = project.year or f_date.year
-        # We need a robust week->date generic function. 
-        # For this prototype, I'll use simple ISO calculation:
-        # Jan 4th is always in week 1
-        jan4 = date(pyear, 1, 4)
-        start_of_year = jan4 - timedelta(days=jan4.weekday()) # Monday of Week 1
-        week_start = start_of_year + timedelta(weeks=w.week_number - 1)
-        week_end = week_start + timedelta(days=6)
-        
-        # Grouping Logic: Same Description + Consecutive
-        desc = w.planned_description
-        
-        if current_bar and current_bar['name'] == desc and (week_start - current_bar['end']).days <= 7:
-            # Extend current bar
-            current_bar['end'] = week_end
-            current_bar['weeks'].append(w)
-        else:
-            # Finish prev bar
-            if current_bar:
-                gantt_bars.append(current_bar)
-            
-            # Start new bar
-            current_bar = {
-                "name": desc,
-                "start": week_start,
-                "end": week_end,
-                "weeks": [w],
-                "status": "Planned" # Could derive from actual vs planned
-            }
-            
-    if current_bar:
-        gantt_bars.append(current_bar)
-
-    # 4. Calculate Grid Positions for Bars
-    final_bars = []
-    for bar in gantt_bars:
-        # Clamp dates or calculate positions? 
-        # calculate_grid_position returns indices relative to View Start.
-        # If bars are WAY out, indices will be negative or > total_units.
-        start_idx, span = calculate_grid_position(bar['start'], bar['end'], timeline['start_date'], view_mode)
-        
-        # Check if visible
-        # Visible if EndIdx >= 1 AND StartIdx <= Total
-        end_idx = start_idx + span - 1
-        if end_idx >= 1 and start_idx <= timeline['total_units']:
-            # Clip for display if needed, but CSS Grid handles overflow hidden often.
-            # However, simpler to clamp Start to 1 if < 1, and adjust span
-            
-            visible_start = max(1, start_idx)
-            # Reduction in start means reduction in span
-            # If start_idx was -5 (6 units left), and we became 1, we cut 6 units.
-            # span should reduce by (visible_start - start_idx) if start_idx < 1?
-            # Actually, standard grid approach:
-            # grid-column: start / span check.
-            
-            bar['grid_start'] = start_idx
-            bar['grid_span'] = span
-
-            # 5. Calculate Actuals Positions (Per Week)
-            bar['actuals'] = []
-            for w in bar['weeks']:
-                # Re-calculate dates for this specific week
-                # (Logic matches the grouping loop)
-                pyear = project.year or f_date.year
-                jan4 = date(pyear, 1, 4)
-                start_of_year = jan4 - timedelta(days=jan4.weekday())
-                w_start = start_of_year + timedelta(weeks=w.week_number - 1)
-                w_end = w_start + timedelta(days=6)
-                
-                a_start, a_span = calculate_grid_position(w_start, w_end, timeline['start_date'], view_mode)
-                
-                # Check visibility
-                if a_start is not None:
-                    a_end_idx = a_start + a_span - 1
-                    if a_end_idx >= 1 and a_start <= timeline['total_units']:
-                        bar['actuals'].append({
-                            'grid_start': a_start,
-                            'grid_span': a_span,
-                            'progress': w.actual_progress,
-                            'description': w.actual_description,
-                            'week': w.week_number,
-                            'year': w.year,
-                            'actual_hours': w.actual_hours,
-                            'planned_progress': w.planned_progress,
-                            'planned_description': w.planned_description,
-                            'has_content': bool(w.actual_description or w.actual_progress > 0)
-                        })
-
-            final_bars.append(bar)
-
-    # Serialize safely for other parts of template
-    safe_weekly_data = []
-    for w in weekly_data:
-        d = w.__dict__.copy()
-        if "_sa_instance_state" in d: del d["_sa_instance_state"]
-        # Handle date serialization recursively or just for all keys
-        for k, v in d.items():
-            if isinstance(v, (date, datetime)):
-                d[k] = str(v)
-        safe_weekly_data.append(d)
-    
+    pyear = project.year or f_date.year
+
+    # 3. The Gantt and the weekly data only change with the project (app/fragments.py)
+    version = (project_id, project.version, project.updated_at)
+    gantt_key = ("gantt", *version, pyear, view_mode, timeline['start_date'])
+    weeks_key = ("weekly_data", *version)
+    gantt_html = fragment_cache.get(gantt_key)
+    weekly_json = fragment_cache.get(weeks_key)
+    if gantt_html is None or weekly_json is None:
+        # Fetch Data (plain tuples) & Group into "Gantt Bars" (Phases), see app/gantt.py
+        weekly_data = week_rows(await db.execute(select_weeks(models.WeeklyProgress.project_id == project_id)))
+        if gantt_html is None:
+            final_bars = place_bars(group_weeks(weekly_data, pyear), weekly_data, timeline, view_mode)
+            gantt_html = fragment_cache.put(gantt_key, render_fragment("projects/gantt.html", gantt={
+                "headers": timeline['headers'],
+                "grid_template": timeline['grid_template'],
+                "bars": final_bars
+            }))
+        if weekly_json is None:
+            weekly_json = fragment_cache.put(weeks_key, fragment_json([w.as_json() for w in weekly_data]))
+
     return templates.TemplateResponse("project_detail.html", {
         "request": request, 
         "page_title": project.name, 
         "project": project,
-        "weekly_data": safe_weekly_data,
+        "weekly_json": weekly_json,
+        "gantt_html": gantt_html,
         # New Context
         "gantt": {
             "view_mode": view_mode,
             "focus_date": f_date,
             "next_date": (f_date + timedelta(days=30)).isoformat(), # Rough jump, frontend can do better logic
             "prev_date": (f_date - timedelta(days=30)).isoformat(),
-            "headers": timeline['headers'],
-            "grid_template": timeline['grid_template'],
-            "bars": final_bars
         }
     })
 
 @app.get("/projects/{project_id}/planning", response_class=HTMLResponse)
-async def project_planning(request: Request, project_id: int, db: Session = Depends(get_db)):
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+async def project_planning(request: Request, project_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    project = await db.get(models.Project, project_id)
     if not project:
          return HTMLResponse("Project not found", status_code=404)
-    
-    weekly_data = db.query(models.WeeklyProgress).filter(models.WeeklyProgress.project_id == project_id).order_by(models.WeeklyProgress.week_number).all()
-    
-    # Serialize safely
-    safe_weekly_data = []
-    for w in weekly_data:
-        d = w.__dict__.copy()
-        if "_sa_instance_state" in d:
-            del d["_sa_instance_state"]
-        for k, v in d.items():
-            if isinstance(v, (date, datetime)):
-                d[k] = str(v)
-        safe_weekly_data.append(d)
+
+    from app.gantt import select_weeks, week_rows
+    rows_key = ("planning_rows", project_id, project.version, project.updated_at)
+    planning_rows = fragment_cache.get(rows_key)
+    if planning_rows is None:
+        weekly_data = week_rows(await db.execute(select_weeks(models.WeeklyProgress.project_id == project_id)))
+        planning_rows = fragment_cache.put(rows_key, render_fragment("projects/planning_rows.html", weekly_data=weekly_data))
 
     return templates.TemplateResponse("project_planning.html", {
         "request": request,
         "page_title": f"Plan: {project.name}",
         "project": project,
-        "weekly_data": safe_weekly_data
+        "planning_rows": planning_rows
     })
 
+@app.get("/api/fragment_cache")
+async def fragment_cache_stats():
+    """Hit / miss / eviction counters and size of the rendered fragment cache."""
+    return fragment_cache.stats()
+
 @app.get("/workload", response_class=HTMLResponse)
 async def workload(request: Request):
     return templates.TemplateResponse("workload.html", {"request": request, "page_title": "Engineer Workload"})
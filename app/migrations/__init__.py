@@ -0,0 +1,129 @@
+"""
+Versioned schema migrations.
+
+Each migration is a module in this package named ``v<NNN>_<slug>.py`` that
+defines ``up(conn)`` and ``down(conn)``. Applied versions are recorded in the
+``schema_migrations`` table. A migration may also list ``EXPLAIN_CHECKS``:
+(sql, index_name) pairs whose query plan must use that index.
+
+Run ``python -m app.migrations --help`` for the command line interface.
+"""
+import importlib
+import pkgutil
+import re
+from datetime import datetime
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import text
+
+_MODULE_RE = re.compile(r"^v(\d{3})_(\w+)$")
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    module: object
+
+    @property
+    def description(self) -> str:
+        return (self.module.__doc__ or self.name).strip().splitlines()[0]
+
+
+def discover() -> List[Migration]:
+    migrations = []
+    for info in pkgutil.iter_modules(__path__):
+        m = _MODULE_RE.match(info.name)
+        if not m:
+            continue
+        module = importlib.import_module(f"{__name__}.{info.name}")
+        migrations.append(Migration(int(m.group(1)), m.group(2), module))
+    migrations.sort(key=lambda m: m.version)
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration versions: {versions}")
+    return migrations
+
+
+def _ensure_version_table(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, name VARCHAR NOT NULL, applied_at DATETIME NOT NULL)"
+    ))
+
+
+def applied_versions(engine) -> List[int]:
+    with engine.begin() as conn:
+        _ensure_version_table(conn)
+        return [row[0] for row in conn.execute(text("SELECT version FROM schema_migrations ORDER BY version"))]
+
+
+def current_version(engine) -> int:
+    versions = applied_versions(engine)
+    return versions[-1] if versions else 0
+
+
+def upgrade(engine, target: Optional[int] = None, echo=None) -> List[Migration]:
+    """Applies every pending migration up to ``target`` (default: latest)."""
+    done = set(applied_versions(engine))
+    applied = []
+    for migration in discover():
+        if target is not None and migration.version > target:
+            break
+        if migration.version in done:
+            continue
+        with engine.begin() as conn:
+            migration.module.up(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:v, :n, :t)"),
+                {"v": migration.version, "n": migration.name, "t": datetime.utcnow()},
+            )
+        if echo:
+            echo(f"Applied {migration.version:03d} {migration.name}")
+        applied.append(migration)
+    return applied
+
+
+def downgrade(engine, target: int, echo=None) -> List[Migration]:
+    """Reverts applied migrations newer than ``target``, newest first."""
+    done = set(applied_versions(engine))
+    reverted = []
+    for migration in reversed(discover()):
+        if migration.version <= target or migration.version not in done:
+            continue
+        with engine.begin() as conn:
+            migration.module.down(conn)
+            conn.execute(text("DELETE FROM schema_migrations WHERE version = :v"), {"v": migration.version})
+        if echo:
+            echo(f"Reverted {migration.version:03d} {migration.name}")
+        reverted.append(migration)
+    return reverted
+
+
+def check_query_plans(engine) -> List[str]:
+    """
+    Runs EXPLAIN QUERY PLAN for the checks of every applied migration.
+    Returns a list of failures (empty when every query uses its index).
+    """
+    done = set(applied_versions(engine))
+    failures = []
+    with engine.connect() as conn:
+        for migration in discover():
+            if migration.version not in done:
+                continue
+            for sql, index_name in getattr(migration.module, "EXPLAIN_CHECKS", []):
+                plan = " | ".join(row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+                if index_name not in plan:
+                    failures.append(f"{migration.version:03d}: {sql!r} does not use {index_name} ({plan})")
+    return failures
+
+
+# Helpers shared by migration modules
+
+def column_names(conn, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(text(f"PRAGMA table_info({table})"))]
+
+
+def add_column(conn, table: str, column: str, type_def: str):
+    """ALTER TABLE ADD COLUMN, skipped when the column already exists."""
+    if column not in column_names(conn, table):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {type_def}"))
@@ -0,0 +1,59 @@
+import argparse
+import logging
+import sys
+
+from app.database import engine, Base
+from app import migrations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.migrations", description="Database schema migrations")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    up = sub.add_parser("up", help="apply pending migrations")
+    up.add_argument("--to", type=int, default=None, help="stop after this version")
+
+    down = sub.add_parser("down", help="revert migrations")
+    group = down.add_mutually_exclusive_group()
+    group.add_argument("--to", type=int, default=None, help="revert everything newer than this version")
+    group.add_argument("--steps", type=int, default=1, help="number of migrations to revert (default: 1)")
+
+    sub.add_parser("status", help="list migrations and whether they are applied")
+    sub.add_parser("check", help="verify that hot queries use their indexes (EXPLAIN QUERY PLAN)")
+
+    args = parser.parse_args(argv)
+    # Migrations report what they changed (e.g. merged rows) through logging
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.command == "up":
+        # Tables themselves still come from the models
+        from app import models  # noqa: F401
+        Base.metadata.create_all(bind=engine)
+        applied = migrations.upgrade(engine, target=args.to, echo=print)
+        if not applied:
+            print("Already up to date.")
+    elif args.command == "down":
+        if args.to is not None:
+            target = args.to
+        else:
+            applied = migrations.applied_versions(engine)
+            target = applied[-args.steps - 1] if len(applied) > args.steps else 0
+        if not migrations.downgrade(engine, target, echo=print):
+            print("Nothing to revert.")
+    elif args.command == "status":
+        done = set(migrations.applied_versions(engine))
+        for m in migrations.discover():
+            mark = "x" if m.version in done else " "
+            print(f"[{mark}] {m.version:03d} {m.name}: {m.description}")
+    elif args.command == "check":
+        failures = migrations.check_query_plans(engine)
+        for failure in failures:
+            print(f"FAIL {failure}")
+        if failures:
+            return 1
+        print("All query plans use their indexes.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
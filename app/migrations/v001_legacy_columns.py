@@ -0,0 +1,23 @@
+"""Columns previously added by migrate_db.py / add_meeting_date_column.py."""
+from app.migrations import add_column
+
+COLUMNS = [
+    ("weekly_progress", "actual_hours", "FLOAT DEFAULT 0"),
+    ("weekly_progress", "meeting_date", "DATE"),
+    ("maintenance_logs", "hours_spent", "FLOAT DEFAULT 0"),
+    ("projects", "meeting_day", "VARCHAR"),
+    ("projects", "meeting_time", "VARCHAR"),
+    ("projects", "predicted_end_date", "DATE"),
+    ("sprints", "predicted_end_date", "DATE"),
+    ("sprints", "closure_date", "DATE"),
+]
+
+
+def up(conn):
+    for table, column, type_def in COLUMNS:
+        add_column(conn, table, column, type_def)
+
+
+def down(conn):
+    # These columns are part of the models; dropping them would only break the app.
+    pass
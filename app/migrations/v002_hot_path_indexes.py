@@ -0,0 +1,33 @@
+"""Composite indexes for the hot filters (weekly grid, log timelines, sprint tasks)."""
+from sqlalchemy import text
+
+INDEXES = [
+    ("ix_weekly_progress_project_year_week", "weekly_progress", "project_id, year, week_number"),
+    ("ix_project_logs_project_created", "project_logs", "project_id, created_at"),
+    ("ix_maintenance_logs_project_date", "maintenance_logs", "project_id, log_date"),
+    ("ix_tasks_sprint_status", "tasks", "sprint_id, status"),
+    ("ix_sprints_status", "sprints", "status"),
+]
+
+EXPLAIN_CHECKS = [
+    ("SELECT * FROM weekly_progress WHERE project_id = 1 AND year = 2025 AND week_number = 10",
+     "ix_weekly_progress_project_year_week"),
+    ("SELECT * FROM project_logs WHERE project_id = 1 ORDER BY created_at DESC",
+     "ix_project_logs_project_created"),
+    ("SELECT * FROM maintenance_logs WHERE project_id = 1 ORDER BY log_date DESC",
+     "ix_maintenance_logs_project_date"),
+    ("SELECT * FROM tasks WHERE sprint_id = 1 AND status = 'Done'",
+     "ix_tasks_sprint_status"),
+    ("SELECT * FROM sprints WHERE status = 'active'",
+     "ix_sprints_status"),
+]
+
+
+def up(conn):
+    for name, table, columns in INDEXES:
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+
+
+def down(conn):
+    for name, _, _ in INDEXES:
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
@@ -0,0 +1,84 @@
+"""Make (project_id, year, week_number) a unique key of weekly_progress."""
+import logging
+
+from sqlalchemy import text
+
+INDEX = "ix_weekly_progress_project_year_week"
+
+logger = logging.getLogger(__name__)
+
+# Year of a project that has none: its start date's, else the current one
+PROJECT_YEAR = (
+    "COALESCE(year, CAST(strftime('%Y', start_date) AS INTEGER), CAST(strftime('%Y', 'now') AS INTEGER))"
+)
+
+
+def _join(values):
+    """Distinct non-empty descriptions, oldest first."""
+    parts = []
+    for value in values:
+        if value and value.strip() and value not in parts:
+            parts.append(value)
+    return "\n".join(parts) or None
+
+
+def backfill_years(conn):
+    # NULLs are distinct in a unique index, so a week without a year would
+    # never match its existing row; weeks take their project's year.
+    conn.execute(text(f"UPDATE projects SET year = {PROJECT_YEAR} WHERE year IS NULL"))
+    conn.execute(text(
+        "UPDATE weekly_progress SET year = (SELECT projects.year FROM projects WHERE projects.id = weekly_progress.project_id) "
+        "WHERE year IS NULL"
+    ))
+
+
+def merge_duplicates(conn) -> int:
+    """
+    Older write paths could race and create duplicate weeks. Each group is
+    merged into its newest row: hours are summed, progress is the highest,
+    descriptions are joined. Returns the number of rows merged away.
+    """
+    groups = conn.execute(text(
+        "SELECT project_id, year, week_number FROM weekly_progress "
+        "WHERE year IS NOT NULL AND week_number IS NOT NULL "
+        "GROUP BY project_id, year, week_number HAVING COUNT(*) > 1"
+    )).all()
+    merged = 0
+    for project_id, year, week_number in groups:
+        rows = conn.execute(text(
+            "SELECT id, planned_progress, actual_progress, actual_hours, planned_description, actual_description "
+            "FROM weekly_progress WHERE project_id IS :p AND year = :y AND week_number = :w ORDER BY id"
+        ), {"p": project_id, "y": year, "w": week_number}).all()
+        keep = rows[-1]
+        conn.execute(text(
+            "UPDATE weekly_progress SET planned_progress = :planned, actual_progress = :actual, "
+            "actual_hours = :hours, planned_description = :planned_desc, actual_description = :actual_desc "
+            "WHERE id = :id"
+        ), {
+            "id": keep[0],
+            "planned": keep[1],
+            "actual": max((r[2] or 0) for r in rows),
+            "hours": sum((r[3] or 0.0) for r in rows),
+            "planned_desc": _join(r[4] for r in rows),
+            "actual_desc": _join(r[5] for r in rows),
+        })
+        conn.execute(
+            text("DELETE FROM weekly_progress WHERE id = :id"),
+            [{"id": r[0]} for r in rows[:-1]],
+        )
+        merged += len(rows) - 1
+    return merged
+
+
+def up(conn):
+    backfill_years(conn)
+    merged = merge_duplicates(conn)
+    if merged:
+        logger.info("Merged %d duplicate weekly_progress rows into their newest week", merged)
+    conn.execute(text(f"DROP INDEX IF EXISTS {INDEX}"))
+    conn.execute(text(f"CREATE UNIQUE INDEX {INDEX} ON weekly_progress (project_id, year, week_number)"))
+
+
+def down(conn):
+    conn.execute(text(f"DROP INDEX IF EXISTS {INDEX}"))
+    conn.execute(text(f"CREATE INDEX {INDEX} ON weekly_progress (project_id, year, week_number)"))
@@ -0,0 +1,24 @@
+"""Indexes for the cross-project workload aggregation (one week, every project)."""
+from sqlalchemy import text
+
+INDEXES = [
+    ("ix_weekly_progress_year_week", "weekly_progress", "year, week_number"),
+    ("ix_maintenance_logs_log_date", "maintenance_logs", "log_date"),
+]
+
+EXPLAIN_CHECKS = [
+    ("SELECT project_id, actual_hours FROM weekly_progress WHERE year = 2025 AND week_number = 10",
+     "ix_weekly_progress_year_week"),
+    ("SELECT project_id, hours_spent FROM maintenance_logs WHERE log_date >= '2025-03-03' AND log_date < '2025-03-10'",
+     "ix_maintenance_logs_log_date"),
+]
+
+
+def up(conn):
+    for name, table, columns in INDEXES:
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+
+
+def down(conn):
+    for name, _, _ in INDEXES:
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
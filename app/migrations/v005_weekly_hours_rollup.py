@@ -0,0 +1,17 @@
+"""Weekly hours rollup table (engineer x project x ISO week), backfilled from existing hours."""
+from app import models, rollup
+
+EXPLAIN_CHECKS = [
+    ("SELECT engineer_id, iso_year, iso_week, active_hours + maintenance_hours FROM weekly_hours_rollup "
+     "WHERE (iso_year, iso_week) >= (2025, 1) AND (iso_year, iso_week) <= (2025, 13)",
+     "ix_weekly_hours_rollup_week_engineer"),
+]
+
+
+def up(conn):
+    models.WeeklyHoursRollup.__table__.create(conn, checkfirst=True)
+    rollup.rebuild(conn)
+
+
+def down(conn):
+    models.WeeklyHoursRollup.__table__.drop(conn, checkfirst=True)
@@ -0,0 +1,21 @@
+"""Stored weekly aggregates on projects (reported_progress, total_actual_hours), backfilled."""
+from sqlalchemy import text
+
+from app.migrations import add_column
+
+
+def up(conn):
+    add_column(conn, "projects", "reported_progress", "INTEGER DEFAULT 0")
+    add_column(conn, "projects", "total_actual_hours", "FLOAT DEFAULT 0")
+    # Same definition as app.crud.week_contribution
+    conn.execute(text(
+        "UPDATE projects SET "
+        "reported_progress = (SELECT COALESCE(SUM(CASE WHEN TRIM(COALESCE(actual_description, ''), ' ' || char(9, 13, 10)) != '' "
+        "THEN COALESCE(actual_progress, 0) ELSE 0 END), 0) FROM weekly_progress WHERE project_id = projects.id), "
+        "total_actual_hours = (SELECT COALESCE(SUM(COALESCE(actual_hours, 0)), 0) FROM weekly_progress WHERE project_id = projects.id)"
+    ))
+
+
+def down(conn):
+    # Columns are part of the model; leaving them in place is harmless.
+    pass
@@ -0,0 +1,20 @@
+"""Plan templates table, seeded with the built-in layouts create_project used to hard-code."""
+from sqlalchemy import select
+
+from app import models, plans
+
+
+def up(conn):
+    table = models.PlanTemplate.__table__
+    table.create(conn, checkfirst=True)
+    existing = set(conn.execute(select(table.c.name)).scalars())
+    rows = [
+        {"name": name, "description": spec["description"], "phases_json": plans.phases_to_json(spec["phases"])}
+        for name, spec in plans.BUILTIN_TEMPLATES.items() if name not in existing
+    ]
+    if rows:
+        conn.execute(table.insert(), rows)
+
+
+def down(conn):
+    models.PlanTemplate.__table__.drop(conn, checkfirst=True)
@@ -0,0 +1,15 @@
+"""version / updated_at on projects, engineers and meetings, for ETag-based conditional GETs."""
+from app.migrations import add_column
+
+TABLES = ["projects", "engineers", "meetings"]
+
+
+def up(conn):
+    for table in TABLES:
+        add_column(conn, table, "version", "INTEGER DEFAULT 1")
+        add_column(conn, table, "updated_at", "DATETIME")
+
+
+def down(conn):
+    # Columns are part of the models; leaving them in place is harmless.
+    pass
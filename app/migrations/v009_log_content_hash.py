@@ -0,0 +1,35 @@
+"""content_hash on project_logs (app.log_fingerprint), backfilled and indexed for import de-duplication."""
+from sqlalchemy import text
+
+from app.log_fingerprint import content_hash
+from app.migrations import add_column
+
+BATCH = 1000
+
+EXPLAIN_CHECKS = [
+    ("SELECT project_id FROM project_logs WHERE content_hash IN ('a', 'b')", "ix_project_logs_content_hash"),
+]
+
+
+def up(conn):
+    add_column(conn, "project_logs", "content_hash", "VARCHAR(40)")
+    last_id = 0
+    while True:
+        rows = conn.execute(text(
+            "SELECT id, project_id, content, created_at FROM project_logs "
+            "WHERE id > :last AND content_hash IS NULL ORDER BY id LIMIT :n"
+        ), {"last": last_id, "n": BATCH}).all()
+        if not rows:
+            break
+        conn.execute(
+            text("UPDATE project_logs SET content_hash = :h WHERE id = :id"),
+            [{"id": row[0], "h": content_hash(row[1], row[2], row[3])} for row in rows],
+        )
+        last_id = rows[-1][0]
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_project_logs_content_hash ON project_logs (content_hash)"
+    ))
+
+
+def down(conn):
+    conn.execute(text("DROP INDEX IF EXISTS ix_project_logs_content_hash"))
@@ -0,0 +1,13 @@
+"""Jobs table for background imports, exports and reports (app.jobs).
+
+v011 moves the table to a database of its own.
+"""
+from app import models
+
+
+def up(conn):
+    models.Job.__table__.create(conn, checkfirst=True)
+
+
+def down(conn):
+    models.Job.__table__.drop(conn, checkfirst=True)
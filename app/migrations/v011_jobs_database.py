@@ -0,0 +1,27 @@
+"""Move the jobs table to the jobs database of its own (app.jobs)."""
+from sqlalchemy import inspect, insert, select
+
+from app import jobs, models
+
+J = models.Job.__table__
+
+
+def _copy(source, target):
+    rows = [dict(row) for row in source.execute(select(J)).mappings()]
+    if rows:
+        target.execute(insert(J).prefix_with("OR IGNORE"), rows)
+
+
+def up(conn):
+    jobs.create_tables()
+    if not inspect(conn).has_table(J.name):
+        return
+    with jobs.job_engine.begin() as job_conn:
+        _copy(conn, job_conn)
+    J.drop(conn)
+
+
+def down(conn):
+    J.create(conn, checkfirst=True)
+    with jobs.job_engine.connect() as job_conn:
+        _copy(job_conn, conn)
@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Text, Float, DateTime, func
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Text, Float, DateTime, Index, func
 from sqlalchemy.orm import relationship
-from .database import Base
+from .database import Base, JobBase
+from .log_fingerprint import content_hash
 from datetime import datetime
+import json
 
 class Engineer(Base):
     __tablename__ = "engineers"
@@ -9,10 +11,17 @@ class Engineer(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True)
     role = Column(String, default="Engineer")
+    # Bumped on every write (app.crud.touch); ETags are computed from it
+    version = Column(Integer, default=1)
+    updated_at = Column(DateTime, default=datetime.utcnow)
     
     projects = relationship("Project", back_populates="lead_engineer")
     tasks = relationship("Task", back_populates="assignee")
 
+def _log_content_hash(context):
+    params = context.get_current_parameters()
+    return content_hash(params["project_id"], params["content"], params.get("created_at"))
+
 class ProjectLog(Base):
     __tablename__ = "project_logs"
 
@@ -20,9 +29,17 @@ class ProjectLog(Base):
     project_id = Column(Integer, ForeignKey("projects.id"))
     content = Column(String)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Fingerprint of project, date and normalized text (app.log_fingerprint); import de-duplicates on it
+    content_hash = Column(String(40), default=_log_content_hash)
 
     project = relationship("Project", back_populates="logs")
 
+    __table_args__ = (
+        Index("ix_project_logs_project_created", "project_id", "created_at"),
+        # The hash covers the project, so it is looked up on its own
+        Index("ix_project_logs_content_hash", "content_hash"),
+    )
+
 class MaintenanceLog(Base):
     __tablename__ = "maintenance_logs"
 
@@ -36,6 +53,11 @@ class MaintenanceLog(Base):
 
     project = relationship("Project", back_populates="maintenance_logs")
 
+    __table_args__ = (
+        Index("ix_maintenance_logs_project_date", "project_id", "log_date"),
+        Index("ix_maintenance_logs_log_date", "log_date"),
+    )
+
 class Project(Base):
     __tablename__ = "projects"
 
@@ -47,6 +69,12 @@ class Project(Base):
     duration_weeks = Column(Integer, default=12) # New field
     status = Column(String, default="Planning") # Planning, Development, Testing, Complete
     progress = Column(Integer, default=0) # 0-100
+    # Aggregates of the weekly rows, maintained incrementally (app.crud.apply_week_delta)
+    reported_progress = Column(Integer, default=0) # Sum of actual_progress over reported weeks
+    total_actual_hours = Column(Float, default=0.0)
+    # Bumped on every write to the project or its weeks/logs (app.crud.touch)
+    version = Column(Integer, default=1)
+    updated_at = Column(DateTime, default=datetime.utcnow)
     description = Column(Text, nullable=True)
     start_date = Column(Date, nullable=True)
     end_date = Column(Date, nullable=True) # Original planned end date?
@@ -73,7 +101,7 @@ class WeeklyProgress(Base):
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"))
     week_number = Column(Integer)
-    year = Column(Integer)
+    year = Column(Integer, nullable=False) # Part of the unique key; NULLs would never conflict
     planned_progress = Column(Integer, default=0) # Percentage 0-100
     actual_progress = Column(Integer, default=0) # Percentage 0-100
     planned_description = Column(String)
@@ -85,6 +113,70 @@ class WeeklyProgress(Base):
     project = relationship("Project", back_populates="weekly_progress")
     meeting = relationship("Meeting")
 
+    __table_args__ = (
+        Index("ix_weekly_progress_project_year_week", "project_id", "year", "week_number", unique=True),
+        Index("ix_weekly_progress_year_week", "year", "week_number"),
+    )
+
+class WeeklyHoursRollup(Base):
+    """
+    Hours per project and ISO week, attributed to the project's lead engineer.
+    Derived from weekly_progress.actual_hours and maintenance_logs.hours_spent;
+    maintained by app.rollup on every write, rebuilt with `python -m app.rollup rebuild`.
+    """
+    __tablename__ = "weekly_hours_rollup"
+
+    # A project has one lead at a time, so the cell key is (project, week);
+    # engineer_id is NULL for projects without a lead.
+    project_id = Column(Integer, ForeignKey("projects.id"), primary_key=True)
+    iso_year = Column(Integer, primary_key=True)
+    iso_week = Column(Integer, primary_key=True)
+    engineer_id = Column(Integer, ForeignKey("engineers.id"), nullable=True)
+    active_hours = Column(Float, default=0.0)
+    maintenance_hours = Column(Float, default=0.0)
+
+    __table_args__ = (
+        Index("ix_weekly_hours_rollup_week_engineer", "iso_year", "iso_week", "engineer_id"),
+    )
+
+class PlanTemplate(Base):
+    """Phase layout used to generate a new project's weekly plan (see app.plans)."""
+    __tablename__ = "plan_templates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, index=True)
+    description = Column(String, nullable=True)
+    phases_json = Column(Text) # [{"description": ..., "weeks": N or null}, ...]
+
+    @property
+    def phases(self):
+        return json.loads(self.phases_json or "[]")
+
+class Job(JobBase):
+    """Background import, export or report (see app.jobs)."""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    type = Column(String) # import, export, report
+    status = Column(String, default="queued") # queued, running, succeeded, failed, cancelled
+    params_json = Column(Text, default="{}")
+    progress = Column(Float, default=0) # 0-100; live values of a running job are kept in memory
+    message = Column(String, nullable=True)
+    error = Column(Text, nullable=True)
+    result_name = Column(String, nullable=True) # download filename of the result
+    result_media_type = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_jobs_status", "status"),
+    )
+
+    @property
+    def params(self):
+        return json.loads(self.params_json or "{}")
+
 class Meeting(Base):
     __tablename__ = "meetings"
 
@@ -95,6 +187,8 @@ class Meeting(Base):
     audio_path = Column(String, nullable=True)
     minutes_text = Column(Text, nullable=True) # The actual content
     next_week_plan = Column(Text, nullable=True) # For weekly meetings
+    version = Column(Integer, default=1) # Bumped on every write (app.crud.touch)
+    updated_at = Column(DateTime, default=datetime.utcnow)
     
     updates = relationship("ProjectUpdate", back_populates="meeting")
 
@@ -127,6 +221,10 @@ class Sprint(Base):
     project = relationship("Project", back_populates="sprints")
     tasks = relationship("Task", back_populates="sprint", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_sprints_status", "status"),
+    )
+
 class Task(Base):
     __tablename__ = "tasks"
 
@@ -151,3 +249,7 @@ class Task(Base):
     project = relationship("Project", back_populates="tasks")
     sprint = relationship("Sprint", back_populates="tasks")
     assignee = relationship("Engineer", back_populates="tasks")
+
+    __table_args__ = (
+        Index("ix_tasks_sprint_status", "sprint_id", "status"),
+    )
@@ -0,0 +1,102 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are fetched with `WHERE (sort_key, id) < (last_sort_key, last_id)` rather
+than OFFSET, so page N costs the same as page 1 as long as an index covers
+(sort_key) - SQLite indexes carry the rowid, so (project_id, created_at) serves
+ORDER BY created_at, id within a project.
+
+Cursors are opaque url-safe tokens encoding the sort key and id of the last
+row on the page. The sort key is compared as the raw stored value, because
+SQLite keeps dates as text and server-side timestamps (CURRENT_TIMESTAMP) are
+stored without the microseconds SQLAlchemy appends to bound datetimes.
+"""
+import base64
+import binascii
+import json
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import String, and_, or_, type_coerce
+from sqlalchemy.orm import Query
+
+# Response header carrying the next cursor on list endpoints whose body is a bare list
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: Any, last_id: int) -> str:
+    raw = json.dumps([sort_value, last_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, last_id = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(last_id, int) or not (sort_value is None or isinstance(sort_value, (str, int))):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return sort_value, last_id
+
+
+def _seek(sort_key, id_col, sort_value, last_id, descending: bool):
+    """
+    Rows strictly after (sort_value, last_id) in the page order.
+    SQLite sorts NULL before any value, i.e. last when descending.
+    """
+    if sort_key is None:
+        return id_col < last_id if descending else id_col > last_id
+    if descending:
+        if sort_value is None:
+            return and_(sort_key.is_(None), id_col < last_id)
+        return or_(
+            sort_key < sort_value,
+            and_(sort_key == sort_value, id_col < last_id),
+            sort_key.is_(None),
+        )
+    if sort_value is None:
+        return or_(and_(sort_key.is_(None), id_col > last_id), sort_key.isnot(None))
+    return or_(sort_key > sort_value, and_(sort_key == sort_value, id_col > last_id))
+
+
+def keyset_page(
+    query: Query,
+    id_col,
+    cursor: Optional[str],
+    limit: int,
+    sort_col=None,
+    descending: bool = True,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Returns (items, next_cursor) for a query ordered by (sort_col, id_col).
+    With sort_col=None the query is ordered by id_col alone. An empty or None
+    cursor starts at the first page; next_cursor is None on the last page.
+    """
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be positive")
+
+    # Compare/select the stored text as-is (no CAST is emitted, so the index still applies)
+    sort_key = type_coerce(sort_col, String) if sort_col is not None else None
+
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor)
+        query = query.filter(_seek(sort_key, id_col, sort_value, last_id, descending))
+
+    order = [] if sort_key is None else [sort_key]
+    order.append(id_col)
+    query = query.order_by(*(c.desc() if descending else c.asc() for c in order))
+    if sort_key is not None:
+        query = query.add_columns(sort_key)
+
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if sort_key is None:
+        items = rows
+        next_cursor = encode_cursor(None, items[-1].id) if has_more else None
+    else:
+        items = [row[0] for row in rows]
+        next_cursor = encode_cursor(rows[-1][1], items[-1].id) if has_more else None
+    return items, next_cursor
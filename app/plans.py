@@ -0,0 +1,119 @@
+"""
+Plan templates: phase layouts that turn a project duration into its weekly plan.
+
+A template is an ordered list of phases, each {"description": ..., "weeks": N}.
+One phase may leave "weeks" empty; it stretches to fill the project. Phases
+before it are laid out from week 1, phases after it end on the last week, and
+when the project is too short the closing phases win (the last weeks of a
+project are always its test phase). Without a stretching phase the last phase
+stretches.
+
+Templates live in the plan_templates table. A template's phases are compiled
+once (keyed by their JSON, so an edited template compiles afresh) and every
+expansion for a given duration is cached as well.
+"""
+import json
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+STANDARD = "standard"
+OPTIMIZATION = "optimization"
+
+# The layouts create_project used to derive from the project name
+BUILTIN_TEMPLATES = {
+    STANDARD: {
+        "description": "Reqs/Arch -> UI/Proto -> Dev -> Test",
+        "phases": [
+            {"description": "需求確認與架構討論", "weeks": 2},
+            {"description": "UI/UX設計與資料庫規劃", "weeks": 2},
+            {"description": "核心功能開發與實作", "weeks": None},
+            {"description": "UAT測試與錯誤修正", "weeks": 3},
+        ],
+    },
+    OPTIMIZATION: {
+        "description": "Optimization -> Test",
+        "phases": [
+            {"description": "系統優化與效能調校", "weeks": None},
+            {"description": "UAT測試與錯誤修正", "weeks": 3},
+        ],
+    },
+}
+
+
+class CompiledTemplate(NamedTuple):
+    head: Tuple[Tuple[str, int], ...]  # (description, weeks) from week 1
+    fill: str  # stretches over whatever head and tail leave
+    tail: Tuple[Tuple[str, int], ...]  # (description, weeks) ending on the last week
+    tail_weeks: int
+
+
+def phases_to_json(phases: List[Dict]) -> str:
+    """Canonical JSON for a phase list (also the compile cache key)."""
+    return json.dumps(
+        [{"description": p["description"], "weeks": p.get("weeks")} for p in phases],
+        ensure_ascii=False, separators=(",", ":"),
+    )
+
+
+@lru_cache(maxsize=256)
+def compile_template(phases_json: str) -> CompiledTemplate:
+    """Validates and compiles a phase list. Raises ValueError when it is malformed."""
+    phases = json.loads(phases_json)
+    if not phases:
+        raise ValueError("A plan template needs at least one phase")
+    fill_at = [i for i, p in enumerate(phases) if p.get("weeks") is None]
+    if len(fill_at) > 1:
+        raise ValueError("Only one phase may leave 'weeks' empty")
+    for p in phases:
+        if not p.get("description"):
+            raise ValueError("Every phase needs a description")
+        if p.get("weeks") is not None and int(p["weeks"]) < 1:
+            raise ValueError("Phase 'weeks' must be at least 1")
+    split = fill_at[0] if fill_at else len(phases) - 1
+    head = tuple((p["description"], int(p["weeks"])) for p in phases[:split])
+    tail = tuple((p["description"], int(p["weeks"])) for p in phases[split + 1:])
+    return CompiledTemplate(head, phases[split]["description"], tail, sum(w for _, w in tail))
+
+
+@lru_cache(maxsize=4096)
+def expand(phases_json: str, duration: int) -> Tuple[Tuple[int, int, str], ...]:
+    """
+    (week_number, planned_progress, planned_description) for every week.
+    Planned progress splits 100% evenly, the remainder going to the last week.
+    """
+    template = compile_template(phases_json)
+    descriptions = [template.fill] * duration
+
+    tail_start = max(0, duration - template.tail_weeks)
+    week = tail_start
+    for description, weeks in template.tail:
+        for i in range(week, min(week + weeks, duration)):
+            descriptions[i] = description
+        week += weeks
+
+    week = 0
+    for description, weeks in template.head:
+        for i in range(week, min(week + weeks, tail_start)):
+            descriptions[i] = description
+        week += weeks
+
+    base, remainder = divmod(100, duration)
+    return tuple(
+        (w, base + (remainder if w == duration else 0), descriptions[w - 1])
+        for w in range(1, duration + 1)
+    )
+
+
+def default_template_name(project_name: str) -> str:
+    """Phase projects beyond phase 1 are optimization cycles; everything else is a standard build."""
+    name = (project_name or "").lower().replace(" ", "")
+    return STANDARD if "phase" not in name or "phase1" in name else OPTIMIZATION
+
+
+def plan_rows(project_id: int, year: Optional[int], phases_json: str, duration: int) -> List[Dict]:
+    """WeeklyProgress column dicts for a new project's plan, ready for a bulk insert."""
+    return [
+        {"project_id": project_id, "week_number": week, "year": year, "planned_progress": planned,
+         "actual_progress": 0, "planned_description": description}
+        for week, planned, description in expand(phases_json, duration)
+    ]
@@ -0,0 +1,80 @@
+"""
+Sparse fieldsets for the project list API.
+
+`fields` selects scalar columns of Project, `include` selects relationships.
+Only the requested columns and relationships are loaded from the database.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.orm import load_only
+
+from app import models, schemas
+from app.loaders import relationship_loader
+
+# Relationship name -> schema used to serialize each related row
+PROJECT_RELATIONSHIPS = {
+    "lead_engineer": schemas.Engineer,
+    "weekly_progress": schemas.WeeklyProgress,
+    "updates": schemas.ProjectUpdate,
+    "logs": schemas.ProjectLog,
+    "maintenance_logs": schemas.MaintenanceLog,
+}
+PROJECT_FIELDS = [f for f in schemas.Project.model_fields if f not in PROJECT_RELATIONSHIPS]
+
+SUMMARY_FIELDS = [f for f in schemas.ProjectSummary.model_fields if f not in PROJECT_RELATIONSHIPS]
+SUMMARY_INCLUDE = [f for f in schemas.ProjectSummary.model_fields if f in PROJECT_RELATIONSHIPS]
+
+# `progress` is recalculated from these dates when they are set
+PROGRESS_DEPENDENCIES = ("start_date", "predicted_end_date")
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [v.strip() for v in value.split(",") if v.strip()] if value else []
+
+
+def parse_projection(fields: Optional[str], include: Optional[str]) -> Tuple[List[str], List[str]]:
+    """
+    Parses comma separated `fields` / `include` query values.
+    Omitting `fields` selects every column. `id` is always returned.
+    """
+    field_list = _split(fields) or list(PROJECT_FIELDS)
+    include_list = _split(include)
+
+    unknown = [f for f in field_list if f not in PROJECT_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    unknown = [i for i in include_list if i not in PROJECT_RELATIONSHIPS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown include: {', '.join(unknown)}")
+
+    if "id" not in field_list:
+        field_list.insert(0, "id")
+    return field_list, include_list
+
+
+def projection_options(fields: Sequence[str], include: Sequence[str]) -> list:
+    """Loader options that fetch exactly the requested columns and relationships."""
+    columns = set(fields)
+    if "progress" in columns:
+        columns.update(PROGRESS_DEPENDENCIES)
+    options = [load_only(*[getattr(models.Project, c) for c in sorted(columns)])]
+    for name in include:
+        options.append(relationship_loader(getattr(models.Project, name)))
+    return options
+
+
+def project_to_dict(project: models.Project, fields: Sequence[str], include: Sequence[str]) -> Dict:
+    """JSON-ready dict with only the requested keys."""
+    data = {f: getattr(project, f) for f in fields}
+    for name in include:
+        item_schema = PROJECT_RELATIONSHIPS[name]
+        value = getattr(project, name)
+        if name == "lead_engineer":
+            data[name] = item_schema.model_validate(value).model_dump(mode="json") if value else None
+        else:
+            data[name] = [item_schema.model_validate(v).model_dump(mode="json") for v in value]
+    for key, value in data.items():
+        if hasattr(value, "isoformat"):
+            data[key] = value.isoformat()
+    return data
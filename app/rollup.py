@@ -0,0 +1,214 @@
+"""
+Weekly hours rollup (weekly_hours_rollup).
+
+Write paths call one of the refresh helpers in the same transaction as the
+change itself; each re-derives only the affected (project, ISO week) cells
+from the raw rows, so the result is the same however often it runs.
+
+    python -m app.rollup rebuild            # regenerate the whole table
+    python -m app.rollup rebuild --project 3
+    python -m app.rollup check              # compare it with a rebuild, exit 1 on drift
+"""
+import argparse
+import sys
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, Tuple, Union
+
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app import models
+from app.utils import iso_week_of
+from app import weeks
+
+Rollup = models.WeeklyHoursRollup
+WP = models.WeeklyProgress
+ML = models.MaintenanceLog
+
+def _flush(db):
+    # Sessions run with autoflush=False; make pending ORM changes visible to the queries below
+    if hasattr(db, "flush"):
+        db.flush()
+
+
+def _lead_of(db, project_id: int) -> Optional[int]:
+    return db.execute(
+        select(models.Project.lead_engineer_id).where(models.Project.id == project_id)
+    ).scalar()
+
+
+def _row_years(db, project_id: int) -> List[int]:
+    """Years of the project's WeeklyProgress rows (week_number counts on past the end of its year)."""
+    return db.execute(
+        select(WP.year).where(WP.project_id == project_id, WP.year.isnot(None)).distinct()
+    ).scalars().all()
+
+
+def _source_weeks(iso_year: int, iso_week_number: int, years: Iterable[int]):
+    """(year, week_number) pairs of WeeklyProgress rows of these years that fall in an ISO week."""
+    monday = weeks.iso_week(iso_year, iso_week_number).start
+    return [(year, weeks.week_number_in(year, monday)) for year in years], monday
+
+
+def _write_cells(db, cells, engineers):
+    """Upserts {(project_id, iso_year, iso_week): [active, maintenance]}; empty cells are removed."""
+    empty = [key for key, hours in cells.items() if not (hours[0] or hours[1])]
+    for project_id, iso_year, iso_week in empty:
+        db.execute(delete(Rollup).where(
+            Rollup.project_id == project_id, Rollup.iso_year == iso_year, Rollup.iso_week == iso_week,
+        ))
+    rows = [
+        {"project_id": key[0], "iso_year": key[1], "iso_week": key[2], "engineer_id": engineers.get(key[0]),
+         "active_hours": hours[0], "maintenance_hours": hours[1]}
+        for key, hours in cells.items() if hours[0] or hours[1]
+    ]
+    if rows:
+        stmt = sqlite_insert(Rollup)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[Rollup.project_id, Rollup.iso_year, Rollup.iso_week],
+            set_={
+                "engineer_id": stmt.excluded.engineer_id,
+                "active_hours": stmt.excluded.active_hours,
+                "maintenance_hours": stmt.excluded.maintenance_hours,
+            },
+        ), rows)
+
+
+def refresh_cells(db, project_id: int, weeks: Iterable[Tuple[int, int]]):
+    """Re-derives the given ISO weeks of one project."""
+    _flush(db)
+    years = _row_years(db, project_id)
+    cells = {}
+    for iso_year, iso_week in set(weeks):
+        pairs, monday = _source_weeks(iso_year, iso_week, years)
+        active = db.execute(
+            select(func.sum(WP.actual_hours)).where(
+                WP.project_id == project_id, tuple_(WP.year, WP.week_number).in_(pairs), WP.actual_hours > 0,
+            )
+        ).scalar()
+        maintenance = db.execute(
+            select(func.sum(ML.hours_spent)).where(
+                ML.project_id == project_id, ML.log_date >= monday, ML.log_date < monday + timedelta(weeks=1),
+                ML.hours_spent > 0,
+            )
+        ).scalar()
+        cells[(project_id, iso_year, iso_week)] = [active or 0.0, maintenance or 0.0]
+    _write_cells(db, cells, {project_id: _lead_of(db, project_id)})
+
+
+def refresh_weekly_progress(db, project_id: int, year: int, week_number: int):
+    """After a WeeklyProgress row of (year, week_number) was written."""
+    refresh_cells(db, project_id, [iso_week_of(year, week_number)])
+
+
+def refresh_weeks(db, project_id: int, keys: Iterable[Tuple[int, int]]):
+    """After WeeklyProgress rows of these (year, week_number) were written."""
+    refresh_cells(db, project_id, [iso_week_of(year, week_number) for year, week_number in keys])
+
+
+def refresh_maintenance(db, project_id: int, log_date: Optional[date]):
+    """After a MaintenanceLog dated log_date was written."""
+    if log_date is not None:
+        refresh_cells(db, project_id, [log_date.isocalendar()[:2]])
+
+
+def set_engineer(db, project_id: int, engineer_id: Optional[int]):
+    """After the project's lead engineer changed; the hours themselves stay put."""
+    db.execute(update(Rollup).where(Rollup.project_id == project_id).values(engineer_id=engineer_id))
+
+
+def _derive(db, project_id: Union[int, Iterable[int], None]):
+    """Cells {(project_id, iso_year, iso_week): [active, maintenance]}, leads, and the delete of the old cells."""
+    wp_query = (
+        select(WP.project_id, WP.year, WP.week_number, func.sum(WP.actual_hours))
+        .where(WP.actual_hours > 0, WP.year.isnot(None), WP.week_number.isnot(None))
+        .group_by(WP.project_id, WP.year, WP.week_number)
+    )
+    ml_query = (
+        select(ML.project_id, ML.log_date, func.sum(ML.hours_spent))
+        .where(ML.hours_spent > 0, ML.log_date.isnot(None))
+        .group_by(ML.project_id, ML.log_date)
+    )
+    lead_query = select(models.Project.id, models.Project.lead_engineer_id)
+    clear = delete(Rollup)
+    if project_id is not None:
+        ids = [project_id] if isinstance(project_id, int) else list(project_id)
+        wp_query = wp_query.where(WP.project_id.in_(ids))
+        ml_query = ml_query.where(ML.project_id.in_(ids))
+        lead_query = lead_query.where(models.Project.id.in_(ids))
+        clear = clear.where(Rollup.project_id.in_(ids))
+
+    cells = defaultdict(lambda: [0.0, 0.0])
+    for pid, year, week_number, hours in db.execute(wp_query):
+        cells[(pid, *iso_week_of(year, week_number))][0] += hours
+    for pid, log_date, hours in db.execute(ml_query):
+        cells[(pid, *log_date.isocalendar()[:2])][1] += hours
+    return cells, dict(db.execute(lead_query).all()), clear
+
+
+def rebuild(db, project_id: Union[int, Iterable[int], None] = None) -> int:
+    """
+    Regenerates the rollup from the raw rows, for one project, a list of
+    projects or (default) all of them. Use after bulk changes that move weeks
+    around. Returns the number of cells.
+    """
+    _flush(db)
+    cells, engineers, clear = _derive(db, project_id)
+    db.execute(clear)
+    _write_cells(db, cells, engineers)
+    return len(cells)
+
+
+def check(db, project_id: Union[int, Iterable[int], None] = None) -> List[Tuple[Tuple, Tuple, Tuple]]:
+    """
+    Compares the stored cells with what rebuild() would write, without writing.
+    Returns [((project_id, iso_year, iso_week), (stored active, maintenance),
+    (expected active, maintenance))] for the cells that differ.
+    """
+    _flush(db)
+    cells, _, _ = _derive(db, project_id)
+    expected = {key: tuple(hours) for key, hours in cells.items() if hours[0] or hours[1]}
+    stored_query = select(Rollup.project_id, Rollup.iso_year, Rollup.iso_week,
+                          Rollup.active_hours, Rollup.maintenance_hours)
+    if project_id is not None:
+        ids = [project_id] if isinstance(project_id, int) else list(project_id)
+        stored_query = stored_query.where(Rollup.project_id.in_(ids))
+    stored = {tuple(row[:3]): (row[3] or 0.0, row[4] or 0.0) for row in db.execute(stored_query)}
+    mismatches = []
+    for key in sorted(stored.keys() | expected.keys()):
+        have, want = stored.get(key, (0.0, 0.0)), expected.get(key, (0.0, 0.0))
+        if any(abs(a - b) > 1e-6 for a, b in zip(have, want)):
+            mismatches.append((key, have, want))
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.rollup", description="Weekly hours rollup")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rb = sub.add_parser("rebuild", help="regenerate weekly_hours_rollup from weekly progress and maintenance logs")
+    rb.add_argument("--project", type=int, default=None, help="only this project id")
+    ck = sub.add_parser("check", help="compare weekly_hours_rollup with a rebuild, exit 1 on drift")
+    ck.add_argument("--project", type=int, default=None, help="only this project id")
+    args = parser.parse_args(argv)
+
+    from app.database import engine, Base
+    Base.metadata.create_all(bind=engine)
+    if args.command == "check":
+        with engine.connect() as conn:
+            mismatches = check(conn, args.project)
+        for (project_id, iso_year, iso_week), stored, expected in mismatches:
+            print(f"project {project_id} {iso_year}-W{iso_week:02d}: stored active={stored[0]:g} "
+                  f"maintenance={stored[1]:g}, expected active={expected[0]:g} maintenance={expected[1]:g}")
+        if mismatches:
+            return 1
+        print("All rollup cells match.")
+        return 0
+    with engine.begin() as conn:
+        cells = rebuild(conn, args.project)
+    print(f"Rebuilt {cells} rollup cells.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import date
+from app import schemas
+from app.database import get_read_db
+from app.gantt import portfolio
+from app.serialization import json_response
+from app.weeks import UNITS
+
+router = APIRouter(
+    prefix="/api/gantt",
+    tags=["gantt"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@router.get("", response_model=schemas.GanttChart)
+def read_gantt(
+    view_mode: str = "week",
+    focus_date: Optional[date] = None,
+    projects: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Portfolio Gantt for the timeline around focus_date (default today):
+    every active project, or the comma separated `projects` ids. Only the
+    weeks inside the window are loaded; bars are clipped to it.
+    """
+    if view_mode not in UNITS:
+        raise HTTPException(status_code=400, detail=f"view_mode must be one of: {', '.join(UNITS)}")
+    project_ids = None
+    if projects is not None:
+        try:
+            project_ids = [int(p) for p in projects.split(",") if p.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="projects must be comma separated ids")
+    chart = portfolio(db, view_mode, focus_date or date.today(), project_ids)
+    return json_response(schemas.GanttChart, chart)
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi.responses import FileResponse
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+from app import jobs, models, schemas
+from typing import List, Optional
+import json
+import os
+
+router = APIRouter(
+    prefix="/api/jobs",
+    tags=["jobs"],
+    responses={404: {"description": "Not found"}},
+)
+
+def job_status(job: models.Job) -> schemas.Job:
+    status = schemas.Job.model_validate(job)
+    return status.model_copy(update=jobs.live(job.id)) if job.status in jobs.UNFINISHED else status
+
+def get_job(job_id: int, db: Session) -> models.Job:
+    job = db.get(models.Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.post("", response_model=schemas.Job, status_code=202)
+def submit_job(type: str = Form(...), params: str = Form("{}"), file: Optional[UploadFile] = File(None),
+               db: Session = Depends(jobs.get_job_db)):
+    """
+    Queues a job; poll GET /api/jobs/{id}, then download /api/jobs/{id}/result.
+    type: 'import' (file; params {"dry_run": bool}), 'export' (params
+    {"project_ids": [...]}) or 'report' (params as GET /api/reports/generate).
+    """
+    try:
+        job = jobs.submit(db, type, json.loads(params), file.file if file is not None else None)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="params must be a JSON object")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (PoolTimeoutError, OperationalError):
+        raise HTTPException(status_code=503, detail="The job queue is busy, try again")
+    return job_status(job)
+
+@router.get("", response_model=List[schemas.Job])
+def list_jobs(type: Optional[str] = None, status: Optional[str] = None, limit: int = 50,
+              db: Session = Depends(jobs.get_job_read_db)):
+    query = select(models.Job).order_by(models.Job.id.desc()).limit(limit)
+    if type: query = query.where(models.Job.type == type)
+    if status: query = query.where(models.Job.status == status)
+    return [job_status(job) for job in db.execute(query).scalars()]
+
+@router.get("/{job_id}", response_model=schemas.Job)
+def read_job(job_id: int, db: Session = Depends(jobs.get_job_read_db)):
+    return job_status(get_job(job_id, db))
+
+@router.get("/{job_id}/result")
+def download_result(job_id: int, db: Session = Depends(jobs.get_job_read_db)):
+    job = get_job(job_id, db)
+    path = jobs.result_path(job)
+    if job.status != "succeeded" or not os.path.exists(path):
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}, no result to download")
+    return FileResponse(path, media_type=job.result_media_type, filename=job.result_name)
+
+@router.post("/{job_id}/cancel", response_model=schemas.Job)
+def cancel_job(job_id: int, db: Session = Depends(jobs.get_job_read_db)):
+    job = get_job(job_id, db)
+    if job.status not in jobs.UNFINISHED or not jobs.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    db.rollback()  # end the read snapshot so the job reloads with its new state
+    return job_status(job)
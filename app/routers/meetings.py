@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app import models, schemas
-from app.database import get_db
+from app.crud import touch
+from app.database import get_db, get_read_db
+from app.etags import make_etag, not_modified, row_versions, set_etag
+from app.pagination import NEXT_CURSOR_HEADER, keyset_page
 import shutil
 import os
 from datetime import datetime
@@ -14,8 +17,22 @@ router = APIRouter(
 )
 
 @router.get("/", response_model=List[schemas.Meeting])
-def read_meetings(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    meetings = db.query(models.Meeting).order_by(models.Meeting.date.desc()).offset(skip).limit(limit).all()
+def read_meetings(request: Request, response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: Session = Depends(get_read_db)):
+    """
+    Meetings, newest first. Passing `cursor` (empty for the first page) pages by
+    (date, id) instead of skip/limit; the next token comes back in `X-Next-Cursor`.
+    """
+    etag = make_etag("meetings", sorted(request.query_params.multi_items()), row_versions(db, models.Meeting))
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    set_etag(response, etag)
+    query = db.query(models.Meeting)
+    if cursor is None:
+        return query.order_by(models.Meeting.date.desc(), models.Meeting.id.desc()).offset(skip).limit(limit).all()
+    meetings, next_cursor = keyset_page(query, models.Meeting.id, cursor, limit, sort_col=models.Meeting.date)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return meetings
 
 @router.post("/", response_model=schemas.Meeting)
@@ -38,12 +55,13 @@ async def upload_audio(meeting_id: int, file: UploadFile = File(...), db: Sessio
         shutil.copyfileobj(file.file, buffer)
         
     db_meeting.audio_path = file_location
+    touch(db_meeting)
     db.commit()
     
     return {"filename": file.filename, "location": file_location}
 
 @router.get("/{meeting_id}", response_model=schemas.Meeting)
-def read_meeting(meeting_id: int, db: Session = Depends(get_db)):
+def read_meeting(meeting_id: int, db: Session = Depends(get_read_db)):
     db_meeting = db.query(models.Meeting).filter(models.Meeting.id == meeting_id).first()
     if not db_meeting:
          raise HTTPException(status_code=404, detail="Meeting not found")
@@ -57,6 +75,7 @@ def update_meeting(meeting_id: int, meeting: schemas.MeetingCreate, db: Session
         
     for key, value in meeting.dict().items():
         setattr(db_meeting, key, value)
+    touch(db_meeting)
     
     db.commit()
     db.refresh(db_meeting)
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, select
 from typing import List, Dict, Any
-from app.database import get_db
+from app.database import get_async_read_db, get_db
 from app import models, schemas
 from datetime import date
 
@@ -12,17 +13,34 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+async def _find_active_sprint(db: AsyncSession):
+    """
+    Prioritize the explicitly active sprint, then fall back to the sprint covering today.
+    """
+    result = await db.execute(select(models.Sprint).where(models.Sprint.status == 'active').limit(1))
+    active_sprint = result.scalars().first()
+
+    if not active_sprint:
+        today = date.today()
+        result = await db.execute(select(models.Sprint).where(
+            models.Sprint.start_date <= today,
+            models.Sprint.end_date >= today
+        ).limit(1))
+        active_sprint = result.scalars().first()
+    return active_sprint
+
 @router.patch("/tasks/batch")
-async def batch_update_tasks(updates: List[schemas.TaskBatchUpdateItem], db: Session = Depends(get_db)):
+def batch_update_tasks(updates: List[schemas.TaskBatchUpdateItem], db: Session = Depends(get_db)):
     """
     Update multiple tasks in a single transaction.
+    Sync on purpose: writes queue on the single writer (app.database).
     """
     updated_count = 0
     errors = []
 
     try:
         for item in updates:
-            task = db.query(models.Task).filter(models.Task.id == item.id).first()
+            task = db.get(models.Task, item.id)
             if not task:
                 errors.append(f"Task ID {item.id} not found")
                 continue
@@ -50,70 +68,59 @@ async def batch_update_tasks(updates: List[schemas.TaskBatchUpdateItem], db: Ses
     }
 
 @router.get("/dashboard/stats")
-async def get_dashboard_stats(db: Session = Depends(get_db)):
+async def get_dashboard_stats(db: AsyncSession = Depends(get_async_read_db)):
     """
     Get aggregated stats for the current active sprint (or all active tasks if no sprint active).
     """
-    today = date.today()
-    
     # 1. Find Active Sprint
-    # Prioritize explicitly active, then date-based
-    active_sprint = db.query(models.Sprint).filter(models.Sprint.status == 'active').first()
-    
-    if not active_sprint:
-        # Fallback: Find sprint covering today
-        active_sprint = db.query(models.Sprint).filter(
-            models.Sprint.start_date <= today,
-            models.Sprint.end_date >= today
-        ).first()
+    active_sprint = await _find_active_sprint(db)
 
     # Base Query
-    query = db.query(models.Task)
+    scope = []
     if active_sprint:
-        query = query.filter(models.Task.sprint_id == active_sprint.id)
+        scope.append(models.Task.sprint_id == active_sprint.id)
     else:
         # If no active sprint, maybe just show all or a specific fallback?
         # Let's show all tasks that are NOT Done if no sprint context
         pass 
 
-    tasks = query.all()
+    # 2. Aggregations (computed in SQL; only risk items come back as rows)
+    health = func.coalesce(models.Task.health, "Green")
+    status = func.coalesce(models.Task.status, "Todo")
 
-    # 2. Aggregations
-    total_tasks = len(tasks)
+    total_tasks, avg_p = (await db.execute(
+        select(func.count(models.Task.id), func.avg(func.coalesce(models.Task.progress, 0))).where(*scope)
+    )).one()
     
     # Avg Progress
     avg_progress = 0
     if total_tasks > 0:
-        total_p = sum(t.progress for t in tasks)
-        avg_progress = round(total_p / total_tasks, 1)
+        avg_progress = round(avg_p, 1)
 
     # Health Counts & Status Counts
     health_counts = {"Green": 0, "Yellow": 0, "Red": 0}
     status_counts = {"Todo": 0, "In Progress": 0, "Done": 0}
-    risk_items = []
-
-    for t in tasks:
-        # Health
-        h = t.health or "Green"
-        if h in health_counts:
-            health_counts[h] += 1
-        else:
-            health_counts[h] = 1
-            
-        # Status
-        s = t.status or "Todo"
-        if s in status_counts:
-            status_counts[s] += 1
-        else:
-            status_counts[s] = 1
-
-        if h in ["Yellow", "Red"]:
-            risk_items.append({
-                "title": t.title,
-                "pm_note": t.pm_note,
-                "assignee": t.assignee.name if t.assignee else "Unassigned",
-                "health": h
-            })
+
+    for h, count in await db.execute(select(health, func.count()).where(*scope).group_by(health)):
+        health_counts[h] = count
+    for s, count in await db.execute(select(status, func.count()).where(*scope).group_by(status)):
+        status_counts[s] = count
+
+    risk_rows = await db.execute(
+        select(models.Task.title, models.Task.pm_note, models.Engineer.name, health)
+        .outerjoin(models.Engineer, models.Task.assignee_id == models.Engineer.id)
+        .where(*scope, health.in_(["Yellow", "Red"]))
+        .order_by(models.Task.id)
+    )
+    risk_items = [
+        {
+            "title": title,
+            "pm_note": pm_note,
+            "assignee": assignee or "Unassigned",
+            "health": h
+        }
+        for title, pm_note, assignee, h in risk_rows
+    ]
 
     return {
         "sprint": active_sprint.name if active_sprint else "No Active Sprint",
@@ -125,8 +132,7 @@ async def get_dashboard_stats(db: Session = Depends(get_db)):
     }
 
 from fastapi import Request
-from fastapi.templating import Jinja2Templates
-templates = Jinja2Templates(directory="templates")
+from app.templating import templates
 
 @router.get("/dashboard")
 async def dashboard_view(request: Request):
@@ -138,24 +144,17 @@ async def dashboard_view(request: Request):
     })
 
 @router.get("/assessment")
-async def assessment_view(request: Request, db: Session = Depends(get_db)):
+async def assessment_view(request: Request, db: AsyncSession = Depends(get_async_read_db)):
     """
     Render the Rapid Assessment Grid.
     """
-    today = date.today()
-    active_sprint = db.query(models.Sprint).filter(models.Sprint.status == 'active').first()
-    
-    if not active_sprint:
-        active_sprint = db.query(models.Sprint).filter(
-            models.Sprint.start_date <= today,
-            models.Sprint.end_date >= today
-        ).first()
+    active_sprint = await _find_active_sprint(db)
         
-    query = db.query(models.Task)
+    query = select(models.Task).options(selectinload(models.Task.assignee))
     if active_sprint:
-        query = query.filter(models.Task.sprint_id == active_sprint.id)
+        query = query.where(models.Task.sprint_id == active_sprint.id)
     
-    tasks = query.all()
+    tasks = (await db.execute(query)).scalars().all()
     
     # Serialize tasks (or pass objects if template can handle)
     # Jinja handles SQLAlchemy objects fine usually.
@@ -1,9 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, desc
-from typing import List
-from app import models, schemas
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, insert
+from typing import Any, Dict, List, Optional, Union
+from app import models, schemas, rollup
+from app.crud import (
+    apply_week_delta, recompute_project_totals, shift_weeks, touch, touch_project, upsert_weekly_progress,
+)
+from app.etags import make_etag, not_modified, row_versions, set_etag
+from app.fragments import fragment_cache
+from app.loaders import loader_options
+from app.pagination import NEXT_CURSOR_HEADER, keyset_page
+from app.plans import BUILTIN_TEMPLATES, compile_template, default_template_name, phases_to_json, plan_rows
+from app.projection import SUMMARY_FIELDS, SUMMARY_INCLUDE, parse_projection, projection_options, project_to_dict
+from app.serialization import json_response
+from app.database import get_db, get_read_db
 
 router = APIRouter(
     prefix="/api/projects",
@@ -11,22 +21,94 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
-@router.get("/", response_model=List[schemas.Project])
-def read_projects(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    projects = db.query(models.Project).options(joinedload(models.Project.lead_engineer)).offset(skip).limit(limit).all()
-    
-    # Recalculate progress based on time if dates are available
+def apply_time_based_progress(project: models.Project, today=None):
+    """Recalculate progress based on time if dates are available (not persisted)."""
+    from datetime import date
+    today = today or date.today()
+    if project.start_date and project.predicted_end_date:
+        total_days = (project.predicted_end_date - project.start_date).days
+        if total_days > 0:
+            elapsed = (today - project.start_date).days
+            new_prog = int((elapsed / total_days) * 100)
+            project.progress = max(0, min(100, new_prog))
+
+@router.get("/", response_model=Union[List[schemas.Project], List[schemas.ProjectSummary], List[Dict[str, Any]]])
+def read_projects(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    view: str = "full",
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Lists projects.
+
+    - `view=summary` returns `ProjectSummary` items (no weekly rows or logs).
+    - `fields=id,name,status` returns only those columns.
+    - `include=lead_engineer,weekly_progress` adds those relationships; when
+      used without `fields`, every column is returned.
+
+    Without any of these the full `Project` graph is returned as before.
+
+    Passing `cursor` (empty for the first page) switches from skip/limit to
+    keyset paging by id; the token for the next page is returned in the
+    `X-Next-Cursor` header, which is absent on the last page.
+
+    Responses carry an ETag; send it back in If-None-Match to get a 304.
+    """
     from datetime import date
     today = date.today()
+
+    # Progress is time-based, so the representation also changes with the date
+    etag = make_etag(
+        "projects", sorted(request.query_params.multi_items()), today.isoformat(),
+        row_versions(db, models.Project), row_versions(db, models.Engineer),
+    )
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    set_etag(response, etag)
+
+    if view == "summary":
+        item_schema, options = schemas.ProjectSummary, projection_options(SUMMARY_FIELDS, SUMMARY_INCLUDE)
+    elif view != "full":
+        raise HTTPException(status_code=400, detail="view must be 'full' or 'summary'")
+    elif fields or include:
+        return _sparse_projects(db, response, fields, include, skip, limit, cursor, today)
+    else:
+        item_schema, options = schemas.Project, loader_options(models.Project, schemas.Project)
+
+    query = db.query(models.Project).options(*options)
+    projects, next_cursor = _page_projects(query, skip, limit, cursor)
     for p in projects:
-        if p.start_date and p.predicted_end_date:
-            total_days = (p.predicted_end_date - p.start_date).days
-            if total_days > 0:
-                elapsed = (today - p.start_date).days
-                new_prog = int((elapsed / total_days) * 100)
-                p.progress = max(0, min(100, new_prog))
-    
-    return projects
+        apply_time_based_progress(p, today)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return json_response(List[item_schema], projects, response.headers)
+
+def _sparse_projects(db: Session, response: Response, fields: Optional[str], include: Optional[str],
+                     skip: int, limit: int, cursor: Optional[str], today):
+    """`fields=` / `include=`: dicts with only the requested keys."""
+    field_list, include_list = parse_projection(fields, include)
+    query = db.query(models.Project).options(*projection_options(field_list, include_list))
+    projects, next_cursor = _page_projects(query, skip, limit, cursor)
+    items = []
+    for p in projects:
+        if "progress" in field_list:
+            apply_time_based_progress(p, today)
+        items.append(project_to_dict(p, field_list, include_list))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return json_response(List[Dict[str, Any]], items, response.headers)
+
+def _page_projects(query, skip: int, limit: int, cursor: Optional[str]):
+    if cursor is None:
+        return query.order_by(models.Project.id).offset(skip).limit(limit).all(), None
+    return keyset_page(query, models.Project.id, cursor, limit, descending=False)
 
 # Engineer endpoints (Simple version inside projects router for now)
 # Defined BEFORE generic ID routes to avoid matching confusion
@@ -39,7 +121,12 @@ def create_engineer(engineer: schemas.EngineerCreate, db: Session = Depends(get_
     return db_engineer
 
 @router.get("/engineers", response_model=List[schemas.Engineer])
-def read_engineers(db: Session = Depends(get_db)):
+def read_engineers(request: Request, response: Response, db: Session = Depends(get_read_db)):
+    etag = make_etag("engineers", row_versions(db, models.Engineer))
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    set_etag(response, etag)
     return db.query(models.Engineer).all()
 
 @router.put("/engineers/{engineer_id}", response_model=schemas.Engineer)
@@ -50,120 +137,142 @@ def update_engineer(engineer_id: int, engineer_update: schemas.EngineerCreate, d
     
     db_engineer.name = engineer_update.name
     # Update other fields if necessary
+    touch(db_engineer)
     db.commit()
     db.refresh(db_engineer)
     return db_engineer
 
+@router.get("/plan_templates", response_model=List[schemas.PlanTemplate])
+def read_plan_templates(db: Session = Depends(get_read_db)):
+    return db.query(models.PlanTemplate).order_by(models.PlanTemplate.name).all()
+
+@router.post("/plan_templates", response_model=schemas.PlanTemplate)
+def save_plan_template(template: schemas.PlanTemplateCreate, db: Session = Depends(get_db)):
+    """Creates a plan template, or replaces the phases of the one with the same name."""
+    phases_json = phases_to_json([phase.dict() for phase in template.phases])
+    try:
+        compile_template(phases_json)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    db_template = db.query(models.PlanTemplate).filter(models.PlanTemplate.name == template.name).first()
+    if not db_template:
+        db_template = models.PlanTemplate(name=template.name)
+        db.add(db_template)
+    db_template.description = template.description
+    db_template.phases_json = phases_json
+    db.commit()
+    db.refresh(db_template)
+    return db_template
+
 @router.delete("/{project_id}")
 def delete_project(project_id: int, db: Session = Depends(get_db)):
     project = db.query(models.Project).filter(models.Project.id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
+    db.execute(delete(models.WeeklyHoursRollup).where(models.WeeklyHoursRollup.project_id == project_id))
     db.delete(project)
     db.commit()
+    fragment_cache.invalidate(project_id)
     return {"ok": True}
 
+def _resolve_engineers(db: Session, names) -> dict:
+    """Engineer ids by name; names not found are created."""
+    ids = dict(db.query(models.Engineer.name, models.Engineer.id).filter(models.Engineer.name.in_(names)))
+    missing = sorted(set(names) - ids.keys())
+    if missing:
+        created = db.execute(
+            insert(models.Engineer).returning(models.Engineer.name, models.Engineer.id, sort_by_parameter_order=True),
+            [{"name": name} for name in missing],
+        )
+        ids.update(created.all())
+    return ids
+
+def _resolve_plan_templates(db: Session, names) -> dict:
+    """Phase JSON by template name. Built-in layouts back the defaults if the table lacks them."""
+    found = {t.name: t.phases_json for t in db.query(models.PlanTemplate).filter(models.PlanTemplate.name.in_(names))}
+    for name in names:
+        if name not in found:
+            if name not in BUILTIN_TEMPLATES:
+                raise HTTPException(status_code=400, detail=f"Unknown plan template '{name}'")
+            found[name] = phases_to_json(BUILTIN_TEMPLATES[name]["phases"])
+        try:
+            compile_template(found[name])
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Plan template '{name}': {e}")
+    return found
+
+def _create_projects(db: Session, projects: List[schemas.ProjectCreate]) -> List[models.Project]:
+    """
+    Inserts the projects and their generated weekly plans with bulk statements.
+    Lead engineers are found or created by name. Does not commit.
+    """
+    lead_names = {(p.lead_engineer_name or "").strip() for p in projects} - {""}
+    engineer_ids = _resolve_engineers(db, lead_names) if lead_names else {}
+    template_names = [p.plan_template or default_template_name(p.name) for p in projects]
+    templates = _resolve_plan_templates(db, set(template_names))
+
+    rows = []
+    for p in projects:
+        row = p.dict(exclude={"lead_engineer_name", "plan_template"})
+        lead_name = (p.lead_engineer_name or "").strip()
+        if lead_name:
+            row["lead_engineer_id"] = engineer_ids[lead_name]
+        rows.append(row)
+    db_projects = db.scalars(
+        insert(models.Project).returning(models.Project, sort_by_parameter_order=True), rows
+    ).all()
+
+    # Initialize Weekly Progress from each project's template (100% spread over the duration)
+    weeks = []
+    for db_project, p, template_name in zip(db_projects, projects, template_names):
+        weeks += plan_rows(db_project.id, p.year, templates[template_name], p.duration_weeks or 12)
+    if weeks:
+        db.execute(insert(models.WeeklyProgress), weeks)
+    return db_projects
+
 @router.post("/", response_model=schemas.Project)
 def create_project(project: schemas.ProjectCreate, db: Session = Depends(get_db)):
-    project_data = project.dict()
-    lead_name = project_data.pop("lead_engineer_name", None)
-
-    if lead_name:
-        lead_name = lead_name.strip()
-        # Check if engineer exists
-        engineer = db.query(models.Engineer).filter(models.Engineer.name == lead_name).first()
-        if not engineer:
-            engineer = models.Engineer(name=lead_name)
-            db.add(engineer)
-            db.commit()
-            db.refresh(engineer)
-        project_data["lead_engineer_id"] = engineer.id
-
-    db_project = models.Project(**project_data)
-    db.add(db_project)
+    db_project = _create_projects(db, [project])[0]
     db.commit()
-    db.refresh(db_project)
-    
-    # Initialize Weekly Progress
-    duration = project.duration_weeks or 12
-    
-    # Calculate distribution (100% total)
-    base_progress = 100 // duration
-    remainder = 100 % duration
-
-    # Determine project type
-    name_lower = db_project.name.lower().replace(" ", "")
-    is_standard_dev = "phase" not in name_lower or "phase1" in name_lower
-
-    for w in range(1, duration + 1):
-        # Distribute evenly, add remainder to last week
-        planned = base_progress
-        if w == duration:
-            planned += remainder
-        
-        # Determine Description
-        description = "Planned"
-        remaining_weeks = duration - w
-        
-        # Logic: last 3 weeks for Testing/Correction
-        is_last_stage = remaining_weeks < 3
-
-        if is_standard_dev:
-            # Standard Cycle: Reqs/Arch -> UI/Proto -> Dev -> Test
-            if is_last_stage:
-                description = "UAT測試與錯誤修正"
-            elif w <= 2:
-                description = "需求確認與架構討論"
-            elif w <= 4:
-                description = "UI/UX設計與資料庫規劃"
-            else:
-                description = "核心功能開發與實作"
-        else:
-            # Optimization Cycle: Optimization -> Test
-            if is_last_stage:
-                 description = "UAT測試與錯誤修正"
-            else:
-                 description = "系統優化與效能調校"
-
-        wp = models.WeeklyProgress(
-            project_id=db_project.id,
-            week_number=w,
-            year=project.year,
-            planned_progress=planned,
-            actual_progress=0,
-            planned_description=description
-        )
-        db.add(wp)
-    db.commit()
-    
     return db_project
 
+@router.post("/batch", response_model=List[schemas.ProjectSummary])
+def create_projects(projects: List[schemas.ProjectCreate], db: Session = Depends(get_db)):
+    """Creates many projects (e.g. a year's CFT portfolio) and their plans in one transaction."""
+    if not projects:
+        return []
+    ids = [p.id for p in _create_projects(db, projects)]
+    db.commit()
+    return (
+        db.query(models.Project)
+        .options(*loader_options(models.Project, schemas.ProjectSummary))
+        .filter(models.Project.id.in_(ids))
+        .order_by(models.Project.id)
+        .all()
+    )
+
 @router.post("/{project_id}/plan", response_model=List[schemas.WeeklyProgress])
 def update_project_plan(project_id: int, plans: List[schemas.WeeklyProgressCreate], db: Session = Depends(get_db)):
     try:
-        # Batch update planned progress
-        response = []
-        for plan in plans:
-            # Find existing or create
-            wp = db.query(models.WeeklyProgress).filter(
-                models.WeeklyProgress.project_id == project_id,
-                models.WeeklyProgress.week_number == plan.week_number
-            ).first()
-            
-            if wp:
-                wp.planned_progress = plan.planned_progress
-                wp.planned_description = plan.planned_description # Update description
-                # Only update actual if provided effectively (optional logic)
-            else:
-                 wp = models.WeeklyProgress(**plan.dict(), project_id=project_id)
-                 db.add(wp)
-            response.append(wp)
+        # Batch upsert: one INSERT ... ON CONFLICT statement for the whole plan.
+        # Existing weeks only take the plan fields; new weeks are created in full.
+        rows = upsert_weekly_progress(
+            db,
+            [dict(plan.dict(), project_id=project_id) for plan in plans],
+            update=["planned_progress", "planned_description"],
+            returning=True,
+        )
+        # New weeks may carry actuals; existing ones keep theirs
+        db_project = db.get(models.Project, project_id)
+        if db_project is not None:
+            recompute_project_totals(db, db_project)
+        rollup.refresh_weeks(db, project_id, {(wp.year, wp.week_number) for wp in rows})
+        touch_project(db, project_id)
+        # Serialize before commit expires the returned rows
+        response = [schemas.WeeklyProgress.model_validate(wp) for wp in rows]
         
         db.commit()
-        
-        # Refresh all objects to ensure they are ready for serialization
-        for item in response:
-            db.refresh(item)
             
         return response
     except Exception as e:
@@ -171,20 +280,34 @@ def update_project_plan(project_id: int, plans: List[schemas.WeeklyProgressCreat
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{project_id}", response_model=schemas.Project)
-def read_project(project_id: int, db: Session = Depends(get_db)):
-    db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
+def read_project(project_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    from datetime import date
+    versions = (
+        db.query(models.Project.version, models.Project.updated_at,
+                 models.Engineer.version, models.Engineer.updated_at)
+        .outerjoin(models.Engineer, models.Engineer.id == models.Project.lead_engineer_id)
+        .filter(models.Project.id == project_id)
+        .first()
+    )
+    if versions is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    etag = make_etag("project", project_id, date.today().isoformat(), tuple(versions))
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    set_etag(response, etag)
+
+    db_project = (
+        db.query(models.Project)
+        .options(*loader_options(models.Project, schemas.Project))
+        .filter(models.Project.id == project_id)
+        .first()
+    )
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
         
     # Recalculate progress based on time
-    if db_project.start_date and db_project.predicted_end_date:
-        from datetime import date
-        today = date.today()
-        total_days = (db_project.predicted_end_date - db_project.start_date).days
-        if total_days > 0:
-            elapsed = (today - db_project.start_date).days
-            new_prog = int((elapsed / total_days) * 100)
-            db_project.progress = max(0, min(100, new_prog))
+    apply_time_based_progress(db_project)
             
     return db_project
 
@@ -194,8 +317,12 @@ def update_project(project_id: int, project: schemas.ProjectCreate, db: Session
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
+    previous_lead = db_project.lead_engineer_id
     for key, value in project.dict().items():
         setattr(db_project, key, value)
+    if db_project.lead_engineer_id != previous_lead:
+        rollup.set_engineer(db, project_id, db_project.lead_engineer_id)
+    touch(db_project)
     
     db.commit()
     db.refresh(db_project)
@@ -216,6 +343,7 @@ def create_project_update(project_id: int, update: schemas.ProjectUpdateCreate,
         db_project.status = update.status_snapshot
     if update.progress_snapshot is not None:
         db_project.progress = update.progress_snapshot
+    touch(db_project)
         
     db.commit()
     db.refresh(db_update)
@@ -229,36 +357,30 @@ def create_weekly_progress(project_id: int, progress: schemas.WeeklyProgressCrea
     if not db_project:
         raise HTTPException(status_code=404, detail="Project not found")
         
-    # Check if entry exists
-    db_progress = db.query(models.WeeklyProgress).filter(
-        models.WeeklyProgress.project_id == project_id,
-        models.WeeklyProgress.week_number == progress.week_number,
-        models.WeeklyProgress.year == progress.year
-    ).first()
-    
-    if db_progress:
-        # Update existing
-        # Use exclude_unset=True to prevent overwriting fields like planned_progress with defaults if not sent
-        for key, value in progress.dict(exclude_unset=True).items():
-            setattr(db_progress, key, value)
-    else:
-        # Create new
-        db_progress = models.WeeklyProgress(**progress.dict(), project_id=project_id)
-        db.add(db_progress)
-
-    db.commit()
-    
-    # Recalculate Project Total Progress
-    # Sum of ACTUAL progress for weeks that have an actual description (indicating it's done/reported)
-    # Filter for non-empty actual_description
-    total_progress = 0
-    all_weeks = db.query(models.WeeklyProgress).filter(models.WeeklyProgress.project_id == project_id).all()
-    
-    for w in all_weeks:
-        if w.actual_description and len(w.actual_description.strip()) > 0:
-            total_progress += w.actual_progress # Use actual_progress instead of planned_progress
+    # Previous state of the week, to move the project aggregates by its delta
+    WP = models.WeeklyProgress
+    before = (
+        db.query(WP.actual_progress, WP.actual_description, WP.actual_hours)
+        .filter(WP.project_id == project_id, WP.year == progress.year, WP.week_number == progress.week_number)
+        .first()
+    )
 
+    # Create the week, or update it in place.
+    # Only fields actually sent are overwritten (exclude_unset) so defaults
+    # such as planned_progress=0 don't clobber the existing plan.
+    db_progress = upsert_weekly_progress(
+        db,
+        [dict(progress.dict(), project_id=project_id)],
+        update=list(progress.dict(exclude_unset=True)),
+        returning=True,
+    )[0]
+    rollup.refresh_weekly_progress(db, project_id, db_progress.year, db_progress.week_number)
+
+    # Project progress = sum of ACTUAL progress over reported weeks (non-empty actual_description)
+    apply_week_delta(db_project, before, db_progress)
+    total_progress = db_project.reported_progress
     db_project.progress = total_progress
+    touch(db_project)
     
     # Auto-advance status if progress started
     if db_project.status == "Planning" and total_progress > 0:
@@ -289,6 +411,7 @@ def close_project(project_id: int, closure_date: str = None, db: Session = Depen
 
     db_project.status = "Maintenance"
     db_project.closure_date = c_date
+    touch(db_project)
     db.commit()
     db.refresh(db_project)
     
@@ -307,6 +430,8 @@ def create_maintenance_log(project_id: int, log: schemas.MaintenanceLogCreate, d
 
     db_log = models.MaintenanceLog(**log.dict(), project_id=project_id)
     db.add(db_log)
+    touch(db_project)
+    rollup.refresh_maintenance(db, project_id, db_log.log_date)
     db.commit()
     db.refresh(db_log)
     
@@ -317,23 +442,48 @@ def create_maintenance_log(project_id: int, log: schemas.MaintenanceLogCreate, d
     
     return db_log
 
-@router.post("/{project_id}/extend", response_model=schemas.Project)
-def extend_project(project_id: int, after_week: int = None, db: Session = Depends(get_db)):
-    db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
-    if not db_project:
+def _require_project(db: Session, project_id: int):
+    if not db.query(models.Project.id).filter(models.Project.id == project_id).first():
         raise HTTPException(status_code=404, detail="Project not found")
 
-    # Sync duration with actual max week to prevent "phantom week" errors
-    max_wp = db.query(func.max(models.WeeklyProgress.week_number)).filter(models.WeeklyProgress.project_id == project_id).scalar()
+@router.get("/{project_id}/logs", response_model=schemas.ProjectLogPage)
+def read_project_logs(project_id: int, cursor: Optional[str] = None, limit: int = 50, db: Session = Depends(get_read_db)):
+    """Project history, newest first, one page at a time (uses ix_project_logs_project_created)."""
+    _require_project(db, project_id)
+    query = db.query(models.ProjectLog).filter(models.ProjectLog.project_id == project_id)
+    items, next_cursor = keyset_page(query, models.ProjectLog.id, cursor, limit, sort_col=models.ProjectLog.created_at)
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/{project_id}/maintenance", response_model=schemas.MaintenanceLogPage)
+def read_maintenance_logs(project_id: int, cursor: Optional[str] = None, limit: int = 50, db: Session = Depends(get_read_db)):
+    """Maintenance logs, newest log_date first, one page at a time (uses ix_maintenance_logs_project_date)."""
+    _require_project(db, project_id)
+    query = db.query(models.MaintenanceLog).filter(models.MaintenanceLog.project_id == project_id)
+    items, next_cursor = keyset_page(query, models.MaintenanceLog.id, cursor, limit, sort_col=models.MaintenanceLog.log_date)
+    return {"items": items, "next_cursor": next_cursor}
+
+def _sync_duration(db: Session, db_project: models.Project) -> int:
+    """Duration, raised to the real last week so no "phantom week" is left behind."""
+    max_wp = db.query(func.max(models.WeeklyProgress.week_number)).filter(models.WeeklyProgress.project_id == db_project.id).scalar()
     real_max_week = max_wp or 0
-    
-    # If DB duration is lagging, update it
     if real_max_week > (db_project.duration_weeks or 0):
         db_project.duration_weeks = real_max_week
-        db.commit() # Commit this fix immediately
-        db.refresh(db_project)
+    return db_project.duration_weeks or 12
+
+def _week_label(first: int, count: int) -> str:
+    return f"Week {first}" if count == 1 else f"Weeks {first}-{first + count - 1}"
+
+@router.post("/{project_id}/extend", response_model=schemas.Project)
+def extend_project(project_id: int, after_week: int = None, weeks: int = 1, db: Session = Depends(get_db)):
+    """
+    Inserts `weeks` empty weeks after `after_week` (default: at the end; 0 = at
+    the start). Later weeks move out by the same amount.
+    """
+    db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    if not db_project:
+        raise HTTPException(status_code=404, detail="Project not found")
 
-    current_duration = db_project.duration_weeks or 12
+    current_duration = _sync_duration(db, db_project)
     
     # Check if after_week is valid. If None, behave like append (after last week)
     if after_week is None:
@@ -343,100 +493,89 @@ def extend_project(project_id: int, after_week: int = None, db: Session = Depend
     # Also allow it to be 0 (insert at start)
     if after_week < 0 or after_week > current_duration:
          raise HTTPException(status_code=400, detail=f"Invalid week number: {after_week} (Max: {current_duration})")
+    if weeks < 1:
+        raise HTTPException(status_code=400, detail="weeks must be at least 1")
 
-    # 1. Shift weeks > after_week forward by 1 (Iterate backwards to avoid collision)
-    # Get all potential subsequent weeks
-    later_weeks = db.query(models.WeeklyProgress).filter(
-        models.WeeklyProgress.project_id == project_id,
-        models.WeeklyProgress.week_number > after_week
-    ).order_by(desc(models.WeeklyProgress.week_number)).all()
-    
-    for wk in later_weeks:
-        wk.week_number += 1
+    # 1. Shift weeks > after_week forward in one statement
+    shift_weeks(db, project_id, after_week, weeks)
         
-    # 2. Add new WeeklyProgress for the new week (at after_week + 1)
-    new_week_num = after_week + 1
-    
-    # Try to copy description from previous week (after_week)
-    prev_week_prog = db.query(models.WeeklyProgress).filter(
+    # 2. Add the new weeks (after_week + 1 ...), copying the phase of after_week
+    prev_desc = db.query(models.WeeklyProgress.planned_description).filter(
         models.WeeklyProgress.project_id == project_id,
         models.WeeklyProgress.week_number == after_week
-    ).first()
-    
-    phase_desc = "Extended Development"
-    if prev_week_prog:
-        phase_desc = prev_week_prog.planned_description 
-        
-    new_wp = models.WeeklyProgress(
-        project_id=project_id,
-        week_number=new_week_num,
-        year=db_project.year,
-        planned_progress=0, 
-        actual_progress=0,
-        planned_description=phase_desc
-    )
-    db.add(new_wp)
+    ).scalar()
+    phase_desc = prev_desc or "Extended Development"
+
+    new_week_num = after_week + 1
+    db.execute(insert(models.WeeklyProgress), [{
+        "project_id": project_id,
+        "week_number": new_week_num + i,
+        "year": db_project.year,
+        "planned_progress": 0,
+        "actual_progress": 0,
+        "planned_description": phase_desc,
+    } for i in range(weeks)])
     
     # 3. Increase Duration
-    db_project.duration_weeks = current_duration + 1
+    db_project.duration_weeks = current_duration + weeks
+    touch(db_project)
     
     # 4. Log
-    log = models.ProjectLog(project_id=project_id, content=f"Project extended: Inserted Week {new_week_num}. Duration: {db_project.duration_weeks} weeks.")
+    log = models.ProjectLog(project_id=project_id, content=f"Project extended: Inserted {_week_label(new_week_num, weeks)}. Duration: {db_project.duration_weeks} weeks.")
     db.add(log)
+
+    # Hours of every later week moved out
+    rollup.rebuild(db, project_id)
     
     db.commit()
     db.refresh(db_project)
     return db_project
 
 @router.post("/{project_id}/reduce", response_model=schemas.Project)
-def reduce_project(project_id: int, target_week: int = None, db: Session = Depends(get_db)):
+def reduce_project(project_id: int, target_week: int = None, weeks: int = 1, db: Session = Depends(get_db)):
+    """
+    Removes `weeks` weeks starting at `target_week` (default: the last week).
+    Later weeks move in by the same amount.
+    """
     db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
     if not db_project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    # Sync duration with actual max week
-    max_wp = db.query(func.max(models.WeeklyProgress.week_number)).filter(models.WeeklyProgress.project_id == project_id).scalar()
-    real_max_week = max_wp or 0
-    if real_max_week > (db_project.duration_weeks or 0):
-        db_project.duration_weeks = real_max_week
-        db.commit()
-        db.refresh(db_project)
-
-    current_duration = db_project.duration_weeks or 12
+    current_duration = _sync_duration(db, db_project)
     if current_duration <= 1:
         raise HTTPException(status_code=400, detail="Cannot reduce duration below 1 week")
+    if weeks < 1:
+        raise HTTPException(status_code=400, detail="weeks must be at least 1")
     
-    # If target_week is None, default to last week
+    # If target_week is None, default to the last week(s)
     if target_week is None:
-        target_week = current_duration
+        target_week = current_duration - weeks + 1
 
-    if target_week < 1 or target_week > current_duration:
+    last_week = target_week + weeks - 1
+    if target_week < 1 or last_week > current_duration:
          raise HTTPException(status_code=400, detail=f"Invalid week number: {target_week} (Max: {current_duration})")
+    if weeks >= current_duration:
+        raise HTTPException(status_code=400, detail="Cannot reduce duration below 1 week")
 
-    # 1. Remove WeeklyProgress at target_week
-    target_prog = db.query(models.WeeklyProgress).filter(
-        models.WeeklyProgress.project_id == project_id,
-        models.WeeklyProgress.week_number == target_week
-    ).first()
-    
-    if target_prog:
-        db.delete(target_prog)
+    # 1. Remove the weeks, taking them out of the project aggregates first
+    WP = models.WeeklyProgress
+    in_range = (WP.project_id == project_id, WP.week_number >= target_week, WP.week_number <= last_week)
+    for removed in db.query(WP.actual_progress, WP.actual_description, WP.actual_hours).filter(*in_range):
+        apply_week_delta(db_project, removed, None)
+    db.execute(delete(WP).where(*in_range).execution_options(synchronize_session=False))
         
-    # 2. Shift weeks > target_week backward by 1
-    later_weeks = db.query(models.WeeklyProgress).filter(
-        models.WeeklyProgress.project_id == project_id,
-        models.WeeklyProgress.week_number > target_week
-    ).order_by(models.WeeklyProgress.week_number).all()
-    
-    for wk in later_weeks:
-        wk.week_number -= 1
+    # 2. Shift later weeks back in one statement
+    shift_weeks(db, project_id, last_week, -weeks)
 
     # 3. Decrease Duration
-    db_project.duration_weeks = current_duration - 1
+    db_project.duration_weeks = current_duration - weeks
+    touch(db_project)
     
     # 4. Log
-    log = models.ProjectLog(project_id=project_id, content=f"Project duration reduced: Deleted Week {target_week}. Duration: {db_project.duration_weeks} weeks.")
+    log = models.ProjectLog(project_id=project_id, content=f"Project duration reduced: Deleted {_week_label(target_week, weeks)}. Duration: {db_project.duration_weeks} weeks.")
     db.add(log)
+
+    rollup.rebuild(db, project_id)
     
     db.commit()
     db.refresh(db_project)
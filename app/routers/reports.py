@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app import models
-from app.database import get_db
+from app import jobs, models
+from app.database import ReadSessionLocal, get_read_db
 from datetime import datetime, date, timedelta
+from typing import Callable, Optional
 
 router = APIRouter(
     prefix="/api/reports",
@@ -11,12 +12,17 @@ router = APIRouter(
 )
 
 @router.get("/generate")
-def generate_report(type: str, year: int, period: int = 1, db: Session = Depends(get_db)):
+def generate_report(type: str, year: int, period: int = 1, db: Session = Depends(get_read_db)):
     """
     type: 'weekly', 'monthly', 'spring_keynote', 'autumn_keynote'
     period: week_number for weekly, month_number for monthly. Ignored for keynotes.
     """
-    
+    return {"content": build_report(db, type, year, period)}
+
+def build_report(db: Session, type: str, year: int, period: int = 1,
+                 progress: Optional[Callable[[int, int], None]] = None) -> str:
+    """The report's Markdown; progress(done, total) is called once per project listed."""
+    progress = progress or (lambda done, total: None)
     report_lines = []
     
     if type == 'weekly':
@@ -40,7 +46,8 @@ def generate_report(type: str, year: int, period: int = 1, db: Session = Depends
         report_lines.append(f"Total Active Projects: {len(projects_map)}")
         report_lines.append("")
         
-        for pid, wp in projects_map.items():
+        for done, (pid, wp) in enumerate(projects_map.items()):
+            progress(done, len(projects_map))
             project = db.query(models.Project).get(pid)
             if not project: continue
             
@@ -77,7 +84,8 @@ def generate_report(type: str, year: int, period: int = 1, db: Session = Depends
             if log.project_id not in grouped_logs: grouped_logs[log.project_id] = []
             grouped_logs[log.project_id].append(log)
             
-        for pid, p_logs in grouped_logs.items():
+        for done, (pid, p_logs) in enumerate(grouped_logs.items()):
+            progress(done, len(grouped_logs))
             project = db.query(models.Project).get(pid)
             if not project: continue
             
@@ -125,7 +133,8 @@ def generate_report(type: str, year: int, period: int = 1, db: Session = Depends
         
         report_lines.append("## Project Highlights")
         
-        for p in projects:
+        for done, p in enumerate(projects):
+            progress(done, len(projects))
             report_lines.append(f"### {p.name}")
             report_lines.append(f"**Status**: {p.status}")
             if p.closure_date:
@@ -136,4 +145,26 @@ def generate_report(type: str, year: int, period: int = 1, db: Session = Depends
             # Maybe count items completed? For now just list them.
             report_lines.append("")
             
-    return {"content": "\n".join(report_lines)}
+    return "\n".join(report_lines)
+
+# Background jobs (app.jobs)
+
+REPORT_TYPES = ('weekly', 'monthly', 'spring_keynote', 'autumn_keynote')
+
+def run_report_job(ctx: jobs.JobContext):
+    params = ctx.params
+    with ReadSessionLocal() as db:
+        content = build_report(db, params["type"], params["year"], params["period"], progress=ctx.report)
+    with open(ctx.result_path, "w", encoding="utf-8") as out:
+        out.write(content)
+    return f"{params['type']}_report_{params['year']}_{params['period']}.md", "text/markdown; charset=utf-8"
+
+def validate_report_params(params: dict) -> dict:
+    if params.get("type") not in REPORT_TYPES:
+        raise ValueError(f"type must be one of {', '.join(REPORT_TYPES)}")
+    try:
+        return {"type": params["type"], "year": int(params["year"]), "period": int(params.get("period", 1))}
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("year and period must be integers")
+
+jobs.register("report", run_report_job, concurrency=2, validate=validate_report_params)
@@ -1,10 +1,19 @@
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app import models, schemas
-from app.database import get_db
+from app import models, schemas, importer, jobs
+from app.database import ReadSessionLocal, SessionLocal, get_db, get_read_db
+from app.fragments import fragment_cache
+from app.loaders import relationship_loader
+from app.serialization import json_response
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import quote
 import io
+import json
+import os
 
 router = APIRouter(
     prefix="/api/sync",
@@ -12,73 +21,120 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
-MARKDOWN_HEADER = "# PROJECT_EXPORT_v1"
+MARKDOWN_HEADER = importer.MARKDOWN_HEADER
+
+EXPORT_CHUNK_SIZE = 50  # projects loaded per query by the streaming export
+EXPORT_LOADERS = tuple(
+    relationship_loader(attr)
+    for attr in (models.Project.lead_engineer, models.Project.weekly_progress, models.Project.logs)
+)
+
+def project_markdown_lines(p: models.Project) -> List[str]:
+    lines = []
+    lines.append(f"## Project: {p.name}")
+    lines.append(f"- ID: {p.id}")
+    lines.append(f"- Year: {p.year}")
+    lines.append(f"- CFT Unit: {p.cft_unit}")
+    lines.append(f"- Status: {p.status}")
+    lines.append(f"- Request Unit: {p.request_unit or ''}")
+    lines.append(f"- Lead Engineer: {p.lead_engineer.name if p.lead_engineer else 'None'}")
+    lines.append(f"- Description: {p.description or ''}")
+
+    # Key Dates
+    dates = []
+    if p.start_date: dates.append(f"Start={p.start_date}")
+    if p.predicted_end_date: dates.append(f"PredictedEnd={p.predicted_end_date}")
+    if p.kickoff_date: dates.append(f"Kickoff={p.kickoff_date}")
+    if p.closure_date: dates.append(f"Closure={p.closure_date}")
+    lines.append(f"- Key Dates: {', '.join(dates)}")
+
+    # Schedule
+    lines.append(f"- Schedule: Day=[{p.meeting_day or ''}], Time=[{p.meeting_time or ''}]")
+    lines.append("")
+
+    # Weekly Progress
+    lines.append("### Weekly Progress")
+    lines.append("| Week | Planned | Actual | Hours | Description |")
+    lines.append("|------|---------|--------|-------|-------------|")
+    # Sort by week
+    wps = sorted(p.weekly_progress, key=lambda x: x.week_number)
+    for wp in wps:
+        desc = wp.actual_description or wp.planned_description or ""
+        desc = desc.replace("\n", " ").replace("|", "/") # Sanitize for table
+        lines.append(f"| {wp.week_number} | {wp.planned_progress} | {wp.actual_progress} | {wp.actual_hours} | {desc} |")
+    lines.append("")
+
+    # Meeting Logs/History
+    lines.append("### Meeting Logs")
+    # Combine ProjectLogs and Meeting updates if we had them linked, for now use ProjectLog
+    logs = sorted(p.logs, key=lambda x: x.created_at, reverse=True)
+    for log in logs:
+        lines.append(f"- Date: {log.created_at.strftime('%Y-%m-%d')}")
+        lines.append(f"- Content: {log.content}")
+
+    lines.append("")
+    lines.append("---")
+    lines.append("")
+    return lines
 
 def generate_markdown_content(projects: List[models.Project]) -> str:
     lines = [MARKDOWN_HEADER, ""]
-    
     for p in projects:
-        lines.append(f"## Project: {p.name}")
-        lines.append(f"- ID: {p.id}")
-        lines.append(f"- Year: {p.year}")
-        lines.append(f"- CFT Unit: {p.cft_unit}")
-        lines.append(f"- Status: {p.status}")
-        lines.append(f"- Request Unit: {p.request_unit or ''}")
-        lines.append(f"- Lead Engineer: {p.lead_engineer.name if p.lead_engineer else 'None'}")
-        lines.append(f"- Description: {p.description or ''}")
-        
-        # Key Dates
-        dates = []
-        if p.start_date: dates.append(f"Start={p.start_date}")
-        if p.predicted_end_date: dates.append(f"PredictedEnd={p.predicted_end_date}")
-        if p.kickoff_date: dates.append(f"Kickoff={p.kickoff_date}")
-        if p.closure_date: dates.append(f"Closure={p.closure_date}")
-        lines.append(f"- Key Dates: {', '.join(dates)}")
-        
-        # Schedule
-        lines.append(f"- Schedule: Day=[{p.meeting_day or ''}], Time=[{p.meeting_time or ''}]")
-        lines.append("")
-        
-        # Weekly Progress
-        lines.append("### Weekly Progress")
-        lines.append("| Week | Planned | Actual | Hours | Description |")
-        lines.append("|------|---------|--------|-------|-------------|")
-        # Sort by week
-        wps = sorted(p.weekly_progress, key=lambda x: x.week_number)
-        for wp in wps:
-            desc = wp.actual_description or wp.planned_description or ""
-            desc = desc.replace("\n", " ").replace("|", "/") # Sanitize for table
-            lines.append(f"| {wp.week_number} | {wp.planned_progress} | {wp.actual_progress} | {wp.actual_hours} | {desc} |")
-        lines.append("")
-        
-        # Meeting Logs/History
-        lines.append("### Meeting Logs")
-        # Combine ProjectLogs and Meeting updates if we had them linked, for now use ProjectLog
-        logs = sorted(p.logs, key=lambda x: x.created_at, reverse=True)
-        for log in logs:
-            lines.append(f"- Date: {log.created_at.strftime('%Y-%m-%d')}")
-            lines.append(f"- Content: {log.content}")
-        
-        lines.append("")
-        lines.append("---")
-        lines.append("")
-        
+        lines.extend(project_markdown_lines(p))
     return "\n".join(lines)
 
+def iter_markdown_export(project_ids: List[int], chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Same document as generate_markdown_content, one project at a time.
+    Projects are loaded chunk_size at a time with their weeks, logs and lead
+    engineer, and released before the next chunk, so memory does not grow
+    with the number of projects. Uses its own session: a StreamingResponse
+    body runs after the request's dependencies have been closed.
+    """
+    yield MARKDOWN_HEADER + "\n"
+    ids = sorted(set(project_ids))
+    db = ReadSessionLocal()
+    try:
+        for i in range(0, len(ids), chunk_size):
+            chunk = db.execute(
+                select(models.Project).options(*EXPORT_LOADERS)
+                .where(models.Project.id.in_(ids[i:i + chunk_size])).order_by(models.Project.id)
+            ).unique().scalars().all()
+            for p in chunk:
+                yield "".join("\n" + line for line in project_markdown_lines(p))
+            del chunk
+            db.expunge_all()
+    finally:
+        db.close()
+
+def export_filename(names: List[str]) -> str:
+    if len(names) == 1:
+        # Sanitize filename
+        safe_name = "".join([c for c in names[0] if c.isalnum() or c in (' ', '-', '_')]).strip()
+        return f"{safe_name}.md"
+    return f"Projects_Export_{datetime.now().strftime('%Y%m%d')}.md"
+
 @router.post("/export")
-def export_projects(project_ids: List[int], db: Session = Depends(get_db)):
-    projects = db.query(models.Project).filter(models.Project.id.in_(project_ids)).all()
+def export_projects(project_ids: List[int], stream: bool = False, db: Session = Depends(get_read_db)):
+    """
+    {"content", "filename"} JSON, or with ?stream=true the Markdown file
+    itself, streamed (see iter_markdown_export).
+    """
+    if stream:
+        names = db.execute(
+            select(models.Project.name).where(models.Project.id.in_(project_ids)).limit(2)
+        ).scalars().all()
+        filename = export_filename(names)
+        return StreamingResponse(
+            iter_markdown_export(project_ids),
+            media_type="text/markdown; charset=utf-8",
+            headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"},
+        )
+
+    projects = db.query(models.Project).options(*EXPORT_LOADERS).filter(models.Project.id.in_(project_ids)).all()
     content = generate_markdown_content(projects)
-    
-    # Generate Filename
-    if len(projects) == 1:
-        # Sanitize filename
-        safe_name = "".join([c for c in projects[0].name if c.isalnum() or c in (' ', '-', '_')]).strip()
-        filename = f"{safe_name}.md"
-    else:
-        filename = f"Projects_Export_{datetime.now().strftime('%Y%m%d')}.md"
-        
-    return {"content": content, "filename": filename}
+    filename = export_filename([p.name for p in projects])
+    return json_response(Dict[str, str], {"content": content, "filename": filename})
 
 @router.get("/template")
 def get_template():
@@ -108,270 +164,66 @@ def get_template():
     return {"content": content}
 
 @router.post("/import")
-async def import_projects(file: UploadFile = File(...), db: Session = Depends(get_db)):
-    content = await file.read()
+def import_projects(file: UploadFile = File(...), dry_run: bool = False,
+                    db: Session = Depends(get_db), read_db: Session = Depends(get_read_db)):
+    # The upload is spooled to disk by the form parser; read it in chunks.
+    # dry_run=true writes nothing and returns the per-project diff instead.
     try:
-        text_content = content.decode("utf-8")
+        if dry_run:
+            return importer.dry_run(read_db, importer.read_chunks(file.file))
+        log_messages = importer.import_markdown(db, importer.read_chunks(file.file))
     except UnicodeDecodeError:
         raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
-        
-    text_content = text_content.strip() # Remove leading/trailing whitespace/BOM
-    
-    if not text_content.startswith(MARKDOWN_HEADER):
-        # Fallback check for potential BOM or slight mismatch
-        if MARKDOWN_HEADER not in text_content[:50]:
-            raise HTTPException(status_code=400, detail="Invalid file format. Header missing.")
-        
-    # Robust Parsing Logic using Regex
-    import re
-    # Split by line that starts with "## Project: ", allowing for flexible spacing
-    projects_data = re.split(r'^\s*## Project:\s*', text_content, flags=re.MULTILINE)
-    
-    log_messages = []
-    
-    for p_chunk in projects_data[1:]: # Skip preamble
-        if not p_chunk.strip(): continue # Skip empty chunks
-        
-        lines = p_chunk.strip().split("\n")
-        name = lines[0].strip()
-        
-        # Extract basic info
-        info = {}
-        current_section = "info"
-        weekly_progress_rows = []
-        logs = []
-        
-        for line in lines[1:]:
-            line = line.strip()
-            if line.startswith("### Weekly Progress"):
-                current_section = "weekly"
-                continue
-            elif line.startswith("### Meeting Logs"):
-                current_section = "logs"
-                continue
-            # elif line.startswith("---"):
-            #    break 
-            # User uses --- as separator between logs, so we should NOT break. 
-            # The split by "## Project:" handles the main separation.
-                
-            if current_section == "info":
-                clean_line = line.lstrip("-* ").strip()
-                if clean_line.startswith("ID:"): info['id'] = clean_line.split(":", 1)[1].strip()
-                elif clean_line.startswith("Year:"): info['year'] = int(clean_line.split(":", 1)[1].strip())
-                elif clean_line.startswith("CFT Unit:"): info['cft'] = clean_line.split(":", 1)[1].strip()
-                elif clean_line.startswith("Status:"): info['status'] = clean_line.split(":", 1)[1].strip()
-                elif clean_line.startswith("Request Unit:"): info['request_unit'] = clean_line.split(":", 1)[1].strip()
-                elif clean_line.startswith("需求窗口:"): info['request_unit'] = clean_line.split(":", 1)[1].strip()
-                elif clean_line.startswith("Lead Engineer:"): info['lead'] = clean_line.split(":", 1)[1].strip()
-                elif clean_line.startswith("Description:"): info['desc'] = clean_line.split(":", 1)[1].strip()
-                elif clean_line.startswith("Key Dates:"): 
-                    parts = clean_line.split(":", 1)[1].split(",")
-                    for p in parts:
-                        if "=" in p:
-                            k, v = p.split("=")
-                            info[k.strip()] = v.strip()
-                elif clean_line.startswith("Schedule:"):
-                    # Day=[Mon], Time=[10:00]
-                    # import re is already imported
-                    m_day = re.search(r"Day=\[(.*?)\]", line)
-                    m_time = re.search(r"Time=\[(.*?)\]", line)
-                    if m_day: info['meeting_day'] = m_day.group(1)
-                    if m_time: info['meeting_time'] = m_time.group(1)
+    except importer.ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-            elif current_section == "weekly":
-                if line.startswith("|") and not "Planned" in line and not line.startswith("|--") and not line.startswith("| --"):
-                    cols = [c.strip() for c in line.split("|") if c.strip()]
-                    if len(cols) >= 5:
-                        def safe_float(val):
-                            try:
-                                return float(val)
-                            except ValueError:
-                                return 0.0
-                        
-                        weekly_progress_rows.append({
-                            "week": int(safe_float(cols[0])), # Handle potential parsing error or row mismatch
-                            "planned": safe_float(cols[1]),
-                            "actual": safe_float(cols[2]),
-                            "hours": safe_float(cols[3]), # Handle '-'
-                            "desc": cols[4]
-                        })
+    return {"status": "success", "logs": log_messages}
 
-            elif current_section == "logs":
-                clean_line = line.lstrip("-* ").strip()
-                if clean_line.startswith("Date:"):
-                    logs.append({"date": clean_line.split(":", 1)[1].strip(), "content": ""})
-                elif clean_line.startswith("Content:"):
-                    if logs: logs[-1]["content"] = clean_line.split(":", 1)[1].strip()
-                elif logs and line and not line.strip().startswith("-") and not line.strip().startswith("*"):
-                    # Append multiline content
-                    logs[-1]["content"] += " " + line.strip()
+# Background jobs (app.jobs): the same import and export, run outside the request
 
-        # Database Update Logic
-        # 1. Find or Create Engineer
-        lead_id = None
-        if info.get('lead') and info['lead'] != 'None':
-            eng = db.query(models.Engineer).filter(models.Engineer.name == info['lead']).first()
-            if not eng:
-                eng = models.Engineer(name=info['lead'])
-                db.add(eng)
-                db.commit()
-                db.refresh(eng)
-            lead_id = eng.id
-            
-        # 2. Find or Create Project
-        project = None
-        if info.get('id') and info['id'] != 'New':
-            try:
-                db_id = int(info['id'])
-                project = db.query(models.Project).filter(models.Project.id == db_id).first()
-            except ValueError:
-                # ID is not an integer (e.g., custom code), skip ID lookup
-                pass
-        
-        # Fallback: Find by Name if ID lookup failed or wasn't applicable
-        if not project:
-            project = db.query(models.Project).filter(models.Project.name == name).first()
-        
-        if not project:
-            # Create
-            project = models.Project(
-                name=name,
-                year=info.get('year', 2025),
-                cft_unit=info.get('cft', 'Unknown'),
-                request_unit=info.get('request_unit'),
-                status=info.get('status', 'Planning'),
-                description=info.get('desc'),
-                lead_engineer_id=lead_id
-            )
-            
-            # If the ID was a custom string, maybe append it to description? 
-            # For now, we mainly want to avoid crashing.
-            
-            db.add(project)
-            db.commit()
-            db.refresh(project)
-            log_messages.append(f"Created Project: {name}")
+def run_import_job(ctx: jobs.JobContext):
+    with open(ctx.input_path, "rb") as f:
+        chunks = ctx.track(importer.read_chunks(f), os.path.getsize(ctx.input_path))
+        if ctx.params.get("dry_run"):
+            with ReadSessionLocal() as db:
+                result = importer.dry_run(db, chunks)
         else:
-            # Update basic fields
-            project.cft_unit = info.get('cft', project.cft_unit)
-            if info.get('request_unit'):
-                project.request_unit = info['request_unit']
-            project.status = info.get('status', project.status)
-            project.description = info.get('desc', project.description)
-            project.lead_engineer_id = lead_id
-            log_messages.append(f"Updated Project: {name}")
-            
-        # Update extra fields
-        if 'Start' in info: project.start_date = datetime.strptime(info['Start'], '%Y-%m-%d').date()
-        if 'PredictedEnd' in info: project.predicted_end_date = datetime.strptime(info['PredictedEnd'], '%Y-%m-%d').date()
-        if 'Kickoff' in info: project.kickoff_date = datetime.strptime(info['Kickoff'], '%Y-%m-%d').date()
-        if 'Closure' in info: project.closure_date = datetime.strptime(info['Closure'], '%Y-%m-%d').date()
-        if 'meeting_day' in info: project.meeting_day = info['meeting_day']
-        if 'meeting_time' in info: project.meeting_time = info['meeting_time']
-        
-        db.commit()
-        
-        # 3. Update Weekly Progress
-        for row in weekly_progress_rows:
-            wp = db.query(models.WeeklyProgress).filter(
-                models.WeeklyProgress.project_id == project.id,
-                models.WeeklyProgress.week_number == row['week']
-            ).first()
-            
-            if wp:
-                wp.planned_progress = row['planned']
-                wp.actual_progress = row['actual']
-                wp.actual_hours = row['hours']
-                if row['actual'] > 0:
-                     wp.actual_description = row['desc']
-                else:
-                     wp.planned_description = row['desc']
-            else:
-                wp = models.WeeklyProgress(
-                    project_id=project.id,
-                    week_number=row['week'],
-                    year=project.year,
-                    planned_progress=row['planned'],
-                    actual_progress=row['actual'],
-                    actual_hours=row['hours'],
-                    planned_description=row['desc']
-                )
-                db.add(wp)
-        db.commit()
-        
-        # 4. Import Logs (Check duplicates)
-        for log in logs:
-            # Simple deduplication by date + beginning of content
-            exists = db.query(models.ProjectLog).filter(
-                models.ProjectLog.project_id == project.id,
-                models.ProjectLog.content.like(f"%{log['content'][:20]}%") # Rough check
-            ).first()
-            
-            if not exists:
-                new_log = models.ProjectLog(
-                    project_id=project.id,
-                    content=f"[Imported] {log['content']}"
-                )
-                # Try to set date? ProjectLog uses created_at which is DateTime.
-                # We can't strictly force it without a hack or schema change, so just append.
-                # Or we can store the date in the content.
-                new_log.content = f"[{log['date']}] {log['content']}"
-                db.add(new_log)
-                
-            # Sync to Weekly Progress (Actual Description)
-            try:
-                log_date = datetime.strptime(log['date'], '%Y-%m-%d').date()
-                # ISO Week
-                iso_year, iso_week, _ = log_date.isocalendar()
-                
-                # Check if this week exists in WeeklyProgress
-                wp_sync = db.query(models.WeeklyProgress).filter(
-                    models.WeeklyProgress.project_id == project.id,
-                    models.WeeklyProgress.week_number == iso_week,
-                    models.WeeklyProgress.year == iso_year
-                ).first()
-                
-                if wp_sync:
-                    # Append if not present to avoid duplication if running import multiple times
-                    # Simple check if content is already in description
-                    current_desc = wp_sync.actual_description or ""
-                    # We add a marker or just checking text similarity?
-                    # User request: "Meeting records should also sync to project actual progress"
-                    # Let's prepend or append carefully.
-                    
-                    # If the description is empty, just fill it.
-                    if not current_desc:
-                        wp_sync.actual_description = f"[Meeting {log['date']}] {log['content']}"
-                    elif log['content'] not in current_desc:
-                        # Append
-                        wp_sync.actual_description = f"{current_desc}\n[Meeting {log['date']}] {log['content']}"
-                else:
-                    # Option: Create the week if it doesn't exist? 
-                    # User markdown table might miss weeks but have logs.
-                    # Create it.
-                    wp_sync = models.WeeklyProgress(
-                        project_id=project.id,
-                        week_number=iso_week,
-                        year=iso_year,
-                        planned_progress=0, # Unknown
-                        actual_progress=0, # Unknown, just logging info
-                        actual_description=f"[Meeting {log['date']}] {log['content']}"
-                    )
-                    db.add(wp_sync)
-                    
-            except ValueError:
-                pass # Invalid date format, skip sync
-                
-        db.commit()
-        db.commit()
+            with SessionLocal() as db:
+                result = {"status": "success", "logs": importer.import_markdown(db, chunks)}
+    with open(ctx.result_path, "w", encoding="utf-8") as out:
+        json.dump(jsonable_encoder(result), out, ensure_ascii=False)
+    return "import_result.json", "application/json"
 
-    return {"status": "success", "logs": log_messages}
+def run_export_job(ctx: jobs.JobContext):
+    ids = ctx.params["project_ids"]
+    with ReadSessionLocal() as db:
+        names = db.execute(
+            select(models.Project.name).where(models.Project.id.in_(ids)).limit(2)
+        ).scalars().all()
+    with open(ctx.result_path, "w", encoding="utf-8") as out:
+        for done, part in enumerate(iter_markdown_export(ids)):
+            ctx.report(done, len(ids))
+            out.write(part)
+    return export_filename(names), "text/markdown; charset=utf-8"
+
+def validate_import_params(params: Dict) -> Dict:
+    return {"dry_run": bool(params.get("dry_run", False))}
+
+def validate_export_params(params: Dict) -> Dict:
+    ids = params.get("project_ids")
+    if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+        raise ValueError("project_ids must be a list of project ids")
+    return {"project_ids": ids}
+
+jobs.register("import", run_import_job, concurrency=1, validate=validate_import_params, needs_file=True)
+jobs.register("export", run_export_job, concurrency=2, validate=validate_export_params)
 
 @router.delete("/reset_database")
 def reset_database(db: Session = Depends(get_db)):
     try:
         # Delete all data from tables
         # Order matters for Foreign Keys if strict
+        db.query(models.WeeklyHoursRollup).delete()
         db.query(models.WeeklyProgress).delete()
         db.query(models.ProjectLog).delete()
         db.query(models.Task).delete()
@@ -380,6 +232,7 @@ def reset_database(db: Session = Depends(get_db)):
         db.query(models.Engineer).delete()
         
         db.commit()
+        fragment_cache.clear()
         return {"status": "success", "message": "All database data has been deleted."}
     except Exception as e:
         db.rollback()
@@ -0,0 +1,243 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from sqlalchemy import Integer, and_, cast, func, tuple_
+from typing import Optional
+from datetime import date, timedelta
+from app import models, schemas
+from app.database import get_read_db
+from app.gantt import window_predicate
+from app.utils import iso_week_bounds, iso_weeks_in_year
+from app.weeks import PROJECT_SPAN_YEARS, project_week, week_of
+
+router = APIRouter(
+    prefix="/api/workload",
+    tags=["workload"],
+    responses={404: {"description": "Not found"}},
+)
+
+CAPACITY_HOURS = 40.0
+MAX_RANGE_WEEKS = 106
+UNASSIGNED = "Unassigned"
+
+# Hours are attributed to the project's lead engineer. Weekly rows count in the
+# ISO week weeks.project_week gives them (week numbers past the end of the
+# project's year roll over into the next), as in the weekly_hours_rollup
+# behind /heatmap; maintenance logs in the ISO week of log_date.
+WP = models.WeeklyProgress
+ML = models.MaintenanceLog
+Project = models.Project
+Engineer = models.Engineer
+
+
+def _resolve_week(year: Optional[int], week: Optional[int]):
+    if year is None or week is None:
+        iso = date.today().isocalendar()
+        year, week = year or iso[0], week or iso[1]
+    try:
+        start, end = iso_week_bounds(year, week)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{year} has no ISO week {week}")
+    return year, week, start, end
+
+
+def _active_query(db: Session, *columns):
+    return (
+        db.query(*columns)
+        .select_from(WP)
+        .join(Project, Project.id == WP.project_id)
+        .outerjoin(Engineer, Engineer.id == Project.lead_engineer_id)
+        .filter(WP.actual_hours > 0)
+    )
+
+
+def _weeks_between(start: date, end: date):
+    """Predicate on the weekly rows whose week falls in [start, end) (end is a Monday)."""
+    last = end - timedelta(days=1)
+    years = range(week_of(start).iso_year - PROJECT_SPAN_YEARS + 1, week_of(last).iso_year + 1)
+    return window_predicate(years, start, last)
+
+
+def _maintenance_query(db: Session, start: date, end: date, *columns):
+    return (
+        db.query(*columns)
+        .select_from(ML)
+        .join(Project, Project.id == ML.project_id)
+        .outerjoin(Engineer, Engineer.id == Project.lead_engineer_id)
+        .filter(ML.log_date >= start, ML.log_date < end, ML.hours_spent > 0)
+    )
+
+
+@router.get("", response_model=schemas.WeekWorkload)
+def read_week_workload(
+    year: Optional[int] = None,
+    week: Optional[int] = None,
+    items: bool = True,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Per-engineer hours for one ISO week (defaults to the current week).
+    `items=false` returns only the totals.
+    """
+    year, week, start, end = _resolve_week(year, week)
+
+    active = dict(
+        _active_query(db, Engineer.id, func.sum(WP.actual_hours))
+        .filter(_weeks_between(start, end))
+        .group_by(Engineer.id)
+        .all()
+    )
+    maintenance = dict(
+        _maintenance_query(db, start, end, Engineer.id, func.sum(ML.hours_spent))
+        .group_by(Engineer.id)
+        .all()
+    )
+
+    buckets = {
+        eng_id: schemas.EngineerWorkload(engineer_id=eng_id, name=name)
+        for eng_id, name in db.query(Engineer.id, Engineer.name).order_by(Engineer.id)
+    }
+    unassigned = schemas.EngineerWorkload(name=UNASSIGNED)
+    buckets[None] = unassigned
+
+    for eng_id, bucket in buckets.items():
+        bucket.active_hours = active.get(eng_id) or 0
+        bucket.maintenance_hours = maintenance.get(eng_id) or 0
+        bucket.total_hours = bucket.active_hours + bucket.maintenance_hours
+
+    if items:
+        active_rows = (
+            _active_query(db, Engineer.id, WP.project_id, Project.name,
+                          func.coalesce(WP.actual_description, WP.planned_description), WP.actual_hours)
+            .filter(_weeks_between(start, end))
+            .order_by(Project.name, WP.project_id)
+        )
+        for eng_id, project_id, project_name, description, hours in active_rows:
+            buckets[eng_id].active_items.append(schemas.WorkloadItem(
+                project_id=project_id, project_name=project_name,
+                description=description or "Work Logged", hours=hours,
+            ))
+
+        maintenance_rows = (
+            _maintenance_query(db, start, end, Engineer.id, ML.project_id, Project.name,
+                               ML.log_type, ML.content, ML.hours_spent, ML.log_date)
+            .order_by(Project.name, ML.project_id, ML.log_date, ML.id)
+        )
+        for eng_id, project_id, project_name, log_type, content, hours, log_date in maintenance_rows:
+            buckets[eng_id].maintenance_items.append(schemas.WorkloadItem(
+                project_id=project_id, project_name=project_name, description=content,
+                hours=hours, log_type=log_type, log_date=log_date,
+            ))
+
+    return schemas.WeekWorkload(
+        year=year, week=week, start_date=start, end_date=end - timedelta(days=1),
+        weeks_in_year=iso_weeks_in_year(year), capacity_hours=CAPACITY_HOURS,
+        engineers=[b for eng_id, b in buckets.items() if eng_id is not None],
+        unassigned=unassigned,
+    )
+
+
+def _week_span(from_year: int, from_week: int, to_year: Optional[int], to_week: Optional[int]):
+    """The ISO weeks from (from_year, from_week) to (to_year, to_week) inclusive."""
+    _, _, start, _ = _resolve_week(from_year, from_week)
+    to_year, to_week, _, end = _resolve_week(to_year or from_year, to_week or from_week)
+    n_weeks = (end - start).days // 7
+    if n_weeks < 1:
+        raise HTTPException(status_code=400, detail="Range end is before its start")
+    if n_weeks > MAX_RANGE_WEEKS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {MAX_RANGE_WEEKS} weeks")
+
+    weeks = []
+    for i in range(n_weeks):
+        week = week_of(start + timedelta(weeks=i))
+        weeks.append(schemas.IsoWeek(year=week.iso_year, week=week.iso_week, start_date=week.start))
+    return weeks, (to_year, to_week), start, end
+
+
+def _hour_matrix(db: Session, n_weeks: int):
+    """One zeroed row per engineer (by id) plus the unassigned row, keyed by engineer id / None."""
+    rows = {
+        eng_id: schemas.EngineerWeeklyHours(engineer_id=eng_id, name=name, hours=[0.0] * n_weeks, total_hours=0)
+        for eng_id, name in db.query(Engineer.id, Engineer.name).order_by(Engineer.id)
+    }
+    rows[None] = schemas.EngineerWeeklyHours(name=UNASSIGNED, hours=[0.0] * n_weeks, total_hours=0)
+    return rows
+
+
+def _matrix_response(weeks, rows):
+    for row in rows.values():
+        row.total_hours = sum(row.hours)
+    return schemas.WorkloadRange(
+        weeks=weeks, capacity_hours=CAPACITY_HOURS,
+        engineers=[row for eng_id, row in rows.items() if eng_id is not None],
+        unassigned=rows[None],
+    )
+
+
+@router.get("/range", response_model=schemas.WorkloadRange)
+def read_workload_range(
+    from_year: int,
+    from_week: int,
+    to_year: Optional[int] = None,
+    to_week: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Per-engineer hours for every ISO week from (from_year, from_week) to
+    (to_year, to_week) inclusive, aggregated from the raw rows; the end
+    defaults to the start week. See /heatmap for long ranges.
+    """
+    weeks, last, start, end = _week_span(from_year, from_week, to_year, to_week)
+    index = {(w.year, w.week): i for i, w in enumerate(weeks)}
+    engineers = _hour_matrix(db, len(weeks))
+
+    active_rows = (
+        _active_query(db, Engineer.id, WP.year, WP.week_number, func.sum(WP.actual_hours))
+        .filter(_weeks_between(start, end))
+        .group_by(Engineer.id, WP.year, WP.week_number)
+    )
+    for eng_id, year, week_number, hours in active_rows:
+        i = index.get(tuple(project_week(year, week_number)[:2]))
+        if i is not None:
+            engineers[eng_id].hours[i] += hours
+
+    # Week offset from the range's first Monday, computed in SQL
+    offset = cast((func.julianday(ML.log_date) - func.julianday(start.isoformat())) / 7, Integer)
+    maintenance_rows = (
+        _maintenance_query(db, start, end, Engineer.id, offset, func.sum(ML.hours_spent))
+        .group_by(Engineer.id, offset)
+    )
+    for eng_id, i, hours in maintenance_rows:
+        engineers[eng_id].hours[i] += hours
+
+    return _matrix_response(weeks, engineers)
+
+
+@router.get("/heatmap", response_model=schemas.WorkloadRange)
+def read_workload_heatmap(
+    from_year: int,
+    from_week: int,
+    to_year: Optional[int] = None,
+    to_week: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Engineers x weeks matrix for a quarter or a year, read only from the
+    weekly_hours_rollup table (one row per project and week with hours).
+    Same hours as /range, which maps the weekly rows the same way.
+    """
+    weeks, last, _, _ = _week_span(from_year, from_week, to_year, to_week)
+    index = {(w.year, w.week): i for i, w in enumerate(weeks)}
+    engineers = _hour_matrix(db, len(weeks))
+
+    R = models.WeeklyHoursRollup
+    key = tuple_(R.iso_year, R.iso_week)
+    cells = (
+        db.query(R.engineer_id, R.iso_year, R.iso_week, func.sum(R.active_hours + R.maintenance_hours))
+        .filter(and_(key >= (from_year, from_week), key <= last))
+        .group_by(R.engineer_id, R.iso_year, R.iso_week)
+    )
+    for eng_id, year, week, hours in cells:
+        # A deleted engineer's hours count as unassigned
+        engineers.get(eng_id, engineers[None]).hours[index[(year, week)]] += hours
+
+    return _matrix_response(weeks, engineers)
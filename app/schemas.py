@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import date, datetime
 
 # Engineer Schemas
@@ -82,6 +82,15 @@ class MaintenanceLog(MaintenanceLogBase):
     class Config:
         from_attributes = True
 
+# Cursor-paged timelines: pass next_cursor back as ?cursor= for the next page
+class ProjectLogPage(BaseModel):
+    items: List[ProjectLog]
+    next_cursor: Optional[str] = None
+
+class MaintenanceLogPage(BaseModel):
+    items: List[MaintenanceLog]
+    next_cursor: Optional[str] = None
+
 class ProjectBase(BaseModel):
     name: str
     cft_unit: str
@@ -102,11 +111,13 @@ class ProjectBase(BaseModel):
     
 class ProjectCreate(ProjectBase):
     lead_engineer_name: Optional[str] = None # For Find or Create logic
+    plan_template: Optional[str] = None # Name of a PlanTemplate; derived from the project name if empty
 
 class Project(ProjectBase):
     id: int
     status: str
     progress: int
+    total_actual_hours: Optional[float] = 0
     lead_engineer: Optional[Engineer] = None
     weekly_progress: List[WeeklyProgress] = []
     updates: List[ProjectUpdate] = []
@@ -115,6 +126,21 @@ class Project(ProjectBase):
     class Config:
         from_attributes = True
 
+class ProjectSummary(BaseModel):
+    """Lightweight list item: no weekly rows, updates or logs."""
+    id: int
+    name: str
+    cft_unit: str
+    year: int
+    status: str
+    progress: int
+    duration_weeks: Optional[int] = None
+    meeting_day: Optional[str] = None
+    meeting_time: Optional[str] = None
+    lead_engineer: Optional[Engineer] = None
+    class Config:
+        from_attributes = True
+
 # Meeting Schemas
 class MeetingBase(BaseModel):
     date: date
@@ -135,6 +161,84 @@ class Meeting(MeetingBase):
 class Config:
         from_attributes = True
 
+# Plan Template Schemas
+class PlanPhase(BaseModel):
+    description: str
+    weeks: Optional[int] = None # None = stretches to fill the project
+
+class PlanTemplateBase(BaseModel):
+    name: str
+    description: Optional[str] = None
+    phases: List[PlanPhase]
+
+class PlanTemplateCreate(PlanTemplateBase):
+    pass
+
+class PlanTemplate(PlanTemplateBase):
+    id: int
+    class Config:
+        from_attributes = True
+
+# Workload Schemas (weeks are ISO weeks)
+class WorkloadItem(BaseModel):
+    project_id: int
+    project_name: Optional[str] = None
+    description: Optional[str] = None
+    hours: float
+    log_type: Optional[str] = None  # maintenance items only
+    log_date: Optional[date] = None
+
+class EngineerWorkload(BaseModel):
+    engineer_id: Optional[int] = None  # None for work on projects without a lead engineer
+    name: str
+    total_hours: float = 0
+    active_hours: float = 0
+    maintenance_hours: float = 0
+    active_items: List[WorkloadItem] = []
+    maintenance_items: List[WorkloadItem] = []
+
+class WeekWorkload(BaseModel):
+    year: int
+    week: int
+    start_date: date
+    end_date: date
+    weeks_in_year: int
+    capacity_hours: float
+    engineers: List[EngineerWorkload]
+    unassigned: EngineerWorkload
+
+class IsoWeek(BaseModel):
+    year: int
+    week: int
+    start_date: date
+
+class EngineerWeeklyHours(BaseModel):
+    engineer_id: Optional[int] = None
+    name: str
+    hours: List[float]  # one entry per week in WorkloadRange.weeks
+    total_hours: float
+
+class WorkloadRange(BaseModel):
+    weeks: List[IsoWeek]
+    capacity_hours: float
+    engineers: List[EngineerWeeklyHours]
+    unassigned: EngineerWeeklyHours
+
+# Gantt Schemas (compact: bars and weeks are arrays, columns are 1-based timeline units)
+class GanttProject(BaseModel):
+    id: int
+    name: str
+    status: Optional[str] = None
+    bars: List[Tuple[int, int, Optional[str]]]  # [grid_start, grid_span, planned_description]
+    weeks: List[Tuple[int, int, int, int, float, bool]]  # [grid_start, grid_span, week_number, actual_progress, actual_hours, has_content]
+
+class GanttChart(BaseModel):
+    view_mode: str
+    start_date: date
+    end_date: date
+    headers: List[str]
+    projects: List[GanttProject]
+
 # Sprint Schemas
 class SprintBase(BaseModel):
     name: str
@@ -192,3 +296,18 @@ class Task(TaskBase):
     id: int
     class Config:
         from_attributes = True
+
+# Background Job Schemas
+class Job(BaseModel):
+    id: int
+    type: str
+    status: str
+    progress: float = 0
+    message: Optional[str] = None
+    error: Optional[str] = None
+    result_name: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    class Config:
+        from_attributes = True
@@ -0,0 +1,35 @@
+"""
+Fast JSON responses for the large list endpoints.
+
+FastAPI normally validates a route's return value against its response_model,
+dumps it to Python objects, walks the result again with jsonable_encoder and
+finally encodes it with json.dumps. Here one cached TypeAdapter per type
+validates the ORM objects and writes JSON bytes directly (in pydantic-core),
+producing the same body.
+"""
+from functools import lru_cache
+from typing import Any, Mapping, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def type_adapter(tp) -> TypeAdapter:
+    """One adapter per type; building the core schema is the expensive part."""
+    return TypeAdapter(tp)
+
+
+def dump_json(tp, value: Any, from_attributes: bool = True) -> bytes:
+    """Validates `value` (ORM objects or plain data) as `tp` and encodes it to JSON bytes."""
+    adapter = type_adapter(tp)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=from_attributes))
+
+
+class JSONBytesResponse(Response):
+    """A JSON response whose body has already been encoded."""
+    media_type = "application/json"
+
+
+def json_response(tp, value: Any, headers: Optional[Mapping[str, str]] = None) -> JSONBytesResponse:
+    return JSONBytesResponse(content=dump_json(tp, value), headers=dict(headers) if headers else None)
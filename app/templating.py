@@ -0,0 +1,51 @@
+"""
+The Jinja environment shared by every page and fragment.
+
+Compiled templates are kept in a filesystem bytecode cache (JINJA_CACHE_DIR,
+default data/jinja_cache; empty disables it), so a restarted server loads
+them instead of parsing and compiling the sources again. warm_up() loads
+every template under templates/ at startup, which moves that work off the
+first request of each page.
+
+With APP_ENV=production (the default) templates are not re-checked for
+changes on disk; set APP_ENV=development to pick up template edits without a
+restart.
+"""
+import os
+import time
+from typing import Dict
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+TEMPLATE_DIR = "templates"
+APP_ENV = os.environ.get("APP_ENV", "production")
+JINJA_CACHE_DIR = os.environ.get("JINJA_CACHE_DIR", os.path.join("data", "jinja_cache"))
+
+
+def _bytecode_cache(directory: str):
+    if not directory:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    return FileSystemBytecodeCache(directory)
+
+
+def create_environment(auto_reload: bool = APP_ENV != "production", cache_dir: str = JINJA_CACHE_DIR) -> Environment:
+    return Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        autoescape=True,
+        auto_reload=auto_reload,
+        bytecode_cache=_bytecode_cache(cache_dir),
+    )
+
+
+templates = Jinja2Templates(env=create_environment())
+
+
+def warm_up() -> Dict:
+    """Loads (compiles or reads from the bytecode cache) every template."""
+    t0 = time.perf_counter()
+    names = templates.env.list_templates()
+    for name in names:
+        templates.env.get_template(name)
+    return {"templates": len(names), "ms": round((time.perf_counter() - t0) * 1000, 1)}
@@ -1,148 +1,98 @@
 from datetime import date, timedelta
-import math
+from functools import lru_cache
+from app.weeks import UNITS, iso_week, month_start, month_unit, project_week, quarter_start, quarter_unit, week_of, year_weeks
 
 def get_iso_week_start(d: date) -> date:
-    return d - timedelta(days=d.weekday())
+    return week_of(d).start
+
+def iso_week_bounds(year: int, week: int):
+    """
+    (monday, next_monday) of an ISO week; the end is exclusive.
+    Raises ValueError for weeks the year does not have.
+    """
+    start = iso_week(year, week).start
+    return start, start + timedelta(weeks=1)
+
+def iso_week_of(year: int, week_number: int):
+    """
+    ISO (year, week) of a WeeklyProgress row. Week numbers past the last week
+    of the year (long or extended projects) roll over into the next year.
+    """
+    week = project_week(year, week_number)
+    return week.iso_year, week.iso_week
+
+def iso_weeks_in_year(year: int) -> int:
+    return len(year_weeks(year))
 
 def calculate_timeline(view_mode: str, focus_date: date):
     """
     Calculates timeline boundaries and headers.
     """
+    start_date, end_date, headers, total_units = _timeline(view_mode, focus_date)
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "headers": list(headers),
+        "grid_template": f"repeat({total_units}, 1fr)",
+        "total_units": total_units
+    }
+
+@lru_cache(maxsize=256)
+def _timeline(view_mode: str, focus_date: date):
     headers = []
-    
+
     if view_mode == 'week':
         # Start from Monday of focus_date
-        start_date = get_iso_week_start(focus_date)
         total_units = 12
-        months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-        
-        for i in range(total_units):
-            current = start_date + timedelta(weeks=i)
-            # Label: "W12 (Mar 20)" or just week num? User wants "2026年 1月" range indicated globally.
-            # Headers could be "W{iso} {MonDD}"
-            iso_week = current.isocalendar()[1]
-            label = f"W{iso_week} ({current.month}/{current.day})"
+        first = week_of(focus_date)
+        weeks = year_weeks(first.iso_year)[first.iso_week - 1:]
+        if len(weeks) < total_units:
+            weeks += year_weeks(first.iso_year + 1)
+        for week in weeks[:total_units]:
             headers.append({
-                "label": label, 
-                "start": current, 
-                "end": current + timedelta(days=6)
+                "label": f"W{week.iso_week} ({week.start.month}/{week.start.day})",
+                "start": week.start,
+                "end": week.end
             })
-            
-        end_date = start_date + timedelta(weeks=total_units) - timedelta(days=1)
-        grid_template = f"repeat({total_units}, 1fr)"
-        
+
     elif view_mode == 'month':
         # Start from 1st of current month
-        start_date = date(focus_date.year, focus_date.month, 1)
         total_units = 12
-        
-        curr = start_date
-        for i in range(total_units):
-            label = curr.strftime("%Y-%m") # 2025-12
-            # Find end of month
-            if curr.month == 12:
-                next_month = date(curr.year + 1, 1, 1)
-            else:
-                next_month = date(curr.year, curr.month + 1, 1)
-                
+        first = month_unit(focus_date)
+        for unit in range(first, first + total_units):
+            curr = month_start(unit)
             headers.append({
-                "label": label,
+                "label": curr.strftime("%Y-%m"), # 2025-12
                 "start": curr,
-                "end": next_month - timedelta(days=1)
+                "end": month_start(unit + 1) - timedelta(days=1)
             })
-            curr = next_month
-            
-        end_date = curr - timedelta(days=1)
-        grid_template = f"repeat({total_units}, 1fr)"
 
     elif view_mode == 'quarter':
         # Start from 1st of current quarter
-        q_month = ((focus_date.month - 1) // 3) * 3 + 1
-        start_date = date(focus_date.year, q_month, 1)
         total_units = 8 # 2 years
-        
-        curr = start_date
-        for i in range(total_units):
-            q_num = ((curr.month - 1) // 3) + 1
-            label = f"{curr.year} Q{q_num}"
-            
-            # Add 3 months
-            # simple trick: year + (month+3-1)//12, (month+3-1)%12 + 1
-            # logic: add 3 months
-            y, m = curr.year, curr.month
-            tgt_m = m + 3
-            tgt_y = y + (tgt_m - 1) // 12
-            tgt_m = (tgt_m - 1) % 12 + 1
-            next_q = date(tgt_y, tgt_m, 1)
-            
+        first = quarter_unit(focus_date)
+        for unit in range(first, first + total_units):
+            curr = quarter_start(unit)
             headers.append({
-                "label": label,
+                "label": f"{curr.year} Q{unit % 4 + 1}",
                 "start": curr,
-                "end": next_q - timedelta(days=1)
+                "end": quarter_start(unit + 1) - timedelta(days=1)
             })
-            curr = next_q
-            
-        end_date = curr - timedelta(days=1)
-        grid_template = f"repeat({total_units}, 1fr)"
-    
-    return {
-        "start_date": start_date,
-        "end_date": end_date,
-        "headers": headers,
-        "grid_template": grid_template,
-        "total_units": total_units
-    }
+
+    return headers[0]["start"], headers[-1]["end"], tuple(headers), total_units
 
 def calculate_grid_position(task_start: date, task_end: date, timeline_start: date, view_mode: str):
     """
     Returns grid_column_start and grid_column_span (1-based index).
+    A task covers every week / month / quarter it touches.
     """
     if not task_start or not task_end:
         return None
-        
-    start_index = 0
-    end_index = 0
-    
-    if view_mode == 'week':
-        # Diff in weeks
-        # Round down to start of week
-        tl_iso = get_iso_week_start(timeline_start)
-        task_iso = get_iso_week_start(task_start)
-        
-        diff_days = (task_iso - tl_iso).days
-        start_index = int(diff_days / 7) + 1 # 1-based
-        
-        # Duration
-        # task_end might be mid-week, so we encompass that week
-        task_end_iso = get_iso_week_start(task_end)
-        end_diff = (task_end_iso - tl_iso).days
-        end_index = int(end_diff / 7) + 1
-        
-        span = end_index - start_index + 1
-        
-    elif view_mode == 'month':
-        # Diff in months
-        diff_years = task_start.year - timeline_start.year
-        diff_months = task_start.month - timeline_start.month
-        start_index = (diff_years * 12 + diff_months) + 1
-        
-        diff_years_end = task_end.year - timeline_start.year
-        diff_months_end = task_end.month - timeline_start.month
-        end_index = (diff_years_end * 12 + diff_months_end) + 1
-        
-        span = end_index - start_index + 1
-        
-    elif view_mode == 'quarter':
-        # Diff in quarters
-        def get_q(d): return (d.year * 4) + ((d.month - 1) // 3)
-        
-        q_start = get_q(timeline_start)
-        q_task = get_q(task_start)
-        start_index = (q_task - q_start) + 1
-        
-        q_end = get_q(task_end)
-        end_index = (q_end - q_start) + 1
-        
-        span = end_index - start_index + 1
+
+    unit = UNITS[view_mode]
+    origin = unit(timeline_start)
+    start_index = unit(task_start) - origin + 1 # 1-based
+    end_index = unit(task_end) - origin + 1
+    span = end_index - start_index + 1
 
     return start_index, span
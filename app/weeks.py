@@ -0,0 +1,102 @@
+"""
+ISO week calendar.
+
+Every ISO year's weeks are computed once into a tuple of Week(iso_year,
+iso_week, start, end) and cached, so turning a WeeklyProgress row, a date or
+an ISO week into a date range is a table lookup. WeeklyProgress week numbers
+count from week 1 of the project's year and roll over into the following
+years (see project_week).
+
+Timeline columns are addressed by absolute unit numbers (week / month /
+quarter since a fixed epoch), so a column offset is a subtraction.
+"""
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+
+# Projects rarely run past the years after their own; beyond this span
+# project_week falls back to date arithmetic.
+PROJECT_SPAN_YEARS = 3
+
+_EPOCH_MONDAY = date(1, 1, 1)  # a Monday; absolute week 0
+
+
+class Week(NamedTuple):
+    iso_year: int
+    iso_week: int
+    start: date  # Monday
+    end: date  # Sunday
+
+
+@lru_cache(maxsize=128)
+def year_weeks(iso_year: int) -> Tuple[Week, ...]:
+    """All weeks of an ISO year (52 or 53); year_weeks(y)[w - 1] is week w."""
+    monday = date.fromisocalendar(iso_year, 1, 1)
+    # Dec 28th always falls in the last ISO week of its year
+    count = date(iso_year, 12, 28).isocalendar()[1]
+    return tuple(
+        Week(iso_year, w, monday + timedelta(weeks=w - 1), monday + timedelta(weeks=w - 1, days=6))
+        for w in range(1, count + 1)
+    )
+
+
+def iso_week(iso_year: int, week: int) -> Week:
+    """Raises ValueError for weeks the year does not have."""
+    weeks = year_weeks(iso_year)
+    if not 1 <= week <= len(weeks):
+        raise ValueError(f"{iso_year} has no ISO week {week}")
+    return weeks[week - 1]
+
+
+def week_of(d: date) -> Week:
+    """The ISO week containing d."""
+    iso_year, week, _ = d.isocalendar()
+    return year_weeks(iso_year)[week - 1]
+
+
+@lru_cache(maxsize=128)
+def _project_weeks(year: int) -> Tuple[Week, ...]:
+    weeks = ()
+    for y in range(year, year + PROJECT_SPAN_YEARS):
+        weeks += year_weeks(y)
+    return weeks
+
+
+def project_week(year: int, week_number: int) -> Week:
+    """
+    The ISO week of a WeeklyProgress row (project year, week_number). Week
+    numbers past the last week of the year roll over into the next year.
+    """
+    weeks = _project_weeks(year)
+    if 1 <= week_number <= len(weeks):
+        return weeks[week_number - 1]
+    return week_of(date.fromisocalendar(year, 1, 1) + timedelta(weeks=week_number - 1))
+
+
+def week_number_in(year: int, d: date) -> int:
+    """Inverse of project_week: the week_number of d's week in a project of `year`."""
+    return (week_of(d).start - year_weeks(year)[0].start).days // 7 + 1
+
+
+# Absolute timeline units
+def week_unit(d: date) -> int:
+    return (d - _EPOCH_MONDAY).days // 7
+
+
+def month_unit(d: date) -> int:
+    return d.year * 12 + d.month - 1
+
+
+def quarter_unit(d: date) -> int:
+    return d.year * 4 + (d.month - 1) // 3
+
+
+UNITS = {"week": week_unit, "month": month_unit, "quarter": quarter_unit}
+
+
+def month_start(unit: int) -> date:
+    return date(unit // 12, unit % 12 + 1, 1)
+
+
+def quarter_start(unit: int) -> date:
+    return date(unit // 4, (unit % 4) * 3 + 1, 1)
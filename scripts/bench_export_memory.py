@@ -0,0 +1,107 @@
+"""
+Benchmark: peak memory of exporting the whole portfolio.
+
+"json" is the {"content": ...} body of POST /api/sync/export: every project
+loaded, one document string, then its JSON encoding. "stream" drains the
+generator behind POST /api/sync/export?stream=true chunk by chunk. Peak
+memory is measured with tracemalloc around the server-side work, for growing
+portfolios (52 weeks and 20 logs per project):
+
+    python scripts/bench_export_memory.py
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIZES = (100, 200, 400, 800)
+WEEKS = 52
+LOGS = 20
+
+tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp.name}/bench.db")
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from typing import Dict
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database import engine, ReadSessionLocal
+from app.routers.sync import EXPORT_LOADERS, generate_markdown_content, iter_markdown_export
+from app.serialization import json_response
+from app import models
+
+created = 0
+
+
+def seed(total: int):
+    global created
+    with engine.begin() as conn:
+        eng = conn.execute(models.Engineer.__table__.insert().values(name=f"Lead {total}")).inserted_primary_key[0]
+        for i in range(created, total):
+            pid = conn.execute(models.Project.__table__.insert().values(
+                name=f"Export project {i}", cft_unit="Bench", year=2025, status="Development",
+                lead_engineer_id=eng, description="Portfolio export benchmark " * 4,
+            )).inserted_primary_key[0]
+            conn.execute(models.WeeklyProgress.__table__.insert(), [
+                {"project_id": pid, "week_number": w, "year": 2025, "planned_progress": 50, "actual_progress": 40,
+                 "actual_hours": 6.0, "planned_description": f"Planned work for week {w}",
+                 "actual_description": f"Delivered the items of week {w} and reviewed them with the team"}
+                for w in range(1, WEEKS + 1)
+            ])
+            conn.execute(models.ProjectLog.__table__.insert(), [
+                {"project_id": pid, "created_at": datetime(2025, 1, 6) + timedelta(weeks=n),
+                 "content": f"Meeting {n}: progress reviewed, risks and next steps recorded. " * 3}
+                for n in range(LOGS)
+            ])
+    created = total
+
+
+def export_json(ids):
+    db = ReadSessionLocal()
+    try:
+        projects = db.query(models.Project).options(*EXPORT_LOADERS).filter(models.Project.id.in_(ids)).all()
+        return json_response(Dict[str, str], {"content": generate_markdown_content(projects), "filename": "x.md"})
+    finally:
+        db.close()
+
+
+def export_stream(ids):
+    size = 0
+    for chunk in iter_markdown_export(ids):
+        size += len(chunk.encode())
+    return size
+
+
+def measure(fn, ids):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn(ids)
+    ms = (time.perf_counter() - t0) * 1000
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return peak / 1024 / 1024, ms
+
+
+def main():
+    client = TestClient(app)
+    print(f"peak traced memory (MB) / time (ms); {WEEKS} weeks and {LOGS} logs per project")
+    for total in SIZES:
+        seed(total)
+        ids = list(range(1, total + 1))
+        # Both modes produce the same document
+        streamed = client.post("/api/sync/export?stream=true", json=ids).text
+        assert streamed == client.post("/api/sync/export", json=ids).json()["content"]
+        json_mb, json_ms = measure(export_json, ids)
+        stream_mb, stream_ms = measure(export_stream, ids)
+        print(f"  {total:4} projects ({len(streamed.encode()) / 1024 / 1024:5.1f} MB document)   "
+              f"json: {json_mb:6.1f} MB {json_ms:7.1f} ms   stream: {stream_mb:5.1f} MB {stream_ms:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Benchmark: the project page's Gantt data for a 260-week (5-year) project.
+
+"before" is the previous model: weeks loaded as ORM objects, one dict per bar
+holding its ORM weeks, one dict per placed week, and weekly_data serialized by
+copying each object's __dict__. "after" is app.gantt (Core tuples, slotted
+bars, tuple cells). Peak memory is measured with tracemalloc while building
+the page context; latency is the full GET of the page:
+
+    python scripts/bench_gantt_model.py
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WEEKS = 260
+ROUNDS = 20
+FOCUS = date(2026, 3, 2)
+
+tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp.name}/bench.db")
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from fastapi import Request
+from fastapi.testclient import TestClient
+from app.main import app, templates
+from app.database import engine, ReadSessionLocal
+from app.gantt import group_weeks, place_bars, select_weeks, week_rows
+from app.plans import STANDARD, BUILTIN_TEMPLATES, phases_to_json, plan_rows
+from app.utils import calculate_grid_position, calculate_timeline
+from app.weeks import project_week
+from app import models
+
+WP = models.WeeklyProgress
+
+
+def seed() -> int:
+    with engine.begin() as conn:
+        pid = conn.execute(models.Project.__table__.insert().values(
+            name="Five-year platform", cft_unit="Bench", year=2024, status="Development", duration_weeks=WEEKS,
+        )).inserted_primary_key[0]
+        rows = plan_rows(pid, 2024, phases_to_json(BUILTIN_TEMPLATES[STANDARD]["phases"]), WEEKS)
+        for n, row in enumerate(rows):
+            done = n < 120
+            row.update(actual_progress=int(done), actual_description=f"Week {n + 1} done" if done else None,
+                       actual_hours=6 if done else 0)
+        conn.execute(WP.__table__.insert(), rows)
+    return pid
+
+
+def context_before(db, project, view_mode):
+    timeline = calculate_timeline(view_mode, FOCUS)
+    weekly_data = db.query(WP).filter(WP.project_id == project.id).order_by(WP.week_number).all()
+    bars, current_bar = [], None
+    for w in weekly_data:
+        week = project_week(project.year, w.week_number)
+        if current_bar and current_bar['name'] == w.planned_description and (week.start - current_bar['end']).days <= 7:
+            current_bar['end'] = week.end
+            current_bar['weeks'].append(w)
+        else:
+            current_bar = {"name": w.planned_description, "start": week.start, "end": week.end, "weeks": [w],
+                           "status": "Planned"}
+            bars.append(current_bar)
+    final_bars = []
+    for bar in bars:
+        start_idx, span = calculate_grid_position(bar['start'], bar['end'], timeline['start_date'], view_mode)
+        if start_idx + span - 1 >= 1 and start_idx <= timeline['total_units']:
+            bar['grid_start'], bar['grid_span'], bar['actuals'] = start_idx, span, []
+            for w in bar['weeks']:
+                week = project_week(project.year, w.week_number)
+                a_start, a_span = calculate_grid_position(week.start, week.end, timeline['start_date'], view_mode)
+                if a_start + a_span - 1 >= 1 and a_start <= timeline['total_units']:
+                    bar['actuals'].append({
+                        'grid_start': a_start, 'grid_span': a_span, 'progress': w.actual_progress,
+                        'description': w.actual_description, 'week': w.week_number, 'year': w.year,
+                        'actual_hours': w.actual_hours, 'planned_progress': w.planned_progress,
+                        'planned_description': w.planned_description, 'week_start': week.start.isoformat(),
+                        'week_end': week.end.isoformat(),
+                        'has_content': bool(w.actual_description or w.actual_progress > 0),
+                    })
+            final_bars.append(bar)
+    safe_weekly_data = []
+    for w in weekly_data:
+        d = w.__dict__.copy()
+        del d["_sa_instance_state"]
+        for k, v in d.items():
+            if isinstance(v, (date, datetime)):
+                d[k] = str(v)
+        safe_weekly_data.append(d)
+    return timeline, final_bars, safe_weekly_data
+
+
+def context_after(db, project, view_mode):
+    timeline = calculate_timeline(view_mode, FOCUS)
+    weekly_data = week_rows(db.execute(select_weeks(WP.project_id == project.id)))
+    final_bars = place_bars(group_weeks(weekly_data, project.year), weekly_data, timeline, view_mode)
+    return timeline, final_bars, [w.as_json() for w in weekly_data]
+
+
+@app.get("/bench/project_before/{project_id}")
+def project_before(request: Request, project_id: int, view_mode: str = "week"):
+    db = ReadSessionLocal()
+    try:
+        project = db.get(models.Project, project_id)
+        timeline, bars, weekly_data = context_before(db, project, view_mode)
+        return templates.TemplateResponse("project_detail.html", {
+            "request": request, "page_title": project.name, "project": project, "weekly_data": weekly_data,
+            "gantt": {"view_mode": view_mode, "focus_date": FOCUS, "next_date": "", "prev_date": "",
+                      "headers": timeline['headers'], "grid_template": timeline['grid_template'], "bars": bars},
+        })
+    finally:
+        db.close()
+
+
+def peak_kb(build, project_id, view_mode):
+    db = ReadSessionLocal()
+    try:
+        project = db.get(models.Project, project_id)
+        tracemalloc.start()
+        result = build(db, project, view_mode)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del result
+        return peak / 1024
+    finally:
+        db.close()
+
+
+def median_ms(client, url):
+    timings = []
+    for _ in range(ROUNDS):
+        t0 = time.perf_counter()
+        resp = client.get(url)
+        timings.append((time.perf_counter() - t0) * 1000)
+        assert resp.status_code == 200, resp.text
+    return statistics.median(timings)
+
+
+def main():
+    project_id = seed()
+    client = TestClient(app)
+    print(f"{WEEKS}-week project; peak memory building the page context, median page GET of {ROUNDS}")
+    for view_mode in ("week", "quarter"):
+        before_kb = peak_kb(context_before, project_id, view_mode)
+        after_kb = peak_kb(context_after, project_id, view_mode)
+        before_ms = median_ms(client, f"/bench/project_before/{project_id}?view_mode={view_mode}&focus_date={FOCUS}")
+        after_ms = median_ms(client, f"/projects/{project_id}?view_mode={view_mode}&focus_date={FOCUS}")
+        print(f"  {view_mode:8} before: {before_kb:7.1f} KB {before_ms:7.1f} ms   "
+              f"after: {after_kb:7.1f} KB {after_ms:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: portfolio Gantt over 300 active projects (two years of weeks each).
+
+"before" is what rendering the portfolio meant until now: the project_detail
+approach per project (every week loaded as an ORM object, grouped and placed).
+"after" is GET /api/gantt, which loads only the weeks inside the window:
+
+    python scripts/bench_gantt_portfolio.py
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECTS = 300
+WEEKS = 104
+ROUNDS = 10
+FOCUS = date(2026, 5, 4)
+
+tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp.name}/bench.db")
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database import engine, ReadSessionLocal
+from app.gantt import group_weeks, place_bars
+from app.plans import STANDARD, BUILTIN_TEMPLATES, phases_to_json, plan_rows
+from app.utils import calculate_timeline
+from app import models
+
+PHASES = phases_to_json(BUILTIN_TEMPLATES[STANDARD]["phases"])
+
+
+def seed():
+    with engine.begin() as conn:
+        for i in range(PROJECTS):
+            year = 2025 + i % 2
+            pid = conn.execute(models.Project.__table__.insert().values(
+                name=f"CFT project {i}", cft_unit="Bench", year=year, status="Development", duration_weeks=WEEKS,
+            )).inserted_primary_key[0]
+            rows = plan_rows(pid, year, PHASES, WEEKS)
+            for n, row in enumerate(rows):
+                done = n < WEEKS // 2
+                row.update(actual_progress=int(done), actual_description="done" if done else None,
+                           actual_hours=6 if done else 0)
+            conn.execute(models.WeeklyProgress.__table__.insert(), rows)
+
+
+def before(view_mode):
+    db = ReadSessionLocal()
+    try:
+        timeline = calculate_timeline(view_mode, FOCUS)
+        for project in db.query(models.Project).order_by(models.Project.id):
+            weeks = (db.query(models.WeeklyProgress).filter(models.WeeklyProgress.project_id == project.id)
+                     .order_by(models.WeeklyProgress.week_number).all())
+            place_bars(group_weeks(weeks, project.year), weeks, timeline, view_mode)
+    finally:
+        db.close()
+
+
+def median_ms(fn):
+    timings = []
+    for _ in range(ROUNDS):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    seed()
+    client = TestClient(app)
+    print(f"{PROJECTS} projects x {WEEKS} weeks, 12-unit window at {FOCUS}; median of {ROUNDS}")
+    for view_mode in ("week", "month", "quarter"):
+        url = f"/api/gantt?view_mode={view_mode}&focus_date={FOCUS}"
+
+        def after():
+            resp = client.get(url)
+            assert resp.status_code == 200 and len(resp.json()["projects"]) == PROJECTS, resp.text
+
+        print(f"  {view_mode:8} before (all weeks, per project): {median_ms(lambda: before(view_mode)):7.1f} ms"
+              f"   after (GET /api/gantt): {median_ms(after):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
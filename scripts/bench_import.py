@@ -0,0 +1,80 @@
+"""
+Benchmark: POST /api/sync/import of a 200-project file (52 weeks and 10
+meeting logs per project), first into an empty database, then again over
+the projects it created. Counts the SQL statements and commits per import:
+
+    python scripts/bench_import.py
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECTS = 200
+WEEKS = 52
+LOGS = 10
+
+tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp.name}/bench.db")
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from sqlalchemy import event
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database import engine
+
+counts = {"statements": 0, "commits": 0}
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_statement(*args):
+    counts["statements"] += 1
+
+
+@event.listens_for(engine, "commit")
+def _count_commit(*args):
+    counts["commits"] += 1
+
+
+def document() -> str:
+    lines = ["# PROJECT_EXPORT_v1", ""]
+    for i in range(PROJECTS):
+        lines += [
+            f"## Project: Imported project {i}", "- ID: New", "- Year: 2025", "- CFT Unit: Bench",
+            "- Status: Development", f"- Lead Engineer: Engineer {i % 20}", "- Description: Import benchmark",
+            "- Key Dates: Start=2025-01-06", "- Schedule: Day=[Mon], Time=[10:00]", "",
+            "### Weekly Progress", "| Week | Planned | Actual | Hours | Description |",
+            "|------|---------|--------|-------|-------------|",
+        ]
+        lines += [f"| {w} | 2 | {2 if w <= 26 else 0} | {6 if w <= 26 else 0} | Work item {w} |"
+                  for w in range(1, WEEKS + 1)]
+        lines += ["", "### Meeting Logs"]
+        for n in range(LOGS):
+            day = date(2025, 1, 7) + timedelta(weeks=n)
+            lines += [f"- Date: {day}", f"- Content: Meeting {n} of project {i}: status reviewed"]
+        lines += ["", "---", ""]
+    return "\n".join(lines)
+
+
+def run(client, body: bytes, label: str):
+    counts.update(statements=0, commits=0)
+    t0 = time.perf_counter()
+    resp = client.post("/api/sync/import", files={"file": ("bench.md", body)})
+    ms = (time.perf_counter() - t0) * 1000
+    assert resp.status_code == 200, resp.text
+    print(f"  {label:10} {ms:9.1f} ms  {counts['statements']:6} statements  {counts['commits']:4} commits")
+
+
+def main():
+    body = document().encode()
+    client = TestClient(app)
+    print(f"{PROJECTS} projects x {WEEKS} weeks, {LOGS} logs each ({len(body) / 1024:.0f} KB)")
+    run(client, body, "create")
+    run(client, body, "re-import")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark: peak memory of importing a large export.
+
+A synthetic PROJECT_EXPORT_v1 file (52 weeks and 10 logs per project) is
+written to a temporary directory. Each case runs in a fresh process and
+reports its peak RSS over the RSS it had after importing the app:
+
+- parse, 200 MB: "before" reads the whole upload, decodes it, splits it per
+  project and keeps every parsed project; "after" is parse_stream over
+  1 MB chunks.
+- import, 20 MB: "before" resolves and writes the whole parsed file at once;
+  "after" is import_markdown (streamed, written IMPORT_BATCH projects at a time).
+
+    python scripts/bench_import_memory.py
+"""
+import os
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+MB = 1024 * 1024
+WEEKS = 52
+LOGS = 10
+
+
+def project_text(i: int) -> str:
+    lines = [
+        f"## Project: Synthetic project {i}", "- ID: New", "- Year: 2025", "- CFT Unit: Bench",
+        "- Status: Development", f"- Lead Engineer: Engineer {i % 50}", "- Description: Memory benchmark",
+        "- Key Dates: Start=2025-01-06", "- Schedule: Day=[Mon], Time=[10:00]", "",
+        "### Weekly Progress", "| Week | Planned | Actual | Hours | Description |",
+        "|------|---------|--------|-------|-------------|",
+    ]
+    lines += [f"| {w} | 2 | {2 if w <= 26 else 0} | {6 if w <= 26 else 0} | Work item {w} |" for w in range(1, WEEKS + 1)]
+    lines += ["", "### Meeting Logs"]
+    for n in range(LOGS):
+        lines += [f"- Date: {date(2025, 1, 7) + timedelta(weeks=n)}", f"- Content: Meeting {n} of project {i}"]
+    return "\n".join(lines + ["", "---", "", ""])
+
+
+def write_export(path: str, size: int):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# PROJECT_EXPORT_v1\n\n")
+        i = 0
+        while f.tell() < size:
+            f.write(project_text(i))
+            i += 1
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+def child(case: str, path: str):
+    import app.main  # creates the schema
+    from app import importer
+    from app.database import SessionLocal
+
+    baseline = peak_rss_mb()
+    t0 = time.perf_counter()
+    if case.endswith("before"):
+        with open(path, "rb") as f:
+            text = f.read().decode("utf-8").strip()
+        parsed = []
+        for chunk in re.split(r'^\s*## Project:\s*', text, flags=re.MULTILINE)[1:]:
+            lines = chunk.strip().split("\n")
+            parsed.append(importer.parse_section(lines[0].strip(), lines[1:]))
+        count = len(parsed)
+        if case == "import-before":
+            db = SessionLocal()
+            importer.write(db, importer.resolve(db, parsed))
+            db.commit()
+    elif case == "parse-after":
+        with open(path, "rb") as f:
+            count = sum(1 for _ in importer.parse_stream(importer.read_chunks(f)))
+    else:
+        db = SessionLocal()
+        with open(path, "rb") as f:
+            count = len(importer.import_markdown(db, importer.read_chunks(f)))
+    print(f"{count} {peak_rss_mb() - baseline:.1f} {time.perf_counter() - t0:.1f}")
+
+
+def run(case: str, path: str, db_dir: str):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_dir}/{case}.db")
+    out = subprocess.run([sys.executable, __file__, case, path], env=env, capture_output=True, text=True, check=True)
+    count, mb, seconds = out.stdout.split()
+    print(f"  {case:14} {int(count):6} projects   +{float(mb):7.1f} MB peak RSS   {float(seconds):6.1f} s")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, size, cases in (("parse", 200 * MB, ("parse-before", "parse-after")),
+                                   ("import", 20 * MB, ("import-before", "import-after"))):
+            path = os.path.join(tmp, f"{label}.md")
+            write_export(path, size)
+            print(f"{label}: {os.path.getsize(path) / MB:.0f} MB export")
+            for case in cases:
+                run(case, path, tmp)
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        child(sys.argv[1], sys.argv[2])
+    else:
+        main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: parsing a large export in this process and in the worker pool,
+and a dry run against the import it previews.
+
+The synthetic export of bench_import_memory.py is parsed with parse_stream
+(every project validated) inline and with IMPORT_PARSE_WORKERS workers
+(at least 2), then a smaller one is dry-run into an empty database and
+imported:
+
+    IMPORT_PARSE_WORKERS=4 python scripts/bench_import_parse.py
+
+The pool only pays off with as many free cores as workers; on a single
+core it costs the pickling of every section and parsed project.
+"""
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MB = 1024 * 1024
+sys.path.insert(0, ROOT)
+
+# The workers import this module too (spawn): the app is only set up in main()
+
+
+def timed(label: str, fn):
+    t0 = time.perf_counter()
+    result = fn()
+    print(f"  {label:22} {time.perf_counter() - t0:7.2f} s")
+    return result
+
+
+def parse(path: str, workers: int) -> int:
+    from app import importer
+    with open(path, "rb") as f:
+        return sum(1 for _ in importer.parse_stream(importer.read_chunks(f), workers=workers))
+
+
+def main():
+    tmp = tempfile.TemporaryDirectory()
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp.name}/bench.db")
+    os.chdir(ROOT)
+    from bench_import_memory import write_export
+    import app.main  # creates the schema
+    from app import importer
+    from app.database import ReadSessionLocal, SessionLocal
+
+    workers = max(2, importer.PARSE_WORKERS)
+    path = os.path.join(tmp.name, "export.md")
+    write_export(path, 50 * MB)
+    print(f"parse: {os.path.getsize(path) / MB:.0f} MB export, {os.cpu_count()} CPUs")
+    count = timed("1 process", lambda: parse(path, 1))
+    timed(f"{workers} workers (cold)", lambda: parse(path, workers))
+    timed(f"{workers} workers", lambda: parse(path, workers))
+    print(f"  {count} projects")
+
+    write_export(path, 10 * MB)
+    print(f"dry run / import: {os.path.getsize(path) / MB:.0f} MB export")
+    with open(path, "rb") as f, ReadSessionLocal() as db:
+        report = timed("dry run", lambda: importer.dry_run(db, importer.read_chunks(f)))
+    with open(path, "rb") as f, SessionLocal() as db:
+        timed("import", lambda: importer.import_markdown(db, importer.read_chunks(f)))
+    print(f"  {len(report['projects'])} projects, valid: {report['valid']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: a large import in the request versus as a background job.
+
+The synthetic export of bench_import_memory.py (about 10 MB) is imported
+with POST /api/sync/import, which holds the request until it is written,
+then submitted to POST /api/jobs, which answers at once; the job is polled
+until it succeeds, timing a GET /api/projects/ and the submission of a
+report job issued while it runs:
+
+    python scripts/bench_jobs.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MB = 1024 * 1024
+
+tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp.name}/bench.db")
+os.environ.setdefault("JOB_DIR", os.path.join(tmp.name, "jobs"))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from bench_import_memory import write_export
+from fastapi.testclient import TestClient
+from app.main import app
+
+
+def ms(t0: float) -> str:
+    return f"{(time.perf_counter() - t0) * 1000:9.1f} ms"
+
+
+def main():
+    path = os.path.join(tmp.name, "export.md")
+    write_export(path, 10 * MB)
+    with open(path, "rb") as f:
+        body = f.read()
+    client = TestClient(app)
+    print(f"{len(body) / MB:.0f} MB export")
+
+    t0 = time.perf_counter()
+    resp = client.post("/api/sync/import", files={"file": ("bench.md", body)})
+    assert resp.status_code == 200, resp.text
+    print(f"  in the request:   response after {ms(t0)}")
+
+    # The same file again, now an update of every project
+    t0 = time.perf_counter()
+    job = client.post("/api/jobs", data={"type": "import"}, files={"file": ("bench.md", body)}).json()
+    print(f"  as a job:         response after {ms(t0)}")
+    read_ms = submit_ms = None
+    while job["status"] in ("queued", "running"):
+        time.sleep(0.2)
+        if read_ms is None:
+            t1 = time.perf_counter()
+            client.get("/api/projects/")
+            read_ms = ms(t1)
+            t1 = time.perf_counter()
+            resp = client.post("/api/jobs", data={"type": "report", "params": '{"type": "weekly", "year": 2025}'})
+            assert resp.status_code == 202, resp.text
+            submit_ms = ms(t1)
+        job = client.get(f"/api/jobs/{job['id']}").json()
+    assert job["status"] == "succeeded", job
+    print(f"                    {job['status']} after {ms(t0)}")
+    print(f"  GET /api/projects/ during the job: {read_ms}")
+    print(f"  POST /api/jobs (report) during the job: {submit_ms}")
+
+
+if __name__ == "__main__":
+    main()
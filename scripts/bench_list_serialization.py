@@ -0,0 +1,120 @@
+"""
+Benchmark: serializing and sending the 500-project list.
+
+Serialization CPU compares FastAPI's default response path (validate, dump to
+Python, jsonable_encoder, json.dumps) with the cached TypeAdapter writing JSON
+bytes directly, on the same loaded ORM objects. Wire sizes are the
+Content-Length of the real endpoints per Accept-Encoding (br only when the
+optional brotli package is installed):
+
+    python scripts/bench_list_serialization.py
+"""
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECTS = 500
+WEEKS = 26
+LOGS = 4
+ROUNDS = 5
+
+tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp.name}/bench.db")
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from app.main import app
+from app.compression import brotli
+from app.database import engine, ReadSessionLocal
+from app.loaders import loader_options
+from app.serialization import dump_json, type_adapter
+from app import models, schemas
+
+
+def seed():
+    with engine.begin() as conn:
+        engineers = [conn.execute(models.Engineer.__table__.insert().values(name=f"Engineer {i}")).inserted_primary_key[0]
+                     for i in range(20)]
+        for i in range(PROJECTS):
+            start = date(2026, 1, 5) + timedelta(days=i % 60)
+            pid = conn.execute(models.Project.__table__.insert().values(
+                name=f"CFT project {i}", cft_unit=f"Unit {i % 12}", year=2026, status="In Progress",
+                duration_weeks=WEEKS, lead_engineer_id=engineers[i % 20], start_date=start,
+                predicted_end_date=start + timedelta(weeks=WEEKS), description=f"Project {i} scope and goals",
+            )).inserted_primary_key[0]
+            conn.execute(models.WeeklyProgress.__table__.insert(), [
+                {"project_id": pid, "year": 2026, "week_number": w, "planned_progress": 4, "actual_progress": 3,
+                 "planned_description": "核心功能開發與實作", "actual_description": f"Week {w} work", "actual_hours": 6}
+                for w in range(1, WEEKS + 1)
+            ])
+            conn.execute(models.ProjectLog.__table__.insert(), [
+                {"project_id": pid, "content": f"Status meeting {n}: on track"} for n in range(LOGS)
+            ])
+
+
+def before(projects) -> bytes:
+    # What FastAPI does with a response_model
+    adapter = type_adapter(List[schemas.Project])
+    content = adapter.dump_python(adapter.validate_python(projects, from_attributes=True), mode="json")
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def after(projects) -> bytes:
+    return dump_json(List[schemas.Project], projects)
+
+
+def cpu_ms(fn, projects):
+    timings = []
+    for _ in range(ROUNDS):
+        t0 = time.process_time()
+        body = fn(projects)
+        timings.append((time.process_time() - t0) * 1000)
+    return statistics.median(timings), body
+
+
+def wire_sizes(client, method, url, **kwargs):
+    encodings = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+    sizes = {}
+    for encoding in encodings:
+        resp = client.request(method, url, headers={"Accept-Encoding": encoding}, **kwargs)
+        assert resp.status_code == 200, resp.text
+        sizes[encoding] = int(resp.headers["content-length"])
+    return sizes
+
+
+def main():
+    seed()
+    db = ReadSessionLocal()
+    projects = db.query(models.Project).options(*loader_options(models.Project, schemas.Project)).all()
+    type_adapter(List[schemas.Project])  # build the schema outside the timings
+
+    before_ms, before_body = cpu_ms(before, projects)
+    after_ms, after_body = cpu_ms(after, projects)
+    assert json.loads(before_body) == json.loads(after_body)
+    db.close()
+
+    client = TestClient(app)
+    print(f"{PROJECTS} projects x {WEEKS} weeks, {LOGS} logs each; median CPU of {ROUNDS} runs")
+    print(f"  serialize, FastAPI default path   : {before_ms:8.1f} ms")
+    print(f"  serialize, cached TypeAdapter     : {after_ms:8.1f} ms")
+    ids = [p["id"] for p in client.get(f"/api/projects/?fields=id&limit={PROJECTS}").json()]
+    for label, method, url, kwargs in [
+        ("GET /api/projects/", "GET", f"/api/projects/?limit={PROJECTS}", {}),
+        ("GET /api/projects/?view=summary", "GET", f"/api/projects/?view=summary&limit={PROJECTS}", {}),
+        ("POST /api/sync/export", "POST", "/api/sync/export", {"json": ids}),
+    ]:
+        sizes = wire_sizes(client, method, url, **kwargs)
+        print(f"  {label:32}: " + ", ".join(f"{enc} {size / 1024:8.1f} KB" for enc, size in sizes.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: re-importing an export whose projects carry many meeting logs.
+
+100 projects with 300 logs each are imported, exported with
+POST /api/sync/export and imported back twice. Every log of the re-imports
+is already there, so the import's cost is de-duplication; the log count
+must not change:
+
+    python scripts/bench_log_dedup.py
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECTS = 100
+LOGS = 300
+
+tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp.name}/bench.db")
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from sqlalchemy import func, select
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database import engine
+from app import models
+
+
+def document() -> str:
+    lines = ["# PROJECT_EXPORT_v1", ""]
+    for i in range(PROJECTS):
+        lines += [f"## Project: Logged project {i}", "- ID: New", "- Year: 2025", "- Status: Development", "",
+                  "### Meeting Logs"]
+        for n in range(LOGS):
+            day = date(2025, 1, 6) + timedelta(days=n)
+            lines += [f"- Date: {day}", f"- Content: Weekly sync {n}: reviewed progress, risks and next steps"]
+        lines += ["", "---", ""]
+    return "\n".join(lines)
+
+
+def log_count() -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(models.ProjectLog)).scalar()
+
+
+def timed_import(client, body: bytes, label: str):
+    t0 = time.perf_counter()
+    resp = client.post("/api/sync/import", files={"file": ("bench.md", body)})
+    ms = (time.perf_counter() - t0) * 1000
+    assert resp.status_code == 200, resp.text
+    print(f"  {label:12} {ms:9.1f} ms   {log_count()} logs")
+
+
+def main():
+    client = TestClient(app)
+    print(f"{PROJECTS} projects x {LOGS} logs")
+    timed_import(client, document().encode(), "import")
+    ids = list(range(1, PROJECTS + 1))
+    export = client.post("/api/sync/export", json=ids).json()["content"].encode()
+    timed_import(client, export, "re-import 1")
+    timed_import(client, export, "re-import 2")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: onboarding a year's CFT portfolio (300 projects x 52 weeks).
+
+"before" mounts the previous create_project (one db.add per week, engineer and
+project committed separately) and posts the projects one by one; "after" sends
+them to POST /api/projects/batch in a single request/transaction:
+
+    python scripts/bench_project_onboarding.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECTS = 300
+WEEKS = 52
+
+tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp.name}/bench.db")
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from fastapi import Depends
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.main import app
+from app.database import get_db
+from app import models, schemas
+
+
+@app.post("/bench/create_project_before")
+def create_project_before(project: schemas.ProjectCreate, db: Session = Depends(get_db)):
+    project_data = project.dict(exclude={"plan_template"})
+    lead_name = project_data.pop("lead_engineer_name", None)
+    if lead_name:
+        engineer = db.query(models.Engineer).filter(models.Engineer.name == lead_name).first()
+        if not engineer:
+            engineer = models.Engineer(name=lead_name)
+            db.add(engineer)
+            db.commit()
+            db.refresh(engineer)
+        project_data["lead_engineer_id"] = engineer.id
+    db_project = models.Project(**project_data)
+    db.add(db_project)
+    db.commit()
+    db.refresh(db_project)
+    duration = project.duration_weeks or 12
+    base_progress, remainder = divmod(100, duration)
+    for w in range(1, duration + 1):
+        remaining_weeks = duration - w
+        if remaining_weeks < 3:
+            description = "UAT測試與錯誤修正"
+        elif w <= 2:
+            description = "需求確認與架構討論"
+        elif w <= 4:
+            description = "UI/UX設計與資料庫規劃"
+        else:
+            description = "核心功能開發與實作"
+        db.add(models.WeeklyProgress(project_id=db_project.id, week_number=w, year=project.year,
+                                     planned_progress=base_progress + (remainder if w == duration else 0),
+                                     actual_progress=0, planned_description=description))
+    db.commit()
+    return {"id": db_project.id}
+
+
+def portfolio(tag: str):
+    return [{"name": f"{tag} CFT project {i}", "cft_unit": f"Unit {i % 12}", "year": 2026,
+             "duration_weeks": WEEKS, "lead_engineer_name": f"{tag} Engineer {i % 25}"}
+            for i in range(PROJECTS)]
+
+
+def main():
+    client = TestClient(app)
+
+    t0 = time.perf_counter()
+    for project in portfolio("before"):
+        assert client.post("/bench/create_project_before", json=project).status_code == 200
+    before = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    resp = client.post("/api/projects/batch", json=portfolio("after"))
+    after = time.perf_counter() - t0
+    assert resp.status_code == 200 and len(resp.json()) == PROJECTS, resp.text
+
+    print(f"{PROJECTS} projects x {WEEKS} weeks")
+    print(f"  before (one request per project, ORM adds): {before:7.2f} s")
+    print(f"  after  (POST /api/projects/batch)         : {after:7.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark: payload size and latency of GET /api/projects/ per projection mode.
+
+Seeds a throw-away database with a few hundred projects carrying a year of
+weekly rows and a long log history, then compares the full graph with the
+projections the pages now request:
+
+    python scripts/bench_project_projection.py
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECTS = 300
+WEEKS = 52
+LOGS = 150
+ROUNDS = 5
+
+tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp.name}/bench.db")
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database import engine
+from app import models
+
+QUERIES = {
+    "full (before)": "/api/projects/?limit=1000",
+    "meetings.html": "/api/projects/?limit=1000&include=weekly_progress",
+    "dashboard.html": "/api/projects/?limit=1000&fields=id,name,status,progress&include=lead_engineer,weekly_progress,maintenance_logs",
+    "view=summary": "/api/projects/?limit=1000&view=summary",
+    "fields=id,name,status": "/api/projects/?limit=1000&fields=id,name,status",
+}
+
+
+def seed():
+    engineers = [{"id": i + 1, "name": f"Engineer {i}"} for i in range(20)]
+    projects, weeks, logs, maint = [], [], [], []
+    for p in range(1, PROJECTS + 1):
+        projects.append({"id": p, "name": f"Project {p}", "cft_unit": "Bench", "year": 2025,
+                         "status": "Development", "lead_engineer_id": p % 20 + 1})
+        weeks += [{"project_id": p, "year": 2025, "week_number": w, "planned_progress": 2,
+                   "planned_description": "核心功能開發與實作", "actual_description": f"Week {w} done", "actual_hours": 6}
+                  for w in range(1, WEEKS + 1)]
+        logs += [{"project_id": p, "content": f"Updated Week {i % WEEKS}: status meeting notes for project {p}"}
+                 for i in range(LOGS)]
+        maint += [{"project_id": p, "log_type": "Routine Check", "content": "Checked logs",
+                   "hours_spent": 1, "log_date": date(2025, 1, 1) + timedelta(days=i)} for i in range(10)]
+    with engine.begin() as conn:
+        conn.execute(models.Engineer.__table__.insert(), engineers)
+        conn.execute(models.Project.__table__.insert(), projects)
+        conn.execute(models.WeeklyProgress.__table__.insert(), weeks)
+        conn.execute(models.ProjectLog.__table__.insert(), logs)
+        conn.execute(models.MaintenanceLog.__table__.insert(), maint)
+
+
+def main():
+    seed()
+    client = TestClient(app)
+    print(f"{PROJECTS} projects x {WEEKS} weeks, {LOGS} logs each; median of {ROUNDS} runs")
+    for label, url in QUERIES.items():
+        timings = []
+        for _ in range(ROUNDS):
+            t0 = time.perf_counter()
+            resp = client.get(url)
+            timings.append((time.perf_counter() - t0) * 1000)
+            assert resp.status_code == 200, resp.text
+        print(f"  {label:24s} {len(resp.content) / 1024:10.1f} KiB {statistics.median(timings):9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark: dashboard read latency while /api/sync/import is running.
+
+Runs the same workload once per engine profile (each in a fresh interpreter,
+since the engine is configured at import time) against a throw-away database:
+
+    python scripts/bench_read_during_import.py
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEED_PROJECTS = 200
+IMPORT_PROJECTS = 80
+WEEKS = 52
+
+
+def build_import_file(n_projects: int) -> bytes:
+    lines = ["# PROJECT_EXPORT_v1", ""]
+    for i in range(n_projects):
+        lines += [
+            f"## Project: Imported {i}",
+            "- ID: New",
+            "- Year: 2025",
+            "- CFT Unit: Bench",
+            "- Status: Development",
+            f"- Lead Engineer: Engineer {i % 20}",
+            "- Key Dates: Start=2025-01-06",
+            "",
+            "### Weekly Progress",
+            "| Week | Planned | Actual | Hours | Description |",
+            "|------|---------|--------|-------|-------------|",
+        ]
+        lines += [f"| {w} | 2 | 1 | 4 | Work item {w} |" for w in range(1, WEEKS + 1)]
+        lines += ["", "### Meeting Logs"]
+        for d in range(1, 6):
+            lines += [f"- Date: 2025-02-0{d}", f"- Content: Sync meeting {d} for project {i}"]
+        lines += ["", "---", ""]
+    return "\n".join(lines).encode("utf-8")
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run_profile():
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.database import SessionLocal
+    from app import models
+
+    db = SessionLocal()
+    for i in range(SEED_PROJECTS):
+        p = models.Project(name=f"Seed {i}", cft_unit="Bench", year=2025)
+        db.add(p)
+        db.flush()
+        db.add_all(models.WeeklyProgress(project_id=p.id, year=2025, week_number=w, planned_description="Seed")
+                   for w in range(1, WEEKS + 1))
+    db.commit()
+    db.close()
+
+    client = TestClient(app)
+    payload = build_import_file(IMPORT_PROJECTS)
+    done = threading.Event()
+    import_time = {}
+
+    def do_import():
+        t0 = time.perf_counter()
+        client.post("/api/sync/import", files={"file": ("bench.md", payload, "text/markdown")})
+        import_time["s"] = time.perf_counter() - t0
+        done.set()
+
+    def sample_reads(stop_when_done: bool, count: int = 0):
+        latencies, errors = [], 0
+        while (not done.is_set()) if stop_when_done else (len(latencies) < count):
+            t0 = time.perf_counter()
+            try:
+                resp = client.get("/api/projects/?limit=20")
+                ok = resp.status_code == 200
+            except Exception:
+                ok = False
+            latencies.append((time.perf_counter() - t0) * 1000)
+            errors += 0 if ok else 1
+        return latencies, errors
+
+    idle, _ = sample_reads(stop_when_done=False, count=200)
+
+    writer = threading.Thread(target=do_import)
+    writer.start()
+    busy, errors = sample_reads(stop_when_done=True)
+    writer.join()
+
+    print(f"  import: {import_time['s']:.2f}s")
+    print(f"  idle reads  : n={len(idle):5d} p50={percentile(idle, 50):7.2f}ms p99={percentile(idle, 99):7.2f}ms")
+    print(f"  during import: n={len(busy):5d} p50={percentile(busy, 50):7.2f}ms p99={percentile(busy, 99):7.2f}ms errors={errors}")
+
+
+def main():
+    for profile in ("default", "production"):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, DB_PROFILE=profile, DATABASE_URL=f"sqlite:///{tmp}/bench.db", BENCH_CHILD="1")
+            print(f"[{profile}]")
+            sys.stdout.flush()
+            subprocess.run([sys.executable, os.path.abspath(__file__)], env=env, check=True)
+
+
+if __name__ == "__main__":
+    if os.environ.get("BENCH_CHILD"):
+        run_profile()
+    else:
+        main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: first-request latency after a restart.
+
+Each run is a fresh Python process that imports the app (startup) and then
+times the first GET of a few pages. "before" swaps in a per-module style
+environment (no bytecode cache, auto-reload on, nothing compiled ahead) and
+its startup excludes the warm-up. "after" is app.templating, once with an
+empty bytecode cache (first start after a deploy) and once with a populated
+one (every later restart):
+
+    python scripts/bench_template_cold_start.py
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROUNDS = 5
+PAGES = ["/", "/cft_projects", "/projects/{pid}", "/projects/{pid}/planning", "/pm/dashboard"]
+
+CHILD = r"""
+import json, os, sys, time
+sys.path.insert(0, os.getcwd())
+t0 = time.perf_counter()
+from fastapi.templating import Jinja2Templates
+from app.main import app, template_warm_up
+from app import templating
+startup = (time.perf_counter() - t0) * 1000
+if sys.argv[1] == "before":
+    # no warm-up at startup either
+    startup -= template_warm_up["ms"]
+    templating.templates.env = Jinja2Templates(directory="templates").env
+from fastapi.testclient import TestClient
+from app.database import engine
+from app import models
+with engine.begin() as conn:
+    pid = conn.execute(models.Project.__table__.select().limit(1)).scalar()
+    if pid is None:
+        pid = conn.execute(models.Project.__table__.insert().values(
+            name="Bench", cft_unit="Bench", year=2026, status="Development", duration_weeks=12,
+        )).inserted_primary_key[0]
+client = TestClient(app)
+first = {}
+for page in json.loads(sys.argv[2]):
+    url = page.format(pid=pid)
+    t0 = time.perf_counter()
+    resp = client.get(url)
+    first[page] = (time.perf_counter() - t0) * 1000
+    assert resp.status_code == 200, (url, resp.status_code)
+print(json.dumps({"startup": startup, "warm_up": template_warm_up["ms"], "first": first}))
+"""
+
+
+def run(mode: str, env: dict) -> dict:
+    out = subprocess.run([sys.executable, "-c", CHILD, mode, json.dumps(PAGES)], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    tmp = tempfile.TemporaryDirectory()
+    base = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp.name}/bench.db")
+    cases = {}
+    for label, mode, fresh_cache in (("before", "before", True), ("after, empty cache", "after", True),
+                                     ("after, warm cache", "after", False)):
+        results = []
+        for i in range(ROUNDS):
+            cache_dir = os.path.join(tmp.name, f"cache-{label}-{i}" if fresh_cache else "cache-warm")
+            if not fresh_cache and i == 0:
+                run(mode, dict(base, JINJA_CACHE_DIR=cache_dir))  # populate it
+            results.append(run(mode, dict(base, JINJA_CACHE_DIR=cache_dir)))
+        cases[label] = results
+
+    print(f"median of {ROUNDS} fresh processes (ms)")
+    print(f"  {'':20} {'startup':>8} {'warm-up':>8} " + " ".join(f"{p:>24}" for p in PAGES) + f" {'sum':>7}")
+    for label, results in cases.items():
+        startup = statistics.median(r["startup"] for r in results)
+        warm_up = statistics.median(r["warm_up"] for r in results) if label != "before" else 0.0
+        firsts = [statistics.median(r["first"][p] for r in results) for p in PAGES]
+        print(f"  {label:20} {startup:8.1f} {warm_up:8.1f} " + " ".join(f"{ms:24.1f}" for ms in firsts) + f" {sum(firsts):7.1f}")
+
+
+if __name__ == "__main__":
+    main()
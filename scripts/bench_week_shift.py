@@ -0,0 +1,130 @@
+"""
+Benchmark: inserting/removing a week early in a multi-year project, which
+shifts ~200 later weeks.
+
+"before" mounts the previous extend/reduce implementation (every later week
+loaded into the ORM and shifted one flush at a time, duration fix-up committed
+separately) next to the real routes, against the same throw-away database:
+
+    python scripts/bench_week_shift.py
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WEEKS = 260  # five years
+AT_WEEK = 60
+ROUNDS = 10
+
+tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp.name}/bench.db")
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from fastapi import Depends
+from fastapi.testclient import TestClient
+from sqlalchemy import desc, func
+from sqlalchemy.orm import Session
+from app.main import app
+from app.database import engine, get_db
+from app import models, rollup
+
+
+def _sync_duration_before(db, db_project, project_id):
+    max_wp = db.query(func.max(models.WeeklyProgress.week_number)).filter(models.WeeklyProgress.project_id == project_id).scalar()
+    if (max_wp or 0) > (db_project.duration_weeks or 0):
+        db_project.duration_weeks = max_wp
+        db.commit()
+        db.refresh(db_project)
+    return db_project.duration_weeks or 12
+
+
+@app.post("/bench/extend_before/{project_id}")
+def extend_before(project_id: int, after_week: int, db: Session = Depends(get_db)):
+    db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    current_duration = _sync_duration_before(db, db_project, project_id)
+    later_weeks = db.query(models.WeeklyProgress).filter(
+        models.WeeklyProgress.project_id == project_id,
+        models.WeeklyProgress.week_number > after_week
+    ).order_by(desc(models.WeeklyProgress.week_number)).all()
+    for wk in later_weeks:
+        wk.week_number += 1
+        db.flush()
+    db.add(models.WeeklyProgress(project_id=project_id, week_number=after_week + 1, year=db_project.year,
+                                 planned_progress=0, actual_progress=0, planned_description="Extended Development"))
+    db_project.duration_weeks = current_duration + 1
+    db.add(models.ProjectLog(project_id=project_id, content="Project extended"))
+    rollup.rebuild(db, project_id)
+    db.commit()
+    return {"ok": True}
+
+
+@app.post("/bench/reduce_before/{project_id}")
+def reduce_before(project_id: int, target_week: int, db: Session = Depends(get_db)):
+    db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    current_duration = _sync_duration_before(db, db_project, project_id)
+    target_prog = db.query(models.WeeklyProgress).filter(
+        models.WeeklyProgress.project_id == project_id,
+        models.WeeklyProgress.week_number == target_week
+    ).first()
+    if target_prog:
+        db.delete(target_prog)
+        db.flush()
+    later_weeks = db.query(models.WeeklyProgress).filter(
+        models.WeeklyProgress.project_id == project_id,
+        models.WeeklyProgress.week_number > target_week
+    ).order_by(models.WeeklyProgress.week_number).all()
+    for wk in later_weeks:
+        wk.week_number -= 1
+        db.flush()
+    db_project.duration_weeks = current_duration - 1
+    db.add(models.ProjectLog(project_id=project_id, content="Project reduced"))
+    rollup.rebuild(db, project_id)
+    db.commit()
+    return {"ok": True}
+
+
+def seed() -> int:
+    with engine.begin() as conn:
+        project_id = conn.execute(models.Project.__table__.insert().values(
+            name="Multi-year", cft_unit="Bench", year=2025, duration_weeks=WEEKS)).inserted_primary_key[0]
+        conn.execute(models.WeeklyProgress.__table__.insert(), [
+            {"project_id": project_id, "year": 2025, "week_number": w, "planned_progress": 0, "actual_progress": 0,
+             "planned_description": f"Phase {w // 13}", "actual_hours": 4}
+            for w in range(1, WEEKS + 1)
+        ])
+    return project_id
+
+
+def median_ms(client, calls):
+    timings = []
+    for _ in range(ROUNDS):
+        for url in calls:
+            t0 = time.perf_counter()
+            resp = client.post(url)
+            timings.append((time.perf_counter() - t0) * 1000)
+            assert resp.status_code == 200, resp.text
+    return statistics.median(timings)
+
+
+def main():
+    project_id = seed()
+    client = TestClient(app)
+    before = median_ms(client, [f"/bench/extend_before/{project_id}?after_week={AT_WEEK}",
+                                f"/bench/reduce_before/{project_id}?target_week={AT_WEEK + 1}"])
+    after = median_ms(client, [f"/api/projects/{project_id}/extend?after_week={AT_WEEK}",
+                               f"/api/projects/{project_id}/reduce?target_week={AT_WEEK + 1}"])
+    bulk = median_ms(client, [f"/api/projects/{project_id}/extend?after_week={AT_WEEK}&weeks=10",
+                              f"/api/projects/{project_id}/reduce?target_week={AT_WEEK + 1}&weeks=10"])
+    print(f"{WEEKS}-week project, inserting/removing at week {AT_WEEK} ({WEEKS - AT_WEEK} weeks shift); "
+          f"median of {ROUNDS} extend+reduce pairs")
+    print(f"  before (per-row ORM shift)   : {before:8.1f} ms")
+    print(f"  after  (set-based UPDATE)    : {after:8.1f} ms")
+    print(f"  after, 10 weeks per request  : {bulk:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
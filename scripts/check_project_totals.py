@@ -0,0 +1,46 @@
+"""
+Verifies the stored project aggregates (reported_progress, total_actual_hours)
+against a full recompute over weekly_progress:
+
+    python scripts/check_project_totals.py          # report only, exit 1 on drift
+    python scripts/check_project_totals.py --fix    # also correct them
+
+Runs against DATABASE_URL (default: the local development database).
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from app.database import SessionLocal
+from app.crud import check_project_totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fix", action="store_true", help="write the recomputed values")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        mismatches = check_project_totals(db, fix=args.fix)
+        for project_id, stored, expected in mismatches:
+            print(f"project {project_id}: stored progress={stored[0]} hours={stored[1]:g}, "
+                  f"expected progress={expected[0]} hours={expected[1]:g}")
+        if args.fix:
+            db.commit()
+            print(f"Fixed {len(mismatches)} project(s).")
+            return 0
+    finally:
+        db.close()
+    if mismatches:
+        return 1
+    print("All project aggregates match.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Checks that the project read endpoints run a constant number of SQL statements,
+however many projects (and related rows) are listed:
+
+    python scripts/check_query_counts.py
+
+Exits non-zero if listing 100 projects costs more statements than listing 5.
+"""
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp.name}/check.db")
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from sqlalchemy import event
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database import engine, read_engine
+from app import models
+
+
+@contextmanager
+def count_statements():
+    counter = {"n": 0}
+
+    def _count(*args):
+        counter["n"] += 1
+
+    event.listen(read_engine, "before_cursor_execute", _count)
+    try:
+        yield counter
+    finally:
+        event.remove(read_engine, "before_cursor_execute", _count)
+
+
+def seed(n_projects: int):
+    with engine.begin() as conn:
+        conn.execute(models.Project.__table__.delete())
+        conn.execute(models.Engineer.__table__.delete())
+        conn.execute(models.Engineer.__table__.insert(), [{"id": 1, "name": "Lead"}])
+        conn.execute(models.Project.__table__.insert(), [
+            {"id": p, "name": f"P{p}", "cft_unit": "X", "year": 2025, "lead_engineer_id": 1}
+            for p in range(1, n_projects + 1)
+        ])
+        for table, row in (
+            (models.WeeklyProgress, {"year": 2025, "week_number": 1}),
+            (models.ProjectLog, {"content": "log"}),
+            (models.MaintenanceLog, {"log_type": "Routine Check", "content": "m"}),
+            (models.ProjectUpdate, {"content": "u"}),
+        ):
+            conn.execute(table.__table__.delete())
+            conn.execute(table.__table__.insert(), [dict(row, project_id=p) for p in range(1, n_projects + 1)])
+
+
+def statements_for(client, url: str) -> int:
+    with count_statements() as counter:
+        resp = client.get(url)
+    assert resp.status_code == 200, resp.text
+    return counter["n"]
+
+
+def main():
+    client = TestClient(app)
+    failures = 0
+    for url in ("/api/projects/?limit=1000", "/api/projects/1"):
+        counts = {}
+        for n in (5, 100):
+            seed(n)
+            counts[n] = statements_for(client, url)
+        ok = counts[5] == counts[100]
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {url}: {counts[5]} statements for 5 projects, {counts[100]} for 100")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())